@@ -35,6 +35,7 @@ import json
 import time
 import random
 import pathlib
+import argparse
 
 import numpy as np
 import torch
@@ -44,6 +45,9 @@ import pandas as pd
 import networkx as nx
 import ezkl  # requires ezkl to be installed
 
+from ebsl_export import export_reputation, summarize_reputation
+from ebsl_profiling import StageProfiler, add_profile_args
+
 # Optional reproducibility for consistent data generation and model initialization
 random.seed(1337)
 torch.manual_seed(1337)
@@ -375,6 +379,11 @@ def ensure_kzg_srs(settings_path: str):
 
 def main():
     """Orchestrates the entire EBSL -> ONNX -> EZKL workflow."""
+    ap = argparse.ArgumentParser(description="Monolithic EBSL → ONNX → EZKL workflow")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    prof = StageProfiler(args.profile, args.profile_stages)
+
     print("--- Starting Monolithic EBSL → ONNX → EZKL Workflow ---")
 
     # ========= Part 1: Data & EBSL =========
@@ -390,27 +399,28 @@ def main():
 
     print("\nComputing EBSL reputation...")
     t0 = time.time()
-    rep = ebsl.compute_reputation()
+    with prof.stage("fusion"):
+        rep = ebsl.compute_reputation()
     print(f"Reputation computed in {time.time() - t0:.4f}s\n")
 
-    reputation_df = pd.DataFrame([
-        {"node_id": i, "belief": float(rep[i, 0]), "disbelief": float(rep[i, 1]),
-         "uncertainty": float(rep[i, 2]), "base_rate": float(rep[i, 3])}
-        for i in range(N)
-    ])
+    # Columnar export straight from the [N, 4] buffer (no per-row Python)
+    REPUTATION_PATH = "reputation.parquet"
+    export_reputation(rep, REPUTATION_PATH, fusion="product")
+    print(f"✅ Reputation exported to {REPUTATION_PATH}")
     print("Reputation Analysis Summary:")
-    print(reputation_df.describe())
+    print(pd.DataFrame(summarize_reputation(rep)))
 
     # ========= Part 2: Export ONNX (static) =========
     model = EBSLFusionONNX(N)
     onnx_path = "ebsl_fusion.onnx"
     print("\nExporting EBSL fusion to ONNX (static, arith-only)...")
     dummy = torch.rand(1, N * N * 4, dtype=torch.float32)
-    torch.onnx.export(
-        model, dummy, onnx_path,
-        input_names=["input"], output_names=["output"],
-        opset_version=17, dynamic_axes=None,  # static shapes are crucial for EZKL
-    )
+    with prof.stage("export_onnx"):
+        torch.onnx.export(
+            model, dummy, onnx_path,
+            input_names=["input"], output_names=["output"],
+            opset_version=17, dynamic_axes=None,  # static shapes are crucial for EZKL
+        )
     print(f"✅ ONNX exported to {onnx_path}")
 
     # ========= Part 3: Prepare EZKL IO =========
@@ -434,29 +444,34 @@ def main():
 
     # [1/7] gen-settings
     print("\n[1/7] Generating settings...")
-    gen_settings_compat(onnx_path, SETTINGS_PATH)
+    with prof.stage("gen_settings"):
+        gen_settings_compat(onnx_path, SETTINGS_PATH)
     s = read_json(SETTINGS_PATH)
     print(f"    Settings generated: commitment={s['run_args'].get('commitment')}, logrows={s['run_args'].get('logrows')}")
 
     # [2/7] ensure KZG SRS
     print("[2/7] Ensuring KZG SRS is available...")
-    ensure_kzg_srs(SETTINGS_PATH)
+    with prof.stage("get_srs"):
+        ensure_kzg_srs(SETTINGS_PATH)
     print("    ✅ SRS is ready")
 
     # [3/7] compile-circuit
     print("[3/7] Compiling circuit...")
-    compile_circuit_compat(onnx_path, CIRCUIT_PATH, SETTINGS_PATH)
+    with prof.stage("compile_circuit"):
+        compile_circuit_compat(onnx_path, CIRCUIT_PATH, SETTINGS_PATH)
     print(f"    Circuit compiled: {CIRCUIT_PATH} ({os.path.getsize(CIRCUIT_PATH)} bytes)")
 
     # [4/7] gen-witness (before setup)
     print("[4/7] Generating witness...")
-    gen_witness_compat(INPUT_PATH, CIRCUIT_PATH, WITNESS_PATH)
+    with prof.stage("gen_witness"):
+        gen_witness_compat(INPUT_PATH, CIRCUIT_PATH, WITNESS_PATH)
     print(f"    Witness generated: {WITNESS_PATH} ({os.path.getsize(WITNESS_PATH)} bytes)")
 
     # [5/7] setup (PK/VK)
     print("[5/7] Setting up proving and verification keys...")
     t_start = time.time()
-    setup_compat(CIRCUIT_PATH, VK_PATH, PK_PATH)
+    with prof.stage("setup"):
+        setup_compat(CIRCUIT_PATH, VK_PATH, PK_PATH)
     print(f"    Setup completed in {time.time() - t_start:.2f}s")
     print(f"    Proving Key (pk): {PK_PATH} ({os.path.getsize(PK_PATH)} bytes)")
     print(f"    Verification Key (vk): {VK_PATH} ({os.path.getsize(VK_PATH)} bytes)")
@@ -464,17 +479,21 @@ def main():
     # [6/7] prove
     print("[6/7] Generating proof...")
     t_start = time.time()
-    prove_compat(CIRCUIT_PATH, WITNESS_PATH, PK_PATH, PROOF_PATH)
+    with prof.stage("prove"):
+        prove_compat(CIRCUIT_PATH, WITNESS_PATH, PK_PATH, PROOF_PATH)
     print(f"    Proof generated in {time.time() - t_start:.2f}s")
     print(f"    Proof: {PROOF_PATH} ({os.path.getsize(PROOF_PATH)} bytes)")
 
     # [7/7] verify
     print("[7/7] Verifying proof...")
     t_start = time.time()
-    is_valid = verify_compat(SETTINGS_PATH, VK_PATH, PROOF_PATH)
+    with prof.stage("verify"):
+        is_valid = verify_compat(SETTINGS_PATH, VK_PATH, PROOF_PATH)
     print(f"    Verification completed in {time.time() - t_start:.2f}s")
     print("✅ Proof VERIFIED successfully!" if is_valid else "❌ Proof verification FAILED.")
 
+    if prof.written:
+        print(f"Profiles written: {len(prof.written)} files in {prof.out_dir}")
     print("\n--- Workflow complete ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Proof aggregation for EBSL proofs made with one vk
+- Folds N single proofs (proved with proof_type="for-aggr") into ceil(N / width)
+  aggregated proofs with ezkl.aggregate; a short final chunk is padded by
+  repeating its last proof so every chunk matches the aggregation circuit
+- setup_aggregate runs once per (inner vk, width, logrows) and is cached in the
+  output directory
+- Reports aggregation proving time against the verification time saved:
+  N single verifies vs one verify_aggr per chunk
+- The aggregation circuit runs at its own logrows (20-23), far above the inner
+  circuit's, so it gets its own SRS fetched with get_srs(logrows=...) from the
+  same ceremony; the inner SRS is only used to verify the inner proofs
+"""
+
+import os
+import json
+import time
+import argparse
+import subprocess
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional
+
+from ebsl_epoch import circuit_fingerprint
+from ebsl_batch_verify import collect_proofs, run_with_loop
+
+DEFAULT_OUT_DIR = os.path.join("zkml_artifacts", "aggregated")
+DEFAULT_WIDTH = 4
+DEFAULT_LOGROWS = 23
+SINGLE_VERIFY_SAMPLE = 8
+
+def _require_ezkl():
+    try:
+        import ezkl
+    except ImportError as e:
+        raise ImportError("Proof aggregation requires ezkl (pip install ezkl)") from e
+    return ezkl
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def aggr_srs_path(out_dir: str, logrows: int) -> str:
+    return os.path.join(out_dir, f"kzg{logrows}.srs")
+
+def fetch_aggr_srs(srs_path: str, logrows: int, log=print) -> str:
+    """
+    SRS for the aggregation circuit at `logrows`, from the same ceremony as the
+    inner circuit's (get_srs); `ezkl get-srs --logrows` if the binding fails.
+    Reused when srs_path already exists.
+    """
+    if os.path.exists(srs_path):
+        return srs_path
+    ezkl = _require_ezkl()
+    os.makedirs(os.path.dirname(os.path.abspath(srs_path)), exist_ok=True)
+    try:
+        if run_with_loop(ezkl.get_srs, srs_path=srs_path, logrows=logrows):
+            return srs_path
+        log("ezkl.get_srs returned False; attempting CLI fallback")
+    except Exception as e:
+        log(f"ezkl.get_srs raised {e!r}; attempting CLI fallback")
+    subprocess.run(["ezkl", "get-srs", "--logrows", str(logrows), "--srs-path", srs_path], check=True)
+    if not os.path.exists(srs_path):
+        raise RuntimeError(f"no SRS for aggregation logrows {logrows} at {srs_path}")
+    return srs_path
+
+# --------------------------- Chunking / setup --------------------------------
+
+def chunk_proofs(proofs: List[str], width: int) -> List[List[str]]:
+    """Groups of exactly `width` proofs; the last one is padded with its own last proof."""
+    if width < 1:
+        raise ValueError("aggregation width must be >= 1")
+    chunks = [list(proofs[i:i + width]) for i in range(0, len(proofs), width)]
+    if chunks and len(chunks[-1]) < width:
+        chunks[-1] += [chunks[-1][-1]] * (width - len(chunks[-1]))
+    return chunks
+
+def find_aggr_logrows(sample_chunk: List[str], start: int = 20, stop: int = 26) -> int:
+    """Smallest logrows for which mock_aggregate accepts the chunk."""
+    ezkl = _require_ezkl()
+    for logrows in range(start, stop + 1):
+        try:
+            if run_with_loop(ezkl.mock_aggregate, aggregation_snarks=sample_chunk, logrows=logrows):
+                return logrows
+        except BaseException as e:      # too few rows surfaces as a Rust panic
+            if isinstance(e, (KeyboardInterrupt, SystemExit)):
+                raise
+    raise RuntimeError(f"aggregation of {len(sample_chunk)} proofs does not fit logrows <= {stop}")
+
+def setup_aggregation(sample_chunk: List[str], vk_path: str, srs_path: str, logrows: int, out_dir: str):
+    """(aggr_vk, aggr_pk, setup seconds); 0.0 seconds when a matching setup is cached."""
+    ezkl = _require_ezkl()
+    key = circuit_fingerprint(vk_path)[:16] + f"-w{len(sample_chunk)}-k{logrows}"
+    vk, pk = os.path.join(out_dir, f"aggr-{key}.vk"), os.path.join(out_dir, f"aggr-{key}.pk")
+    if os.path.exists(vk) and os.path.exists(pk):
+        return vk, pk, 0.0
+    t0 = time.perf_counter()
+    if not run_with_loop(ezkl.setup_aggregate, sample_snarks=sample_chunk, vk_path=vk, pk_path=pk,
+                logrows=logrows, srs_path=srs_path):
+        raise RuntimeError("setup_aggregate failed")
+    return vk, pk, time.perf_counter() - t0
+
+# --------------------------- Aggregation -------------------------------------
+
+@dataclass
+class AggregationReport:
+    proofs: int
+    width: int
+    chunks: int
+    padded: int
+    logrows: int
+    setup_seconds: float
+    aggregate_seconds: float
+    single_verify_seconds: Optional[float]       # mean over a sample of the inner proofs
+    verify_aggr_seconds: Optional[float]         # mean over all aggregated proofs
+    verification_seconds_single: Optional[float]
+    verification_seconds_aggregated: Optional[float]
+    verification_seconds_saved: Optional[float]
+    break_even_verifications: Optional[float]    # full verifications before aggregating pays off
+    single_proof_bytes: int
+    aggregated_proof_bytes: int
+    aggr_pk_bytes: int
+    aggr_vk_bytes: int
+    outputs: list = field(default_factory=list)
+    failures: list = field(default_factory=list)
+
+def _mean_verify_seconds(proofs: List[str], settings_path: str, vk_path: str, srs_path: str) -> Optional[float]:
+    ezkl = _require_ezkl()
+    secs = []
+    for p in proofs:
+        t0 = time.perf_counter()
+        if run_with_loop(ezkl.verify, proof_path=p, settings_path=settings_path, vk_path=vk_path, srs_path=srs_path):
+            secs.append(time.perf_counter() - t0)
+    return sum(secs) / len(secs) if secs else None
+
+def aggregate_proofs(proofs: List[str], settings_path: str, vk_path: str, srs_path: str,
+                     width: int = DEFAULT_WIDTH, logrows: Optional[int] = DEFAULT_LOGROWS,
+                     out_dir: str = DEFAULT_OUT_DIR, aggr_srs: Optional[str] = None,
+                     log=print) -> AggregationReport:
+    """
+    Aggregates `proofs` (all from the circuit behind vk_path) `width` at a time.
+    logrows=None searches for the smallest aggregation logrows with mock_aggregate.
+    srs_path is the inner circuit's SRS; aggr_srs (default out_dir/kzg{logrows}.srs,
+    fetched when missing) is the one setup_aggregate / aggregate / verify_aggr use.
+    """
+    ezkl = _require_ezkl()
+    if not proofs:
+        raise ValueError("no proofs to aggregate")
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = chunk_proofs(proofs, width)
+    padded = len(chunks) * width - len(proofs)
+
+    single_verify = _mean_verify_seconds(proofs[:SINGLE_VERIFY_SAMPLE], settings_path, vk_path, srs_path)
+    if logrows is None:
+        logrows = find_aggr_logrows(chunks[0])
+        log(f"Aggregation logrows: {logrows}")
+    aggr_srs = fetch_aggr_srs(aggr_srs or aggr_srs_path(out_dir, logrows), logrows, log)
+    aggr_vk, aggr_pk, setup_seconds = setup_aggregation(chunks[0], vk_path, aggr_srs, logrows, out_dir)
+    log(f"Aggregation setup ({width} proofs, logrows {logrows}): "
+        + (f"{setup_seconds:.1f}s" if setup_seconds else "cached"))
+
+    outputs, failures, agg_secs, verify_secs = [], [], [], []
+    for i, chunk in enumerate(chunks):
+        proof_path = os.path.join(out_dir, f"aggr_{i:05d}.pf")
+        t0 = time.perf_counter()
+        try:
+            # the binding's vk_path argument is loaded as the aggregation *pk*
+            if not run_with_loop(ezkl.aggregate, aggregation_snarks=chunk, proof_path=proof_path, vk_path=aggr_pk,
+                        logrows=logrows, srs_path=aggr_srs):
+                raise RuntimeError("aggregate failed")
+            agg_secs.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            if not run_with_loop(ezkl.verify_aggr, proof_path=proof_path, vk_path=aggr_vk, logrows=logrows, srs_path=aggr_srs):
+                raise RuntimeError("verify_aggr returned False")
+            verify_secs.append(time.perf_counter() - t0)
+        except Exception as e:
+            failures.append({"chunk": i, "proofs": chunk, "error": repr(e)})
+            log(f"chunk {i}: {e!r}")
+            continue
+        outputs.append({"proof_path": proof_path, "members": chunk[:width - padded if i == len(chunks) - 1 else width]})
+
+    verify_aggr = sum(verify_secs) / len(verify_secs) if verify_secs else None
+    total_single = single_verify * len(proofs) if single_verify is not None else None
+    total_aggr = verify_aggr * len(chunks) if verify_aggr is not None else None
+    saved = total_single - total_aggr if total_single is not None and total_aggr is not None else None
+    aggregate_seconds = float(sum(agg_secs))
+    return AggregationReport(
+        proofs=len(proofs),
+        width=width,
+        chunks=len(chunks),
+        padded=padded,
+        logrows=logrows,
+        setup_seconds=setup_seconds,
+        aggregate_seconds=aggregate_seconds,
+        single_verify_seconds=single_verify,
+        verify_aggr_seconds=verify_aggr,
+        verification_seconds_single=total_single,
+        verification_seconds_aggregated=total_aggr,
+        verification_seconds_saved=saved,
+        break_even_verifications=aggregate_seconds / saved if saved and saved > 0 else None,
+        single_proof_bytes=sum(_size(p) for p in proofs),
+        aggregated_proof_bytes=sum(_size(o["proof_path"]) for o in outputs),
+        aggr_pk_bytes=_size(aggr_pk),
+        aggr_vk_bytes=_size(aggr_vk),
+        outputs=outputs,
+        failures=failures,
+    )
+
+def format_report(report: AggregationReport) -> str:
+    fmt = lambda x, unit="s": "n/a" if x is None else f"{x:.3f}{unit}"
+    be = report.break_even_verifications
+    return "\n".join([
+        f"{report.proofs} proofs -> {report.chunks} aggregated (width {report.width}, "
+        f"{report.padded} padding, logrows {report.logrows})",
+        f"  prove:  setup {report.setup_seconds:.1f}s, aggregate {report.aggregate_seconds:.1f}s "
+        f"({report.aggregate_seconds / report.proofs:.2f}s per inner proof)",
+        f"  verify: {report.proofs} x {fmt(report.single_verify_seconds)} = {fmt(report.verification_seconds_single)} "
+        f"vs {report.chunks} x {fmt(report.verify_aggr_seconds)} = {fmt(report.verification_seconds_aggregated)} "
+        f"(saved {fmt(report.verification_seconds_saved)})",
+        f"  bytes:  {report.single_proof_bytes:,} single vs {report.aggregated_proof_bytes:,} aggregated; "
+        f"break-even after " + ("n/a" if be is None else f"{be:.1f}") + " full verifications",
+    ])
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Aggregate EBSL proofs made with one vk")
+    ap.add_argument("source", help="Directory of proofs or manifest file (proof_type for-aggr)")
+    ap.add_argument("--settings", default=os.path.join("zkml_artifacts", "settings.json"))
+    ap.add_argument("--vk", default=os.path.join("zkml_artifacts", "model.vk"))
+    ap.add_argument("--srs", default=os.path.join("zkml_artifacts", "kzg.srs"), help="Inner circuit SRS")
+    ap.add_argument("--aggr-srs", default=None,
+                    help="Aggregation SRS (default: OUT_DIR/kzg{logrows}.srs, fetched with get_srs when missing)")
+    ap.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="Proofs per aggregated proof")
+    ap.add_argument("--logrows", default=str(DEFAULT_LOGROWS),
+                    help="Aggregation circuit logrows, or 'auto' to search with mock_aggregate")
+    ap.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    ap.add_argument("--report", default=os.path.join("zkml_artifacts", "aggregation_report.json"))
+    args = ap.parse_args()
+
+    proofs = collect_proofs(args.source)
+    logrows = None if args.logrows == "auto" else int(args.logrows)
+    report = aggregate_proofs(proofs, args.settings, args.vk, args.srs, args.width, logrows, args.out_dir,
+                              args.aggr_srs)
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(asdict(report), f, indent=2)
+    print(f"{'[✓]' if not report.failures else '[✗]'} " + format_report(report))
+    print(f"[✓] Report written: {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel batch verification of EZKL proofs
+- Takes a directory of proofs or a manifest (JSON list / {"proofs": [...]} / an
+  ebsl_epoch manifest's per-user proof paths / one path per line); an empty set
+  or an unrecognized JSON object is an error
+- Settings, vk and SRS are staged once by the parent (into /dev/shm when available)
+  and every worker process reads that single copy for every proof it verifies
+- Reports throughput, failures and per-proof latency percentiles
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import inspect
+import asyncio
+import argparse
+import tempfile
+from dataclasses import dataclass, asdict, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+PROOF_PATTERNS = ("*.pf", "*.proof")
+
+# --------------------------- Inputs ------------------------------------------
+
+def collect_proofs(source: str) -> List[str]:
+    """Proof paths from a directory (recursive *.pf / *.proof) or a manifest file."""
+    if os.path.isdir(source):
+        out = []
+        for pattern in PROOF_PATTERNS:
+            out.extend(glob.glob(os.path.join(source, "**", pattern), recursive=True))
+        return sorted(out)
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            if "proofs" in data:
+                data = data["proofs"]
+            elif "users" in data:           # ebsl_epoch manifest
+                data = [u["proof_path"] for u in data["users"].values() if u.get("proof_path")]
+            else:
+                raise ValueError(f"{source}: JSON manifest needs a 'proofs' list or epoch 'users' entries")
+        entries = [d["proof_path"] if isinstance(d, dict) else d for d in data]
+    except json.JSONDecodeError:
+        entries = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in entries]
+
+# --------------------------- Worker ------------------------------------------
+
+_CTX = {}
+
+def run_with_loop(func, /, *args, **kwargs):
+    """
+    Always execute in a running asyncio loop and await if needed.
+    Works whether func is sync or returns a coroutine.
+    """
+    async def _runner():
+        res = func(*args, **kwargs)
+        if inspect.isawaitable(res):
+            return await res
+        return res
+    return asyncio.run(_runner())
+
+def _stage(paths: dict, stage_root: str) -> dict:
+    """Copies the artifacts into stage_root once; workers share these paths."""
+    staged = {}
+    for key, src in paths.items():
+        dst = os.path.join(stage_root, os.path.basename(src))
+        shutil.copy2(src, dst)
+        staged[key] = dst
+    return staged
+
+def _init_worker(paths: dict):
+    import ezkl
+    _CTX["ezkl"] = ezkl
+    _CTX["paths"] = paths
+
+def _verify_one(proof_path: str):
+    t0 = time.perf_counter()
+    try:
+        ok = bool(run_with_loop(_CTX["ezkl"].verify, proof_path=proof_path, **_CTX["paths"]))
+        err = None if ok else "verification returned False"
+    except Exception as e:
+        ok, err = False, repr(e)
+    return proof_path, ok, time.perf_counter() - t0, err
+
+# --------------------------- Driver ------------------------------------------
+
+@dataclass
+class BatchVerifyReport:
+    total: int
+    verified: int
+    failed: int
+    workers: int
+    wall_seconds: float
+    proofs_per_second: float
+    latency_seconds: dict
+    failures: list = field(default_factory=list)
+
+def _percentiles(latencies) -> dict:
+    if not latencies:
+        return {}
+    lat = np.asarray(latencies, dtype=np.float64)
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    return {"mean": float(lat.mean()), "p50": float(p50), "p90": float(p90),
+            "p99": float(p99), "max": float(lat.max())}
+
+def batch_verify(proofs: List[str], settings_path: str, vk_path: str, srs_path: str,
+                 workers: Optional[int] = None, chunksize: int = 8, stage: bool = True) -> BatchVerifyReport:
+    if not proofs:
+        raise ValueError("no proofs to verify")
+    workers = max(1, workers or os.cpu_count() or 1)
+    stage_root = None
+    if stage:
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        stage_root = tempfile.mkdtemp(prefix="ezkl_verify_", dir=shm)
+    t0 = time.perf_counter()
+    try:
+        paths = {"settings_path": settings_path, "vk_path": vk_path, "srs_path": srs_path}
+        if stage_root:
+            paths = _stage(paths, stage_root)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(paths,)) as pool:
+            results = list(pool.map(_verify_one, proofs, chunksize=max(1, chunksize)))
+    finally:
+        if stage_root:
+            shutil.rmtree(stage_root, ignore_errors=True)
+    wall = time.perf_counter() - t0
+    failures = [{"proof_path": p, "error": err} for p, ok, _, err in results if not ok]
+    return BatchVerifyReport(
+        total=len(results),
+        verified=len(results) - len(failures),
+        failed=len(failures),
+        workers=workers,
+        wall_seconds=wall,
+        proofs_per_second=len(results) / wall if wall > 0 else 0.0,
+        latency_seconds=_percentiles([s for _, _, s, _ in results]),
+        failures=failures,
+    )
+
+def main():
+    ap = argparse.ArgumentParser(description="Parallel EZKL batch proof verifier")
+    ap.add_argument("source", help="Directory of proofs or manifest file")
+    ap.add_argument("--settings", default=os.path.join("zkml_artifacts", "settings.json"))
+    ap.add_argument("--vk", default=os.path.join("zkml_artifacts", "model.vk"))
+    ap.add_argument("--srs", default=os.path.join("zkml_artifacts", "kzg.srs"))
+    ap.add_argument("--workers", type=int, default=None, help="Verifier processes (default: all cores)")
+    ap.add_argument("--chunksize", type=int, default=8, help="Proofs handed to a worker at a time")
+    ap.add_argument("--no-stage", action="store_true", help="Read vk/SRS in place instead of staging a shared copy")
+    ap.add_argument("--report", default=os.path.join("zkml_artifacts", "batch_verify_report.json"))
+    args = ap.parse_args()
+
+    proofs = collect_proofs(args.source)
+    if not proofs:
+        ap.error(f"no proofs found in {args.source}")
+    report = batch_verify(proofs, args.settings, args.vk, args.srs,
+                          workers=args.workers, chunksize=args.chunksize, stage=not args.no_stage)
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(asdict(report), f, indent=2)
+    print(f"[✓] {report.verified}/{report.total} verified in {report.wall_seconds:.2f}s "
+          f"({report.proofs_per_second:.1f} proofs/s, {report.workers} workers)")
+    if report.latency_seconds:
+        lat = report.latency_seconds
+        print(f"    latency p50 {lat['p50'] * 1e3:.1f}ms, p90 {lat['p90'] * 1e3:.1f}ms, p99 {lat['p99'] * 1e3:.1f}ms")
+    if report.failed:
+        print(f"[✗] {report.failed} failed; see {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scaling benchmark matrix for the EBSL -> EZKL pipeline
+- Sweeps max_opinions x zk_strategy x batch_size x calibrated / uncalibrated
+- Each cell runs run_zkml_pipeline_with_ebsl in a fresh process and working
+  directory; per-step wall time and peak RSS (VmHWM, reset per step) are
+  recorded along with compiled circuit / pk / vk / witness / proof sizes
+- Results go to a structured JSON file and are diffed against a stored baseline
+  (exit code 1 on regressions beyond the time / size tolerances)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+import platform
+import subprocess
+from dataclasses import dataclass, field, asdict
+
+STRATEGIES = ("conservative", "balanced", "aggressive")
+ARTIFACTS = {
+    "compiled_circuit": "compiled.onnx",
+    "pk": "model.pk",
+    "vk": "model.vk",
+    "witness": "witness.json",
+    "proof": "proof.pf",
+    "settings": "settings.json",
+}
+DEFAULT_RESULTS = os.path.join("zkml_artifacts", "bench_matrix.json")
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_SIZE_TOLERANCE = 0.05
+DEFAULT_SEED = 1337
+# absolute noise floors: sub-second steps and small RSS moves are not regressions
+MIN_DELTA = {"seconds": 0.5, "peak_rss_mb": 32.0}
+
+# --------------------------- Matrix ------------------------------------------
+
+@dataclass(frozen=True)
+class BenchCell:
+    max_opinions: int
+    zk_strategy: str
+    batch_size: int
+    calibrated: bool
+
+    @property
+    def key(self) -> str:
+        return (f"k{self.max_opinions}-{self.zk_strategy}-b{self.batch_size}-"
+                f"{'cal' if self.calibrated else 'nocal'}")
+
+@dataclass
+class CellResult:
+    key: str
+    cell: dict
+    ok: bool
+    seconds: float
+    steps: dict = field(default_factory=dict)     # step -> {seconds, peak_rss_mb, ok}
+    sizes: dict = field(default_factory=dict)     # artifact -> bytes
+    circuit: dict = field(default_factory=dict)   # logrows, num_rows, scales
+    error: str = None
+    peak_rss_scope: str = "step"                  # "process" where VmHWM cannot be reset
+
+def expand_matrix(max_opinions=(4, 8, 16), strategies=("balanced",), batch_sizes=(1,),
+                  calibrated=(True, False)) -> list:
+    return [BenchCell(int(k), s, int(b), bool(c))
+            for k, s, b, c in itertools.product(max_opinions, strategies, batch_sizes, calibrated)]
+
+# --------------------------- Per-step peak memory ----------------------------
+
+def _reset_peak_rss() -> bool:
+    """Resets VmHWM for this process (Linux >= 4.0); False when unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def _run_cell_in_process(cell: BenchCell, seed: int = DEFAULT_SEED) -> dict:
+    """Child side: runs one pipeline configuration in the current directory."""
+    from contextlib import contextmanager
+    import torch
+    from ebsl_full_script import Logger, run_zkml_pipeline_with_ebsl
+
+    # same synthetic opinions in every run, so cells are comparable with the baseline
+    torch.manual_seed(seed)
+
+    per_step = _reset_peak_rss()
+
+    class PeakMemoryLogger(Logger):
+        @contextmanager
+        def timed(self, name, extra=None):
+            if per_step:
+                _reset_peak_rss()
+            with super().timed(name, extra) as info:
+                try:
+                    yield info
+                finally:
+                    info["peak_rss_mb"] = _peak_rss_mb()
+
+    logger = PeakMemoryLogger(verbose=False)
+    t0 = time.perf_counter()
+    error = None
+    try:
+        run_zkml_pipeline_with_ebsl(logger, max_opinions=cell.max_opinions, zk_strategy=cell.zk_strategy,
+                                    skip_calibration=not cell.calibrated, batch_size=cell.batch_size)
+    except Exception as e:
+        error = repr(e)
+    wd = os.path.abspath("zkml_artifacts")
+    sizes = {name: os.path.getsize(os.path.join(wd, f))
+             for name, f in ARTIFACTS.items() if os.path.exists(os.path.join(wd, f))}
+    circuit = {}
+    try:
+        with open(os.path.join(wd, "settings.json"), "r") as f:
+            s = json.load(f)
+        ra = s.get("run_args", {})
+        circuit = {"logrows": ra.get("logrows"), "num_rows": s.get("num_rows"),
+                   "input_scale": ra.get("input_scale"), "param_scale": ra.get("param_scale"),
+                   "lookup_range": ra.get("lookup_range")}
+    except (OSError, ValueError):
+        pass
+    steps = {st.name: {"seconds": st.seconds, "peak_rss_mb": st.extra.get("peak_rss_mb"), "ok": st.ok}
+             for st in logger.steps}
+    return asdict(CellResult(cell.key, asdict(cell), error is None, time.perf_counter() - t0,
+                             steps, sizes, circuit, error, "step" if per_step else "process"))
+
+# --------------------------- Runner ------------------------------------------
+
+def run_matrix(cells, work_dir: str = os.path.join("zkml_artifacts", "bench"), keep_artifacts: bool = False,
+               timeout: float = None, seed: int = DEFAULT_SEED, log=print) -> list:
+    """Runs each cell in its own interpreter and directory; returns result dicts."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+    results = []
+    for i, cell in enumerate(cells, 1):
+        cell_dir = os.path.abspath(os.path.join(work_dir, cell.key))
+        os.makedirs(cell_dir, exist_ok=True)
+        log(f"[{i}/{len(cells)}] {cell.key}")
+        t0 = time.perf_counter()
+        try:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--cell", json.dumps(asdict(cell)),
+                                   "--seed", str(seed)], cwd=cell_dir, env=env, capture_output=True, text=True, timeout=timeout)
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                raise RuntimeError((proc.stderr.strip().splitlines() or ["no output"])[-1])
+            res = json.loads(lines[-1])
+        except (subprocess.TimeoutExpired, RuntimeError, ValueError) as e:
+            res = asdict(CellResult(cell.key, asdict(cell), False, time.perf_counter() - t0, error=repr(e)))
+        results.append(res)
+        status = "[✓]" if res["ok"] else "[✗]"
+        log(f"    {status} {res['seconds']:.1f}s, pk {res['sizes'].get('pk', 0) / 2**20:,.1f} MB, "
+            f"proof {res['sizes'].get('proof', 0):,} B" + (f" ({res['error']})" if res.get("error") else ""))
+        if not keep_artifacts:
+            shutil.rmtree(cell_dir, ignore_errors=True)
+    return results
+
+def write_results(path: str, results: list) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+    try:
+        import ezkl
+        doc["host"]["ezkl"] = getattr(ezkl, "__version__", None)
+    except ImportError:
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+def load_results(path: str) -> list:
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+# --------------------------- Baseline comparison -----------------------------
+
+def compare_to_baseline(results: list, baseline: list, time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+                        size_tolerance: float = DEFAULT_SIZE_TOLERANCE) -> list:
+    """
+    One row per (cell, metric) present in both runs. Step times and peak RSS
+    use time_tolerance; artifact sizes and num_rows use size_tolerance.
+    """
+    base = {r["key"]: r for r in baseline}
+    rows = []
+
+    def _row(key, metric, old, new, tol):
+        if old is None or new is None:
+            return
+        change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+        floor = MIN_DELTA.get(metric.rsplit(".", 1)[-1], 0.0)
+        rows.append({"key": key, "metric": metric, "baseline": old, "current": new,
+                     "change": change, "regression": change > tol and new - old > floor})
+
+    for r in results:
+        b = base.get(r["key"])
+        if b is None:
+            continue
+        if b["ok"] and not r["ok"]:
+            rows.append({"key": r["key"], "metric": "ok", "baseline": True, "current": False,
+                         "change": None, "regression": True})
+            continue
+        _row(r["key"], "seconds", b["seconds"], r["seconds"], time_tolerance)
+        for step, st in r["steps"].items():
+            old = b["steps"].get(step)
+            if old:
+                _row(r["key"], f"{step}.seconds", old["seconds"], st["seconds"], time_tolerance)
+                _row(r["key"], f"{step}.peak_rss_mb", old.get("peak_rss_mb"), st.get("peak_rss_mb"), time_tolerance)
+        for name, size in r["sizes"].items():
+            _row(r["key"], f"size.{name}", b["sizes"].get(name), size, size_tolerance)
+        _row(r["key"], "num_rows", b.get("circuit", {}).get("num_rows"), r.get("circuit", {}).get("num_rows"),
+             size_tolerance)
+    return rows
+
+def format_table(results: list) -> str:
+    cols = ("gen_settings", "calibrate_settings", "compile_circuit", "setup", "prove", "verify")
+    head = f"{'cell':<28} {'logrows':>7} " + " ".join(f"{c[:10]:>10}" for c in cols) + \
+        f" {'peakMB':>8} {'pkMB':>8} {'proofKB':>8}"
+    lines = [head, "-" * len(head)]
+    for r in results:
+        steps = r.get("steps", {})
+        peak = max((s.get("peak_rss_mb") or 0 for s in steps.values()), default=0)
+        lines.append(
+            f"{r['key']:<28} {str(r.get('circuit', {}).get('logrows', '-')):>7} "
+            + " ".join(f"{steps[c]['seconds']:>10.2f}" if c in steps else f"{'-':>10}" for c in cols)
+            + f" {peak:>8.0f} {r['sizes'].get('pk', 0) / 2**20:>8.1f} {r['sizes'].get('proof', 0) / 1024:>8.1f}")
+    return "\n".join(lines)
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="EBSL / EZKL scaling benchmark matrix")
+    ap.add_argument("--max-opinions", type=int, nargs="+", default=[4, 8, 16])
+    ap.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=["balanced"])
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1])
+    ap.add_argument("--calibration", choices=("both", "on", "off"), default="both")
+    ap.add_argument("--out", default=DEFAULT_RESULTS, help="Structured results file")
+    ap.add_argument("--baseline", help="Previous results file to compare against")
+    ap.add_argument("--save-baseline", metavar="PATH", help="Also copy these results to PATH")
+    ap.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    ap.add_argument("--size-tolerance", type=float, default=DEFAULT_SIZE_TOLERANCE)
+    ap.add_argument("--timeout", type=float, default=None, help="Seconds per cell")
+    ap.add_argument("--keep-artifacts", action="store_true", help="Keep each cell's zkml_artifacts")
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Synthetic input seed (keep fixed across runs)")
+    ap.add_argument("--cell", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.cell:
+        print(json.dumps(_run_cell_in_process(BenchCell(**json.loads(args.cell)), args.seed)))
+        return
+
+    calibrated = {"both": (True, False), "on": (True,), "off": (False,)}[args.calibration]
+    cells = expand_matrix(args.max_opinions, args.strategies, args.batch_sizes, calibrated)
+    results = run_matrix(cells, keep_artifacts=args.keep_artifacts, timeout=args.timeout, seed=args.seed)
+    write_results(args.out, results)
+    print(format_table(results))
+    print(f"[✓] Results written: {args.out}")
+    if args.save_baseline:
+        write_results(args.save_baseline, results)
+
+    if args.baseline:
+        rows = compare_to_baseline(results, load_results(args.baseline), args.time_tolerance, args.size_tolerance)
+        regressions = [r for r in rows if r["regression"]]
+        for r in regressions:
+            change = f"{r['change'] * 100:+.1f}%" if r["change"] is not None else "failed"
+            print(f"[✗] {r['key']} {r['metric']}: {r['baseline']} -> {r['current']} ({change})")
+        print(f"{'[✗]' if regressions else '[✓]'} {len(regressions)} regressions in {len(rows)} compared metrics")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
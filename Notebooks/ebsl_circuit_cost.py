@@ -0,0 +1,563 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Static EZKL circuit-cost estimator for exported EBSL ONNX graphs
+- Reads an exported model (EBslFusionModule / EBSLFusionONNX), counts ops by type
+  and element count, and propagates fixed-point scales and value intervals
+- Per-op assignment costs (fitted against ezkl 22.2.1 gen_settings runs) give
+  total assignments -> num_rows; required lookups, range checks and the lookup
+  range give logrows; logrows and column count give pk / vk size
+- Runs in milliseconds, so model variants can be rejected before gen_settings,
+  calibration or setup; --validate compares predictions with real ezkl runs
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+from dataclasses import dataclass, field, asdict
+
+import numpy as np
+
+# Per-element assignment costs, fitted on single-op probes and the two EBSL graphs
+# (ezkl 22.2.1, SAFE check mode, decomp_base 2^14 x 4 legs). Refit with --fit.
+COST_TABLE = {
+    "input": 17.35,         # per public/private input element (decomposed range check)
+    "output": 35.15,        # per public/private output element
+    "add": 0.0,
+    "mul": 3.0,
+    "div": 187.85,          # variable denominator
+    "div_const": 29.5,
+    "reduce_sum": 0.0,      # per reduced input element
+    "log": 0.0,             # lookups: one table row, absorbed by input/output checks
+    "exp": 0.0,
+    "clip": 70.3,
+    "max": 33.5,            # one-sided clip / Max / Min
+    "abs": 13.5,
+    "compare": 15.91,
+    "where": 15.91,
+    "concat": 0.0,
+    "rebase": 59.09,        # per element rescaled back to input_scale
+}
+OP_CLASSES = {
+    "Add": "add", "Sub": "add", "Neg": "add",
+    "Mul": "mul",
+    "Div": "div",
+    "ReduceSum": "reduce_sum",
+    "Log": "log", "Exp": "exp",
+    "Clip": "clip", "Max": "max", "Min": "max", "Relu": "max",
+    "Abs": "abs",
+    "Greater": "compare", "GreaterOrEqual": "compare", "Less": "compare",
+    "LessOrEqual": "compare", "Equal": "compare",
+    "Where": "where",
+    "Concat": "concat",
+}
+LOOKUP_TABLES = {"Log": "Ln", "Exp": "Exp"}
+# re-indexing only: no constraints of their own
+FREE_OPS = {"Constant", "Reshape", "Unsqueeze", "Squeeze", "Flatten", "Slice", "Gather",
+            "Transpose", "Identity", "Cast", "Shape", "Expand", "Split"}
+
+# pk / vk bytes per circuit row (2^logrows) by num_inner_cols: (base, per lookup table).
+# Measured with ezkl setup; columns grow with the quotient degree, not linearly in cols.
+PK_BYTES_PER_ROW = {1: (3265.5, 480.2), 2: (4802.2, 672.3), 4: (12291.9, 1760.6)}
+VK_BYTES_PER_ROW = {1: (1.507, 0.127), 2: (2.295, 0.257), 4: (3.768, 0.503)}
+RESERVED_BLINDING_ROWS = 10
+MIN_LOGROWS, MAX_LOGROWS = 6, 26
+
+def _require_onnx():
+    try:
+        import onnx
+        from onnx import numpy_helper, shape_inference
+    except ImportError as e:
+        raise ImportError("Circuit-cost estimation requires onnx (pip install onnx)") from e
+    return onnx, numpy_helper, shape_inference
+
+# --------------------------- Settings / results ------------------------------
+
+@dataclass
+class CircuitSettings:
+    input_scale: int = 6
+    param_scale: int = 6
+    scale_rebase_multiplier: int = 1
+    num_inner_cols: int = 2
+    decomp_base: int = 16384
+    decomp_legs: int = 4
+    input_visibility: str = "public"
+    output_visibility: str = "public"
+    lookup_range: tuple = None            # None: worst case from input_bounds
+    logrows: int = None                   # configured floor; None: smallest that fits
+    input_bounds: tuple = (0.0, 1.0)
+
+    @classmethod
+    def from_settings_json(cls, path: str, **overrides) -> "CircuitSettings":
+        """Takes scales, columns and lookup range from an ezkl settings.json."""
+        with open(path, "r") as f:
+            ra = json.load(f).get("run_args", {})
+        kw = {k: ra[k] for k in ("input_scale", "param_scale", "scale_rebase_multiplier", "num_inner_cols",
+                                 "decomp_base", "decomp_legs", "logrows") if ra.get(k) is not None}
+        for k in ("input_visibility", "output_visibility"):
+            if isinstance(ra.get(k), str):
+                kw[k] = ra[k].lower()
+        if ra.get("lookup_range") is not None:
+            kw["lookup_range"] = tuple(ra["lookup_range"])
+        kw.update(overrides)
+        return cls(**kw)
+
+@dataclass
+class CircuitEstimate:
+    model: str
+    op_counts: dict
+    assignments_by_op: dict
+    total_assignments: int
+    num_rows: int
+    lookups: list
+    range_checks: list
+    lookup_range: tuple
+    lookup_range_source: str              # "settings" | "worst_case"
+    logrows: int
+    logrows_bound: str                    # which requirement set logrows
+    pk_bytes: int
+    vk_bytes: int
+    rebased_elements: int
+    seconds: float
+    settings: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+# --------------------------- Graph walk --------------------------------------
+
+def _elems(shape) -> int:
+    return int(np.prod(shape)) if shape else 1
+
+def _interval(op: str, ins, attrs):
+    """Value interval of a node's first output from its input intervals."""
+    known = [i for i in ins if i is not None]
+    if not known:
+        return None
+    lo = min(i[0] for i in known)
+    hi = max(i[1] for i in known)
+    a = ins[0]
+    b = ins[1] if len(ins) > 1 else None
+    if op in ("Add", "Sub", "Mul", "Div") and a is not None and b is not None:
+        if op == "Add":
+            return a[0] + b[0], a[1] + b[1]
+        if op == "Sub":
+            return a[0] - b[1], a[1] - b[0]
+        if op == "Mul":
+            p = [a[0] * b[0], a[0] * b[1], a[1] * b[0], a[1] * b[1]]
+            return min(p), max(p)
+        if b[0] > 0 or b[1] < 0:
+            q = [a[0] / b[0], a[0] / b[1], a[1] / b[0], a[1] / b[1]]
+            return min(q), max(q)
+        return None
+    if op == "Neg" and a is not None:
+        return -a[1], -a[0]
+    if op == "ReduceSum" and a is not None:
+        n = attrs.get("_reduced", 1)
+        return min(a[0] * n, a[0]), max(a[1] * n, a[1])
+    if op == "Clip" and a is not None:
+        c_lo = ins[1][0] if len(ins) > 1 and ins[1] is not None else -math.inf
+        c_hi = ins[2][1] if len(ins) > 2 and ins[2] is not None else math.inf
+        return min(max(a[0], c_lo), c_hi), max(min(a[1], c_hi), c_lo)
+    if op in ("Max", "Relu") and a is not None:
+        other = b if b is not None else (0.0, 0.0)
+        return max(a[0], other[0]), max(a[1], other[1])
+    if op == "Min" and a is not None and b is not None:
+        return min(a[0], b[0]), min(a[1], b[1])
+    if op == "Abs" and a is not None:
+        m = max(abs(a[0]), abs(a[1]))
+        return (0.0 if a[0] <= 0 <= a[1] else min(abs(a[0]), abs(a[1]))), m
+    if op == "Log" and a is not None:
+        floor = attrs.get("_min_positive", 1e-30)
+        return math.log(max(a[0], floor)), math.log(max(a[1], floor))
+    if op == "Exp" and a is not None:
+        return math.exp(min(a[0], 700.0)), math.exp(min(a[1], 700.0))
+    if op in ("Greater", "GreaterOrEqual", "Less", "LessOrEqual", "Equal"):
+        return 0.0, 1.0
+    if op == "Where":
+        branches = [i for i in ins[1:] if i is not None]
+        if branches:
+            return min(i[0] for i in branches), max(i[1] for i in branches)
+    return lo, hi
+
+def _load(model):
+    onnx, numpy_helper, shape_inference = _require_onnx()
+    name = model if isinstance(model, str) else getattr(model.graph, "name", "model")
+    if isinstance(model, str):
+        model = onnx.load(model)
+    model = shape_inference.infer_shapes(model)
+    shapes = {}
+    for vi in list(model.graph.input) + list(model.graph.value_info) + list(model.graph.output):
+        dims = vi.type.tensor_type.shape.dim
+        shapes[vi.name] = [d.dim_value if d.HasField("dim_value") else 1 for d in dims]
+    consts = {t.name: numpy_helper.to_array(t) for t in model.graph.initializer}
+    return name, model, shapes, consts, numpy_helper
+
+def analyze_graph(model, settings: CircuitSettings = None) -> dict:
+    """
+    Walks the graph once: op histogram, per-class element counts, rebased
+    elements (ezkl rescales when a scale exceeds input_scale * multiplier)
+    and the fixed-point range seen by each lookup table.
+    """
+    settings = settings or CircuitSettings()
+    name, model, shapes, consts, numpy_helper = _load(model)
+    global_scale = settings.input_scale
+    max_scale = settings.input_scale * settings.scale_rebase_multiplier
+
+    scales, intervals = {}, {}
+    init_names = set(consts)
+    for t in model.graph.input:
+        if t.name not in init_names:
+            scales[t.name] = settings.input_scale
+            intervals[t.name] = tuple(settings.input_bounds)
+    for n, v in consts.items():
+        scales[n] = settings.param_scale
+        if v.size:
+            intervals[n] = (float(v.min()), float(v.max()))
+
+    op_counts, elements = {}, {}
+    rebased = 0
+    lookup_ranges = {}
+    for node in model.graph.node:
+        op = node.op_type
+        op_counts[op] = op_counts.get(op, 0) + 1
+        if op == "Constant":
+            for attr in node.attribute:
+                if attr.name == "value":
+                    v = numpy_helper.to_array(attr.t)
+                    consts[node.output[0]] = v
+                    scales[node.output[0]] = settings.param_scale
+                    if v.size:
+                        intervals[node.output[0]] = (float(v.min()), float(v.max()))
+            continue
+
+        ins = [i for i in node.input if i]
+        in_scales = [scales.get(i, global_scale) for i in ins]
+        in_iv = [intervals.get(i) for i in ins]
+        out_shape = shapes.get(node.output[0])
+        in_elems = _elems(shapes.get(ins[0])) if ins and shapes.get(ins[0]) is not None else 1
+        out_elems = _elems(out_shape) if out_shape is not None else in_elems
+
+        # fixed-point scale of the output
+        if op == "Mul":
+            out_scale = sum(in_scales[:2])
+        elif op in ("Greater", "GreaterOrEqual", "Less", "LessOrEqual", "Equal"):
+            out_scale = 0
+        elif op == "Where":
+            out_scale = max(in_scales[1:] or [0])
+        elif op in ("Div", "Log", "Exp", "Clip", "Abs", "Neg"):
+            out_scale = in_scales[0] if in_scales else global_scale
+        else:
+            out_scale = max(in_scales) if in_scales else global_scale
+
+        if op in FREE_OPS or op not in OP_CLASSES:
+            cls = None
+        elif op == "Div" and len(ins) > 1 and ins[1] in consts:
+            cls = "div_const"
+        elif op == "Clip":
+            bounds = [i for i in ins[1:] if i]
+            cls = "clip" if len(bounds) >= 2 else "max"
+        else:
+            cls = OP_CLASSES[op]
+        if cls is not None:
+            n = in_elems if cls == "reduce_sum" else max(out_elems, 1)
+            elements[cls] = elements.get(cls, 0) + n
+
+        if op in LOOKUP_TABLES and in_iv and in_iv[0] is not None:
+            lo, hi = in_iv[0]
+            if op == "Log":
+                # smallest positive fixed-point value at this scale
+                lo = max(lo, 2.0 ** -in_scales[0])
+            f = 2.0 ** in_scales[0]
+            table = LOOKUP_TABLES[op]
+            prev = lookup_ranges.get(table, (math.inf, -math.inf))
+            lookup_ranges[table] = (min(prev[0], math.floor(lo * f)), max(prev[1], math.ceil(hi * f)))
+
+        attrs = {}
+        if op == "ReduceSum" and ins and shapes.get(ins[0]) is not None:
+            attrs["_reduced"] = max(in_elems // max(out_elems, 1), 1)
+        if op == "Log" and in_scales:
+            attrs["_min_positive"] = 2.0 ** -in_scales[0]
+        iv = _interval(op, in_iv, attrs)
+
+        if cls is not None and out_scale > max_scale:
+            rebased += out_elems
+            out_scale = global_scale
+        for o in node.output:
+            scales[o] = out_scale
+            if iv is not None:
+                intervals[o] = iv
+
+    in_elems = sum(_elems(shapes.get(t.name)) for t in model.graph.input if t.name not in init_names)
+    out_elems = sum(_elems(shapes.get(t.name)) for t in model.graph.output)
+    return {
+        "model": name,
+        "op_counts": dict(sorted(op_counts.items(), key=lambda kv: -kv[1])),
+        "elements": elements,
+        "rebased": rebased,
+        "input_elements": in_elems,
+        "output_elements": out_elems,
+        "lookup_ranges": lookup_ranges,
+    }
+
+def cost_features(analysis: dict, settings: CircuitSettings) -> dict:
+    """Element counts per COST_TABLE key (the linear model's features)."""
+    feats = {k: 0.0 for k in COST_TABLE}
+    feats.update({k: float(v) for k, v in analysis["elements"].items()})
+    feats["rebase"] = float(analysis["rebased"])
+    feats["input"] = float(analysis["input_elements"]) if settings.input_visibility != "fixed" else 0.0
+    feats["output"] = float(analysis["output_elements"]) if settings.output_visibility != "fixed" else 0.0
+    return feats
+
+# --------------------------- Estimate ----------------------------------------
+
+def _logrows_for(n: int) -> int:
+    return int(math.ceil(math.log2(max(n, 1) + RESERVED_BLINDING_ROWS)))
+
+def _per_row(table: dict, inner_cols: int):
+    """Piecewise-linear in num_inner_cols, extrapolating the last measured segment."""
+    cols = sorted(table)
+    if inner_cols in table:
+        return table[inner_cols]
+    lo = max([c for c in cols if c < inner_cols] or cols[:1])
+    hi = min([c for c in cols if c > inner_cols] or cols[-1:])
+    if lo == hi:
+        lo, hi = cols[-2], cols[-1]
+    t = (inner_cols - lo) / (hi - lo)
+    return tuple(table[lo][i] + t * (table[hi][i] - table[lo][i]) for i in (0, 1))
+
+def estimate_circuit(model, settings: CircuitSettings = None, cost_table: dict = None) -> CircuitEstimate:
+    t0 = time.perf_counter()
+    settings = settings or CircuitSettings()
+    table = dict(COST_TABLE, **(cost_table or {}))
+    analysis = analyze_graph(model, settings)
+    feats = cost_features(analysis, settings)
+
+    by_op = {k: int(round(table[k] * v)) for k, v in feats.items() if v}
+    total = int(sum(by_op.values()))
+    num_rows = total // max(settings.num_inner_cols, 1)
+
+    lookups = sorted(analysis["lookup_ranges"])
+    range_checks = [[-1, 1], [0, 1], [0, settings.decomp_base - 1]]
+    if settings.lookup_range is not None:
+        lookup_range, source = tuple(int(x) for x in settings.lookup_range), "settings"
+    elif lookups:
+        lo = min(r[0] for r in analysis["lookup_ranges"].values())
+        hi = max(r[1] for r in analysis["lookup_ranges"].values())
+        lookup_range, source = (int(min(lo, 0)), int(max(hi, 0))), "worst_case"
+    else:
+        lookup_range, source = (0, 0), "worst_case"
+
+    bounds = {
+        "rows": _logrows_for(num_rows),
+        "lookup": _logrows_for(lookup_range[1] - lookup_range[0] + 1),
+        "range_check": _logrows_for(max(hi - lo + 1 for lo, hi in range_checks)),
+    }
+    if settings.logrows is not None:
+        bounds["configured"] = int(settings.logrows)
+    bound = max(bounds, key=bounds.get)
+    logrows = min(max(bounds[bound], MIN_LOGROWS), MAX_LOGROWS)
+
+    def _bytes(per_row):
+        base, per_lookup = _per_row(per_row, settings.num_inner_cols)
+        return int((base + per_lookup * len(lookups)) * (1 << logrows))
+
+    return CircuitEstimate(
+        model=str(analysis["model"]),
+        op_counts=analysis["op_counts"],
+        assignments_by_op=by_op,
+        total_assignments=total,
+        num_rows=num_rows,
+        lookups=lookups,
+        range_checks=range_checks,
+        lookup_range=lookup_range,
+        lookup_range_source=source,
+        logrows=logrows,
+        logrows_bound=bound,
+        pk_bytes=_bytes(PK_BYTES_PER_ROW),
+        vk_bytes=_bytes(VK_BYTES_PER_ROW),
+        rebased_elements=int(analysis["rebased"]),
+        seconds=time.perf_counter() - t0,
+        settings=asdict(settings),
+    )
+
+def check_budget(est: CircuitEstimate, max_logrows: int = None, max_pk_bytes: int = None,
+                 max_rows: int = None) -> list:
+    """Reasons to reject the variant; empty when it fits."""
+    reasons = []
+    if max_logrows is not None and est.logrows > max_logrows:
+        reasons.append(f"logrows {est.logrows} > {max_logrows} (bound by {est.logrows_bound})")
+    if max_pk_bytes is not None and est.pk_bytes > max_pk_bytes:
+        reasons.append(f"pk {est.pk_bytes / 2**20:,.0f} MB > {max_pk_bytes / 2**20:,.0f} MB")
+    if max_rows is not None and est.num_rows > max_rows:
+        reasons.append(f"num_rows {est.num_rows:,} > {max_rows:,}")
+    return reasons
+
+# --------------------------- Validation against ezkl -------------------------
+
+def _run_args(settings: CircuitSettings):
+    import ezkl
+    ra = ezkl.PyRunArgs()
+    ra.input_visibility = settings.input_visibility
+    ra.param_visibility = "fixed"
+    ra.output_visibility = settings.output_visibility
+    ra.input_scale = settings.input_scale
+    ra.param_scale = settings.param_scale
+    ra.scale_rebase_multiplier = settings.scale_rebase_multiplier
+    ra.num_inner_cols = settings.num_inner_cols
+    ra.decomp_base = settings.decomp_base
+    ra.decomp_legs = settings.decomp_legs
+    ra.check_mode = "safe"
+    if settings.lookup_range is not None:
+        ra.lookup_range = tuple(settings.lookup_range)
+    if settings.logrows is not None:
+        ra.logrows = int(settings.logrows)
+    return ra
+
+def _compare(predicted, actual) -> dict:
+    out = {"predicted": predicted, "actual": actual}
+    if isinstance(actual, (int, float)) and actual:
+        out["rel_error"] = (predicted - actual) / actual
+    return out
+
+def validate_against_ezkl(onnx_path: str, settings: CircuitSettings = None, data_path: str = None,
+                          setup: bool = False, work_dir: str = None) -> dict:
+    """
+    Runs ezkl on the same model: gen_settings, then (with data_path)
+    calibrate_settings(target="resources"), and optionally compile + setup.
+    The estimate is recomputed from the final settings.json, so calibrated
+    scales and lookup range are compared like for like.
+    """
+    import ezkl
+    from ebsl_full_script import run_with_loop
+    settings = settings or CircuitSettings()
+    work_dir = work_dir or os.path.join("zkml_artifacts", "cost_validation")
+    os.makedirs(work_dir, exist_ok=True)
+    stem = os.path.join(work_dir, os.path.splitext(os.path.basename(onnx_path))[0])
+    settings_path = stem + ".settings.json"
+
+    t0 = time.perf_counter()
+    ezkl.gen_settings(model=onnx_path, output=settings_path, py_run_args=_run_args(settings))
+    if data_path:
+        run_with_loop(ezkl.calibrate_settings, data=data_path, model=onnx_path,
+                      settings=settings_path, target="resources")
+    ezkl_s = time.perf_counter() - t0
+    with open(settings_path, "r") as f:
+        actual = json.load(f)
+    est = estimate_circuit(onnx_path, CircuitSettings.from_settings_json(
+        settings_path, input_bounds=settings.input_bounds))
+
+    row = {
+        "model": onnx_path,
+        "calibrated": bool(data_path),
+        "estimate_seconds": est.seconds,
+        "ezkl_seconds": ezkl_s,
+        "num_rows": _compare(est.num_rows, actual["num_rows"]),
+        "logrows": _compare(est.logrows, actual["run_args"]["logrows"]),
+        "lookups": {"predicted": est.lookups,
+                    "actual": sorted(next(iter(l)) for l in actual.get("required_lookups", []))},
+    }
+    if setup:
+        compiled = stem + ".compiled"
+        logrows = actual["run_args"]["logrows"]
+        ezkl.compile_circuit(model=onnx_path, compiled_circuit=compiled, settings_path=settings_path)
+        srs_path = os.path.join(work_dir, f"kzg{logrows}.srs")
+        if not os.path.exists(srs_path):
+            ezkl.gen_srs(srs_path, logrows)
+        run_with_loop(ezkl.setup, model=compiled, vk_path=stem + ".vk", pk_path=stem + ".pk", srs_path=srs_path)
+        row["pk_bytes"] = _compare(est.pk_bytes, os.path.getsize(stem + ".pk"))
+        row["vk_bytes"] = _compare(est.vk_bytes, os.path.getsize(stem + ".vk"))
+        os.remove(stem + ".pk")
+    return row
+
+def fit_cost_table(onnx_paths, settings_list) -> dict:
+    """
+    Least-squares refit of COST_TABLE from ezkl gen_settings total_assignments
+    over (model, settings) pairs; negative weights are clipped to zero.
+    """
+    import ezkl
+    keys = list(COST_TABLE)
+    X, y = [], []
+    for path in onnx_paths:
+        for settings in settings_list:
+            out = path + ".fit.settings.json"
+            ezkl.gen_settings(model=path, output=out, py_run_args=_run_args(settings))
+            with open(out, "r") as f:
+                y.append(json.load(f)["total_assignments"])
+            os.remove(out)
+            feats = cost_features(analyze_graph(path, settings), settings)
+            X.append([feats[k] for k in keys])
+    coef, *_ = np.linalg.lstsq(np.asarray(X), np.asarray(y, dtype=np.float64), rcond=None)
+    return {k: round(max(float(c), 0.0), 2) for k, c in zip(keys, coef)}
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Static EZKL circuit-cost estimate for ONNX models")
+    ap.add_argument("models", nargs="+", help="Exported ONNX model(s)")
+    ap.add_argument("--settings", help="Take scales / columns / lookup range / logrows from an ezkl settings.json")
+    ap.add_argument("--input-scale", type=int, default=6)
+    ap.add_argument("--param-scale", type=int, default=None)
+    ap.add_argument("--scale-rebase-multiplier", type=int, default=1)
+    ap.add_argument("--num-inner-cols", type=int, default=2)
+    ap.add_argument("--lookup-range", type=int, nargs=2, default=None,
+                    help="Fixed lookup range (default: worst case over --input-bounds)")
+    ap.add_argument("--input-bounds", type=float, nargs=2, default=(0.0, 1.0))
+    ap.add_argument("--logrows", type=int, default=None, help="Configured logrows floor")
+    ap.add_argument("--max-logrows", type=int, default=None, help="Reject variants above this")
+    ap.add_argument("--max-pk-mb", type=float, default=None, help="Reject variants above this")
+    ap.add_argument("--validate", action="store_true", help="Compare against ezkl gen_settings")
+    ap.add_argument("--calibration-data", help="input.json: validate against calibrate_settings output")
+    ap.add_argument("--validate-setup", action="store_true", help="Also run setup to compare pk / vk size")
+    ap.add_argument("--fit", action="store_true", help="Refit COST_TABLE on the given models and print it")
+    ap.add_argument("--json", help="Write estimates (and validation rows) here")
+    args = ap.parse_args()
+
+    if args.settings:
+        settings = CircuitSettings.from_settings_json(args.settings, input_bounds=tuple(args.input_bounds))
+    else:
+        settings = CircuitSettings(input_scale=args.input_scale,
+                                   param_scale=args.param_scale if args.param_scale is not None else args.input_scale,
+                                   scale_rebase_multiplier=args.scale_rebase_multiplier,
+                                   num_inner_cols=args.num_inner_cols,
+                                   lookup_range=tuple(args.lookup_range) if args.lookup_range else None,
+                                   input_bounds=tuple(args.input_bounds),
+                                   logrows=args.logrows)
+    if args.fit:
+        table = fit_cost_table(args.models, [settings, CircuitSettings(**dict(
+            asdict(settings), scale_rebase_multiplier=settings.scale_rebase_multiplier + 1))])
+        print(json.dumps(table, indent=2))
+        return
+    max_pk = int(args.max_pk_mb * 2**20) if args.max_pk_mb is not None else None
+
+    results, rejected = [], 0
+    for path in args.models:
+        est = estimate_circuit(path, settings)
+        reasons = check_budget(est, args.max_logrows, max_pk)
+        status = "[✗]" if reasons else "[✓]"
+        print(f"{status} {path}: {est.num_rows:,} rows, logrows {est.logrows} ({est.logrows_bound}), "
+              f"pk ~{est.pk_bytes / 2**20:,.0f} MB, lookups {est.lookups or '-'} "
+              f"[{est.seconds * 1e3:.1f} ms]")
+        print(f"    ops: {est.op_counts}")
+        for r in reasons:
+            print(f"    {r}")
+        rejected += bool(reasons)
+        out = {"estimate": est.to_dict(), "rejected": reasons}
+        if args.validate or args.calibration_data or args.validate_setup:
+            row = validate_against_ezkl(path, settings, args.calibration_data, args.validate_setup)
+            print("    ezkl: " + ", ".join(f"{k} {v['predicted']:,} vs {v['actual']:,}"
+                                          for k, v in row.items() if isinstance(v, dict) and "rel_error" in v))
+            out["validation"] = row
+        results.append(out)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    sys.exit(1 if rejected else 0)
+
+if __name__ == "__main__":
+    main()
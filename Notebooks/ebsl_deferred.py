@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Score now, prove later
+- score(): torch EBslFusionModule forward on one user's combined_input row,
+  returned at once with a commitment (sha256 of the float32 row, the same hash
+  the epoch manifest uses) and the circuit fingerprint it will be proved against
+- The exact input row is written to disk and a proof job is pushed onto a
+  persistent SQLite queue, so pending jobs survive restarts
+- Jobs are deduplicated on (user, input hash, circuit): re-scoring unchanged
+  inputs reuses the queued or finished job, a new input supersedes the user's
+  older queued job
+- claim() promotes a user's job to the claim class; a worker always proves claim
+  jobs first and only takes idle-class jobs while the machine is idle (1-minute
+  load average under --idle-load)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+import numpy as np
+
+from ebsl_epoch import hash_inputs, circuit_fingerprint, user_stem
+
+PRIORITY_CLAIM = 0
+PRIORITY_IDLE = 1
+DEFAULT_WD = "zkml_artifacts"
+DEFAULT_QUEUE = os.path.join(DEFAULT_WD, "proof_queue.sqlite")
+DEFAULT_MAX_ATTEMPTS = 3
+STALE_RUNNING_SECONDS = 3600.0      # a "running" job older than this lost its worker
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL,                -- queued | running | done | failed | superseded
+    provisional_rep REAL,
+    proved_rep REAL,
+    proof_path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    UNIQUE (user_id, input_hash, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority, enqueued_at);
+"""
+
+# --------------------------- Persistent queue --------------------------------
+
+class ProofQueue:
+    """Proof jobs in one SQLite file; safe to share between a scoring process and prover workers."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _tx(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, user_id: str, input_hash: str, fingerprint: str, input_path: str,
+                priority: int = PRIORITY_IDLE, provisional_rep: float = None) -> sqlite3.Row:
+        """
+        Returns the user's job for this input: an existing one (priority raised
+        if needed, revived if failed / superseded) or a new one. Any other queued
+        job of the user is superseded, so only the latest input gets proved.
+        """
+        now = time.time()
+        self._tx()
+        try:
+            row = self.db.execute("SELECT * FROM jobs WHERE user_id=? AND input_hash=? AND fingerprint=?",
+                                  (user_id, input_hash, fingerprint)).fetchone()
+            if row is None:
+                job_id = self.db.execute(
+                    "INSERT INTO jobs (user_id, input_hash, fingerprint, input_path, priority, state, "
+                    "provisional_rep, enqueued_at) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                    (user_id, input_hash, fingerprint, input_path, priority, provisional_rep, now)).lastrowid
+            else:
+                job_id = row["id"]
+                if row["state"] in ("failed", "superseded"):
+                    # scored again: give it another chance
+                    self.db.execute("UPDATE jobs SET state='queued', priority=?, attempts=0, error=NULL, "
+                                    "enqueued_at=? WHERE id=?", (priority, now, job_id))
+                elif priority < row["priority"]:
+                    self.db.execute("UPDATE jobs SET priority=? WHERE id=?", (priority, job_id))
+            self.db.execute("UPDATE jobs SET state='superseded', finished_at=? "
+                            "WHERE user_id=? AND state='queued' AND id!=?", (now, user_id, job_id))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return self.get(user_id, input_hash, fingerprint)
+
+    def get(self, user_id: str, input_hash: str = None, fingerprint: str = None) -> Optional[sqlite3.Row]:
+        """A specific job, or the user's most recently enqueued live one."""
+        if input_hash is not None:
+            return self.db.execute("SELECT * FROM jobs WHERE user_id=? AND input_hash=? AND fingerprint=?",
+                                   (user_id, input_hash, fingerprint)).fetchone()
+        return self.db.execute("SELECT * FROM jobs WHERE user_id=? AND state!='superseded' "
+                               "ORDER BY enqueued_at DESC LIMIT 1", (user_id,)).fetchone()
+
+    def promote(self, user_id: str) -> Optional[sqlite3.Row]:
+        """Moves the user's latest queued job to the claim class."""
+        self.db.execute("UPDATE jobs SET priority=? WHERE id=(SELECT id FROM jobs WHERE user_id=? AND state='queued' "
+                        "ORDER BY enqueued_at DESC, id DESC LIMIT 1)", (PRIORITY_CLAIM, user_id))
+        return self.get(user_id)
+
+    def take(self, max_priority: int = PRIORITY_IDLE) -> Optional[sqlite3.Row]:
+        """Atomically marks the best queued job with priority <= max_priority as running."""
+        self._tx()
+        try:
+            row = self.db.execute("SELECT * FROM jobs WHERE state='queued' AND priority<=? "
+                                  "ORDER BY priority, enqueued_at LIMIT 1", (max_priority,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE jobs SET state='running', started_at=?, attempts=attempts+1 WHERE id=?",
+                                (time.time(), row["id"]))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return row
+
+    def complete(self, job_id: int, proof_path: str, proved_rep: float = None) -> None:
+        self.db.execute("UPDATE jobs SET state='done', proof_path=?, proved_rep=?, error=NULL, finished_at=? "
+                        "WHERE id=?", (proof_path, proved_rep, time.time(), job_id))
+
+    def fail(self, job_id: int, error: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> None:
+        """Back to the queue until max_attempts, then failed."""
+        self.db.execute("UPDATE jobs SET state=CASE WHEN attempts>=? THEN 'failed' ELSE 'queued' END, "
+                        "error=?, finished_at=? WHERE id=?", (max_attempts, error, time.time(), job_id))
+
+    def requeue_stale(self, older_than: float = STALE_RUNNING_SECONDS) -> int:
+        cur = self.db.execute("UPDATE jobs SET state='queued' WHERE state='running' AND started_at<?",
+                              (time.time() - older_than,))
+        return cur.rowcount
+
+    def counts(self) -> dict:
+        out = {}
+        for r in self.db.execute("SELECT state, priority, COUNT(*) AS n FROM jobs GROUP BY state, priority"):
+            cls = "claim" if r["priority"] == PRIORITY_CLAIM else "idle"
+            out[f"{r['state']}_{cls}"] = r["n"]
+        return out
+
+# --------------------------- Score now / prove later -------------------------
+
+@dataclass
+class ProvisionalScore:
+    user_id: str
+    fused: List[float]          # [b, d, u, a] from torch, not yet proved
+    rep: float
+    commitment: str             # sha256 of the float32 input row that will be proved
+    circuit_fingerprint: str
+    proof_state: str            # queued | running | done | failed
+    proof_path: Optional[str]
+    job_id: int
+
+def _proved_rep(proof_path: str) -> Optional[float]:
+    """rep as rescaled in the proof's public outputs, when ezkl wrote them."""
+    try:
+        with open(proof_path, "r") as f:
+            outputs = json.load(f)["pretty_public_inputs"]["rescaled_outputs"]
+        return float(outputs[-1][0])
+    except (OSError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+class DeferredProver:
+    """
+    Reuses the compiled circuit / pk / vk / SRS in `wd` (built by ebsl_full_script).
+    max_opinions must match the circuit's input width.
+    """
+    def __init__(self, wd: str = DEFAULT_WD, queue: ProofQueue = None, max_opinions: int = 16, logger=None):
+        from ebsl_torch import EBslFusionModule
+
+        self.wd = os.path.abspath(wd)
+        self.settings_path = os.path.join(self.wd, "settings.json")
+        self.compiled_path = os.path.join(self.wd, "compiled.onnx")
+        self.pk_path = os.path.join(self.wd, "model.pk")
+        self.vk_path = os.path.join(self.wd, "model.vk")
+        self.srs_path = os.path.join(self.wd, "kzg.srs")
+        self.inputs_dir = os.path.join(self.wd, "deferred_inputs")
+        self.proofs_dir = os.path.join(self.wd, "deferred_proofs")
+        os.makedirs(self.inputs_dir, exist_ok=True)
+        os.makedirs(self.proofs_dir, exist_ok=True)
+        self.queue = queue if queue is not None else ProofQueue(os.path.join(self.wd, "proof_queue.sqlite"))
+        self.fingerprint = circuit_fingerprint(self.settings_path, self.compiled_path, self.vk_path)
+        self.max_opinions = max_opinions
+        self.module = EBslFusionModule(max_opinions).eval()
+        self.logger = logger
+
+    def _log(self, level: str, msg: str) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(msg)
+
+    def score(self, user_id, combined_row, claim: bool = False) -> ProvisionalScore:
+        import torch
+
+        row = np.asarray(combined_row, dtype=np.float32).reshape(-1)
+        if row.shape[0] != self.max_opinions * 5:
+            raise ValueError(f"combined_input row must have {self.max_opinions * 5} values, got {row.shape[0]}")
+        with torch.no_grad():
+            fused, rep = self.module(torch.from_numpy(row)[None])
+        user_id = str(user_id)
+        commitment = hash_inputs(row)[0]
+        input_path = os.path.join(self.inputs_dir, f"{user_stem(user_id)}-{commitment[:16]}.json")
+        if not os.path.exists(input_path):
+            tmp = input_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"input_data": [row.tolist()], "input_shapes": [[row.shape[0]]]}, f)
+            os.replace(tmp, input_path)
+        job = self.queue.enqueue(user_id, commitment, self.fingerprint, input_path,
+                                 PRIORITY_CLAIM if claim else PRIORITY_IDLE, float(rep[0, 0]))
+        return ProvisionalScore(user_id, fused[0].tolist(), float(rep[0, 0]), commitment, self.fingerprint,
+                                job["state"], job["proof_path"], job["id"])
+
+    def claim(self, user_id) -> Optional[dict]:
+        """User started a claim: prove their latest input next. Returns the job's current state."""
+        job = self.queue.promote(str(user_id))
+        return dict(job) if job is not None else None
+
+    def prove_job(self, job: sqlite3.Row) -> bool:
+        import ezkl
+        from ebsl_full_script import run_with_loop
+
+        stem = os.path.splitext(os.path.basename(job["input_path"]))[0]
+        witness_path = os.path.join(self.proofs_dir, f"{stem}.witness.json")
+        proof_path = os.path.join(self.proofs_dir, f"{stem}.pf")
+        t0 = time.perf_counter()
+        try:
+            if job["fingerprint"] != self.fingerprint:
+                raise RuntimeError("circuit changed since the job was queued; re-score the user")
+            if not run_with_loop(ezkl.gen_witness, data=job["input_path"], model=self.compiled_path,
+                                 output=witness_path):
+                raise RuntimeError("gen_witness failed")
+            if not run_with_loop(ezkl.prove, witness=witness_path, model=self.compiled_path, pk_path=self.pk_path,
+                                 proof_path=proof_path, srs_path=self.srs_path):
+                raise RuntimeError("prove failed")
+        except Exception as e:
+            self.queue.fail(job["id"], repr(e))
+            self._log("warn", f"user {job['user_id']}: {e}")
+            return False
+        finally:
+            if os.path.exists(witness_path):
+                os.remove(witness_path)
+        proved = _proved_rep(proof_path)
+        self.queue.complete(job["id"], proof_path, proved)
+        cls = "claim" if job["priority"] == PRIORITY_CLAIM else "idle"
+        drift = f", |proved - provisional| {abs(proved - job['provisional_rep']):.4f}" \
+            if proved is not None and job["provisional_rep"] is not None else ""
+        self._log("ok", f"user {job['user_id']} [{cls}] proved in {time.perf_counter() - t0:.1f}s{drift}")
+        return True
+
+    def run_worker(self, idle_load: float = 0.5, poll_seconds: float = 1.0, max_jobs: int = None,
+                   exit_when_empty: bool = False) -> int:
+        """Proves claim jobs as they arrive and idle jobs while the load average is under idle_load."""
+        done = 0
+        self.queue.requeue_stale()
+        while max_jobs is None or done < max_jobs:
+            idle = os.getloadavg()[0] < idle_load if hasattr(os, "getloadavg") else True
+            job = self.queue.take(PRIORITY_IDLE if idle else PRIORITY_CLAIM)
+            if job is None:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            self.prove_job(job)
+            done += 1
+        return done
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    from ebsl_full_script import Logger, load_epoch_inputs
+
+    ap = argparse.ArgumentParser(description="Score now, prove later: provisional EBSL scores with a deferred proof queue")
+    ap.add_argument("--wd", default=DEFAULT_WD, help="Directory with compiled circuit, pk, vk and SRS")
+    ap.add_argument("--max-opinions", type=int, default=16, help="Must match the compiled circuit")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sc = sub.add_parser("score", help="Score users from a .npy/.npz of combined_input rows and queue their proofs")
+    sc.add_argument("inputs")
+    sc.add_argument("--claim", action="store_true", help="Queue in the claim class")
+    cl = sub.add_parser("claim", help="Promote users' proof jobs to the claim class")
+    cl.add_argument("user_ids", nargs="+")
+    wk = sub.add_parser("work", help="Run a prover worker")
+    wk.add_argument("--idle-load", type=float, default=0.5, help="Run idle-class jobs only under this 1-min load average")
+    wk.add_argument("--max-jobs", type=int, default=None)
+    wk.add_argument("--exit-when-empty", action="store_true", help="Stop when no job is runnable right now")
+    sub.add_parser("status", help="Queue counts per state and class")
+    args = ap.parse_args()
+
+    logger = Logger()
+    prover = DeferredProver(args.wd, max_opinions=args.max_opinions, logger=logger)
+    if args.cmd == "score":
+        combined, user_ids = load_epoch_inputs(args.inputs)
+        user_ids = user_ids or range(combined.shape[0])
+        t0 = time.perf_counter()
+        scores = [prover.score(uid, row, claim=args.claim) for uid, row in zip(user_ids, combined)]
+        dt = time.perf_counter() - t0
+        with open(os.path.join(prover.wd, "provisional_scores.json"), "w") as f:
+            json.dump([asdict(s) for s in scores], f, indent=2)
+        logger.ok(f"Scored {len(scores)} users in {dt * 1000:.1f}ms ({dt * 1000 / max(len(scores), 1):.2f}ms each); "
+                  f"proofs deferred")
+    elif args.cmd == "claim":
+        for uid in args.user_ids:
+            job = prover.claim(uid)
+            if job is None:
+                logger.warn(f"user {uid}: nothing scored yet")
+            else:
+                logger.ok(f"user {uid}: proof {job['state']}" + (f" -> {job['proof_path']}" if job["proof_path"] else ""))
+    elif args.cmd == "work":
+        n = prover.run_worker(idle_load=args.idle_load, max_jobs=args.max_jobs, exit_when_empty=args.exit_when_empty)
+        logger.ok(f"Worker finished {n} jobs")
+    print(json.dumps(prover.queue.counts(), indent=2))
+
+if __name__ == "__main__":
+    main()
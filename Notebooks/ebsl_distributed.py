@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Distributed EBSL fusion over torch.distributed (gloo, CPU)
+- The graph is stored once as a target-sorted CSR directory (offsets.npy [N+1],
+  opinions.npy [E, 4]); rank 0 reads only offsets to split the target id range
+  into contiguous blocks balanced by incoming attestations and broadcasts the bounds
+- Every rank memory-maps and loads only its own shard, fuses it with
+  ebsl_torch.EBSLAlgorithm.fuse_segments, and the per-rank reputation blocks are
+  all-gathered into one [N] reputation vector
+- One box: --nprocs N spawns local workers; several nodes: launch this script
+  with torchrun (env:// rendezvous, RANK / WORLD_SIZE / MASTER_ADDR)
+- --scaling 1,2,4 runs the same graph at each world size and reports strong
+  scaling efficiency T1 / (p * Tp) per phase
+"""
+
+import os
+import json
+import time
+import socket
+import argparse
+import tempfile
+from dataclasses import dataclass, field, asdict
+
+import numpy as np
+import torch
+import torch.distributed as dist
+
+from ebsl_torch import EBSLAlgorithm
+
+DEFAULT_REPORT = os.path.join("zkml_artifacts", "distributed_scaling.json")
+DEFAULT_GRAPH_DIR = os.path.join("zkml_artifacts", "distributed_graph")
+PHASES = ("partition", "load", "fuse", "gather")
+
+# --------------------------- Graph input -------------------------------------
+
+@dataclass
+class AttestationGraph:
+    dst: np.ndarray          # int64 [E] target ids
+    opinions: np.ndarray     # float32 [E, 4] = [b, d, u, a]
+    num_nodes: int
+
+    def __len__(self):
+        return self.dst.shape[0]
+
+def synthetic_graph(num_nodes: int, num_edges: int, seed: int = 1337) -> AttestationGraph:
+    """Power-law in-degree so a few targets get thousands of attestations."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, num_nodes + 1) ** 0.8
+    dst = rng.choice(num_nodes, size=num_edges, p=weights / weights.sum()).astype(np.int64)
+    b = rng.uniform(0.0, 0.6, num_edges)
+    d = rng.uniform(0.0, 1.0 - b)
+    u = 1.0 - b - d
+    a = rng.uniform(0.0, 1.0, num_edges)
+    return AttestationGraph(dst, np.stack([b, d, u, a], axis=1).astype(np.float32), num_nodes)
+
+def load_graph(path: str, index_path: str = None) -> AttestationGraph:
+    """.npz (dst, opinions[, num_nodes]) or a CSV / Parquet export via ebsl_loader."""
+    if path.endswith(".npz"):
+        z = np.load(path)
+        dst = z["dst"].astype(np.int64)
+        num_nodes = int(z["num_nodes"]) if "num_nodes" in z else int(dst.max()) + 1
+        return AttestationGraph(dst, z["opinions"].astype(np.float32), num_nodes)
+    from ebsl_loader import IdentityIndex, stream_attestations
+    index = IdentityIndex(index_path)
+    dsts, ops = [], []
+    for batch in stream_attestations(path, index):
+        dsts.append(batch.dst)
+        ops.append(batch.opinions)
+    return AttestationGraph(np.concatenate(dsts), np.concatenate(ops), len(index))
+
+def save_graph(graph: AttestationGraph, path: str) -> None:
+    """Target-sorted CSR directory: offsets.npy [N+1] int64, opinions.npy [E, 4] float32."""
+    os.makedirs(path, exist_ok=True)
+    order = np.argsort(graph.dst, kind="stable")
+    offsets = np.zeros(graph.num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(graph.dst, minlength=graph.num_nodes), out=offsets[1:])
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "opinions.npy"), graph.opinions[order])
+
+def graph_offsets(path: str) -> np.ndarray:
+    """Memory-mapped CSR offsets [N+1] of a save_graph directory."""
+    return np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+
+def load_shard(path: str, lo: int, hi: int):
+    """Targets [lo, hi) of a save_graph directory: (offsets [hi-lo+1] from 0, opinions [e, 4])."""
+    offsets = np.array(graph_offsets(path)[lo:hi + 1])
+    ops = np.load(os.path.join(path, "opinions.npy"), mmap_mode="r")[offsets[0]:offsets[-1]]
+    return offsets - offsets[0], np.array(ops, dtype=np.float32)
+
+# --------------------------- Partitioning ------------------------------------
+
+def partition_targets(offsets: np.ndarray, world_size: int) -> np.ndarray:
+    """Contiguous target blocks [bounds[r], bounds[r+1]) with ~equal attestation counts."""
+    num_nodes = offsets.shape[0] - 1
+    cum = np.asarray(offsets[1:])
+    if world_size == 1 or cum.size == 0:
+        return np.array([0] + [num_nodes] * world_size, dtype=np.int64)
+    quantiles = cum[-1] * np.arange(1, world_size) / world_size
+    cuts = np.searchsorted(cum, quantiles, side="left") + 1
+    return np.concatenate([[0], np.minimum(cuts, num_nodes), [num_nodes]]).astype(np.int64)
+
+# --------------------------- Worker ------------------------------------------
+
+def fuse_distributed(graph_path: str):
+    """
+    Collective: call on every rank of an initialized gloo group with the same
+    save_graph directory. Rank 0 reads the offsets to partition; each rank then
+    loads only its own targets' attestations. Returns (rep [N] float32 on every
+    rank, per-phase seconds, local edge count).
+    """
+    rank, world = dist.get_rank(), dist.get_world_size()
+    timings = {}
+
+    t0 = time.perf_counter()
+    if rank == 0:
+        bounds = torch.from_numpy(partition_targets(graph_offsets(graph_path), world))
+    else:
+        bounds = torch.empty(world + 1, dtype=torch.int64)
+    dist.broadcast(bounds, src=0)
+    bounds = bounds.numpy()
+    lo, hi = int(bounds[rank]), int(bounds[rank + 1])
+    timings["partition"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    offsets, ops = load_shard(graph_path, lo, hi)
+    timings["load"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fused = EBSLAlgorithm.fuse_segments(torch.from_numpy(ops), torch.from_numpy(offsets))
+    local_rep = EBSLAlgorithm.calculate_reputation(fused)
+    timings["fuse"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    widths = np.diff(bounds)
+    padded = torch.zeros(int(widths.max()), dtype=torch.float32)
+    padded[:hi - lo] = local_rep
+    blocks = [torch.empty_like(padded) for _ in range(world)]
+    dist.all_gather(blocks, padded)
+    rep = torch.cat([blk[:w] for blk, w in zip(blocks, widths)])
+    timings["gather"] = time.perf_counter() - t0
+    return rep, timings, ops.shape[0]
+
+def _reduce_timings(timings: dict, edges: int) -> dict:
+    """Slowest rank per phase, plus the attestation imbalance (max / mean)."""
+    t = torch.tensor([timings[p] for p in PHASES], dtype=torch.float64)
+    dist.all_reduce(t, op=dist.ReduceOp.MAX)
+    e_max = torch.tensor([edges], dtype=torch.float64)
+    e_sum = e_max.clone()
+    dist.all_reduce(e_max, op=dist.ReduceOp.MAX)
+    dist.all_reduce(e_sum, op=dist.ReduceOp.SUM)
+    mean = e_sum.item() / dist.get_world_size()
+    return {"phases": dict(zip(PHASES, t.tolist())), "imbalance": e_max.item() / mean if mean else 1.0}
+
+def _worker(rank: int, world: int, init_method: str, graph_path: str, out_path: str,
+            threads_per_rank: int, repeats: int):
+    torch.set_num_threads(threads_per_rank)
+    dist.init_process_group("gloo", init_method=init_method, rank=rank, world_size=world)
+    try:
+        runs = []
+        for _ in range(repeats):
+            dist.barrier()
+            t0 = time.perf_counter()
+            rep, timings, edges = fuse_distributed(graph_path)
+            dist.barrier()
+            wall = time.perf_counter() - t0
+            stats = _reduce_timings(timings, edges)
+            runs.append({"seconds": wall, **stats})
+        if rank == 0 and out_path:
+            best = min(runs, key=lambda r: r["seconds"])
+            np.save(out_path + ".rep.npy", rep.numpy())
+            with open(out_path, "w") as f:
+                json.dump({"world_size": world, **best}, f)
+    finally:
+        dist.destroy_process_group()
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def run_local(graph_path: str, nprocs: int, threads_per_rank: int = 1, repeats: int = 3):
+    """Spawns nprocs gloo workers on a save_graph directory; returns (rank-0 result dict, rep)."""
+    import torch.multiprocessing as mp
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "result.json")
+        init = f"tcp://127.0.0.1:{_free_port()}"
+        mp.spawn(_worker, args=(nprocs, init, graph_path, out_path, threads_per_rank, repeats),
+                 nprocs=nprocs, join=True)
+        with open(out_path) as f:
+            result = json.load(f)
+        return result, np.load(out_path + ".rep.npy")
+
+# --------------------------- Scaling report ----------------------------------
+
+@dataclass
+class ScalingReport:
+    num_nodes: int
+    num_edges: int
+    threads_per_rank: int
+    runs: list = field(default_factory=list)
+    max_abs_diff_vs_single: float = None
+
+    def add(self, result: dict) -> None:
+        base = next((r for r in self.runs if r["world_size"] == 1), None) or result
+        p = result["world_size"]
+        result["speedup"] = base["seconds"] / result["seconds"]
+        result["efficiency"] = result["speedup"] / p
+        result["fuse_efficiency"] = base["phases"]["fuse"] / (p * result["phases"]["fuse"])
+        self.runs.append(result)
+
+    def format_table(self) -> str:
+        head = (f"{'ranks':>5} {'total_s':>9} {'partition':>9} {'load':>9} {'fuse':>9} {'gather':>9} "
+                f"{'speedup':>8} {'eff':>6} {'fuse_eff':>8} {'imbal':>6}")
+        lines = [head, "-" * len(head)]
+        for r in self.runs:
+            ph = r["phases"]
+            lines.append(f"{r['world_size']:>5} {r['seconds']:>9.4f} {ph['partition']:>9.4f} {ph['load']:>9.4f} "
+                         f"{ph['fuse']:>9.4f} {ph['gather']:>9.4f} {r['speedup']:>8.2f} {r['efficiency']:>6.2f} "
+                         f"{r['fuse_efficiency']:>8.2f} {r['imbalance']:>6.2f}")
+        return "\n".join(lines)
+
+def run_scaling(graph_path: str, world_sizes, threads_per_rank: int = 1, repeats: int = 3) -> ScalingReport:
+    offsets = graph_offsets(graph_path)
+    report = ScalingReport(offsets.shape[0] - 1, int(offsets[-1]), threads_per_rank)
+    reference = None
+    for p in sorted(set(world_sizes)):
+        result, rep = run_local(graph_path, p, threads_per_rank, repeats)
+        reference = rep if reference is None else reference
+        diff = float(np.max(np.abs(rep - reference))) if rep.size else 0.0
+        report.max_abs_diff_vs_single = max(report.max_abs_diff_vs_single or 0.0, diff)
+        report.add(result)
+    return report
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Distributed EBSL fusion over torch.distributed (gloo)")
+    ap.add_argument("--input", help="save_graph directory, .npz graph or CSV / Parquet attestation export")
+    ap.add_argument("--synthetic-nodes", type=int, default=100_000)
+    ap.add_argument("--synthetic-edges", type=int, default=2_000_000)
+    ap.add_argument("--seed", type=int, default=1337)
+    ap.add_argument("--nprocs", type=int, default=2, help="Local worker processes (ignored under torchrun)")
+    ap.add_argument("--threads-per-rank", type=int, default=1)
+    ap.add_argument("--repeats", type=int, default=3, help="Runs per world size; the fastest is reported")
+    ap.add_argument("--scaling", help="Comma-separated world sizes, e.g. 1,2,4")
+    ap.add_argument("--graph-dir", default=DEFAULT_GRAPH_DIR,
+                    help="Where non-directory inputs are converted for per-rank loading")
+    ap.add_argument("--report", default=DEFAULT_REPORT)
+    ap.add_argument("--out", default=os.path.join("zkml_artifacts", "reputation_distributed.npy"))
+    args = ap.parse_args()
+
+    torchrun = "RANK" in os.environ and "WORLD_SIZE" in os.environ
+    graph_path = args.input
+    if graph_path is None or not os.path.isdir(graph_path):
+        # ranks load their own shards from a CSR directory; other inputs are converted once,
+        # before (and outside) the timed runs. Under torchrun the directory must be on a
+        # path every node can read.
+        if not (torchrun and os.environ["RANK"] != "0"):
+            graph = load_graph(graph_path) if graph_path else synthetic_graph(
+                args.synthetic_nodes, args.synthetic_edges, args.seed)
+            save_graph(graph, args.graph_dir)
+            del graph
+        graph_path = args.graph_dir
+
+    if torchrun:
+        # torchrun: this process is one rank; results land on rank 0
+        rank, world = int(os.environ["RANK"]), int(os.environ["WORLD_SIZE"])
+        _worker(rank, world, "env://", graph_path, args.report if rank == 0 else None,
+                args.threads_per_rank, args.repeats)
+        if rank == 0:
+            os.replace(args.report + ".rep.npy", args.out)
+            print(f"[✓] {world} ranks -> {args.out} ({args.report})")
+        return
+
+    if args.scaling:
+        report = run_scaling(graph_path, [int(p) for p in args.scaling.split(",")],
+                             args.threads_per_rank, args.repeats)
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump(asdict(report), f, indent=2)
+        print(report.format_table())
+        print(f"[✓] {report.num_edges:,} attestations over {report.num_nodes:,} targets; "
+              f"max |rep - rep(1 rank)| = {report.max_abs_diff_vs_single:.2e}")
+        print(f"[✓] Scaling report: {args.report}")
+        return
+
+    result, rep = run_local(graph_path, args.nprocs, args.threads_per_rank, args.repeats)
+    np.save(args.out, rep)
+    print(f"[✓] {args.nprocs} ranks: {result['seconds']:.4f}s "
+          f"(fuse {result['phases']['fuse']:.4f}s, imbalance {result['imbalance']:.2f}) -> {args.out}")
+
+if __name__ == "__main__":
+    main()
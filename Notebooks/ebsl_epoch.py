@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Epoch manifests for incremental re-proving
+- Content hash of each user's combined_input row (opinions + mask, float32 bytes)
+- Circuit fingerprint (settings + compiled circuit + vk) so proofs are only reused
+  against the exact circuit they were made for
+- Diff against the previous epoch: only new/changed users are scheduled for
+  witness generation and proving; everyone else keeps their proof
+- Users missing from the epoch's inputs are pruned from the manifest
+"""
+
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+MANIFEST_VERSION = 1
+
+# --------------------------- Hashing -----------------------------------------
+
+def hash_inputs(combined_inputs) -> List[str]:
+    """sha256 hex digest of each (users, max_opinions*5) row as little-endian float32."""
+    rows = np.ascontiguousarray(np.asarray(combined_inputs), dtype="<f4")
+    if rows.ndim == 1:
+        rows = rows[None]
+    w = rows.shape[1] * 4
+    mv = memoryview(rows).cast("B")
+    return [hashlib.sha256(mv[i * w:(i + 1) * w]).hexdigest() for i in range(rows.shape[0])]
+
+def user_stem(user_id) -> str:
+    """Filesystem-safe name per user; the uid hash keeps "a/b" and "a_b" apart."""
+    uid = str(user_id)
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", uid)[:64]
+    return f"{safe}-{hashlib.sha256(uid.encode()).hexdigest()[:12]}"
+
+def circuit_fingerprint(*paths: str) -> str:
+    """sha256 over the given artifact files (missing files hash as their name only)."""
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(os.path.basename(p).encode())
+        if p and os.path.exists(p):
+            with open(p, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+    return h.hexdigest()
+
+# --------------------------- Manifest ----------------------------------------
+
+class EpochManifest:
+    """
+    JSON file: {"version", "epoch", "circuit_fingerprint",
+                "users": {user_id: {"input_hash", "proof_path", "prove_seconds", "epoch",
+                                    "circuit_fingerprint"}}}
+    """
+    def __init__(self, path: str, epoch: int = 0, fingerprint: Optional[str] = None,
+                 users: Optional[Dict[str, dict]] = None):
+        self.path = path
+        self.epoch = epoch
+        self.fingerprint = fingerprint
+        self.users = users or {}
+
+    @classmethod
+    def load(cls, path: str) -> "EpochManifest":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(path, data.get("epoch", 0), data.get("circuit_fingerprint"), data.get("users", {}))
+
+    def save(self) -> None:
+        """Atomic write so a crash mid-epoch never leaves a truncated manifest."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "epoch": self.epoch,
+                       "circuit_fingerprint": self.fingerprint, "users": self.users}, f)
+        os.replace(tmp, self.path)
+
+    def record(self, user_id: str, input_hash: str, proof_path: str, prove_seconds: float) -> None:
+        self.users[str(user_id)] = {"input_hash": input_hash, "proof_path": proof_path,
+                                    "prove_seconds": prove_seconds, "epoch": self.epoch,
+                                    "circuit_fingerprint": self.fingerprint}
+
+    def prune(self, user_ids) -> Dict[str, dict]:
+        """Drops entries for users not in user_ids; returns the removed entries by user."""
+        keep = {str(u) for u in user_ids}
+        stale = [uid for uid in self.users if uid not in keep]
+        return {uid: self.users.pop(uid) for uid in stale}
+
+    def mean_prove_seconds(self) -> Optional[float]:
+        secs = [u["prove_seconds"] for u in self.users.values() if u.get("prove_seconds")]
+        return float(np.mean(secs)) if secs else None
+
+# --------------------------- Planning ----------------------------------------
+
+@dataclass
+class EpochPlan:
+    to_prove: List[int]                 # row indices into combined_inputs
+    reused: List[int]
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+def plan_epoch(manifest: EpochManifest, user_ids, input_hashes: List[str], fingerprint: str) -> EpochPlan:
+    """Schedules rows whose user is new, whose input hash changed or whose proof is missing."""
+    reasons = {"new": 0, "changed": 0, "missing_proof": 0, "circuit_changed": 0}
+    to_prove, reused = [], []
+    for i, (uid, h) in enumerate(zip(user_ids, input_hashes)):
+        prev = manifest.users.get(str(uid))
+        # per-user fingerprint: an interrupted re-prove after a circuit change stays correct
+        if prev is not None and prev.get("circuit_fingerprint", manifest.fingerprint) != fingerprint:
+            reason = "circuit_changed"
+        elif prev is None:
+            reason = "new"
+        elif prev.get("input_hash") != h:
+            reason = "changed"
+        elif not prev.get("proof_path") or not os.path.exists(prev["proof_path"]):
+            reason = "missing_proof"
+        else:
+            reused.append(i)
+            continue
+        reasons[reason] += 1
+        to_prove.append(i)
+    return EpochPlan(to_prove, reused, reasons)
+
+@dataclass
+class EpochReport:
+    epoch: int
+    users: int
+    reused: int
+    regenerated: int
+    failed: int
+    reasons: dict
+    prove_seconds: float
+    estimated_seconds_saved: Optional[float]
+    pruned: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+def estimate_saved(manifest: EpochManifest, reused: int, measured: List[float]) -> Optional[float]:
+    """Reused proofs times the mean prove time (this epoch if measured, else history)."""
+    mean = float(np.mean(measured)) if measured else manifest.mean_prove_seconds()
+    return None if mean is None else reused * mean
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Evidence-space (r, s) opinion encoding for EBSL trust stores
+- Stores positive/negative evidence counts instead of [b, d, u, a] float32 rows
+- Compact dtypes (float16 / uint16 / uint32) with one base rate per graph
+- Cumulative fusion is evidence addition; b, d, u are derived only when needed
+
+Mapping with non-informative prior weight W (default 2):
+    b = r / (r + s + W),  d = s / (r + s + W),  u = W / (r + s + W)
+    r = W * b / u,        s = W * d / u
+"""
+
+import numpy as np
+
+DEFAULT_PRIOR_WEIGHT = 2.0
+DEFAULT_BASE_RATE = 0.5
+SUPPORTED_DTYPES = (np.float16, np.float32, np.uint16, np.uint32)
+
+# --------------------------- Conversions -------------------------------------
+
+def _dtype_max(dtype) -> float:
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        return float(np.iinfo(dtype).max)
+    return float(np.finfo(dtype).max)
+
+def _cast_evidence(x: np.ndarray, dtype) -> np.ndarray:
+    """Saturating cast: dogmatic opinions (u -> 0) clip to the dtype maximum."""
+    x = np.clip(np.nan_to_num(x, nan=0.0, posinf=np.inf), 0.0, _dtype_max(dtype))
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        x = np.rint(x)
+    return x.astype(dtype)
+
+def opinions_to_evidence(opinions, prior_weight: float = DEFAULT_PRIOR_WEIGHT,
+                         dtype=np.float16, epsilon: float = 1e-6):
+    """[..., 4] opinions -> (r, s) arrays of shape [...] in the requested dtype."""
+    opinions = np.asarray(opinions, dtype=np.float32)
+    b, d, u = opinions[..., 0], opinions[..., 1], opinions[..., 2]
+    scale = prior_weight / np.maximum(u, epsilon)
+    return _cast_evidence(b * scale, dtype), _cast_evidence(d * scale, dtype)
+
+def evidence_to_opinions(r, s, base_rate=DEFAULT_BASE_RATE,
+                         prior_weight: float = DEFAULT_PRIOR_WEIGHT) -> np.ndarray:
+    """(r, s) -> [..., 4] float32 opinions [b, d, u, a]."""
+    r = np.asarray(r, dtype=np.float32)
+    s = np.asarray(s, dtype=np.float32)
+    total = r + s + np.float32(prior_weight)
+    a = np.broadcast_to(np.asarray(base_rate, dtype=np.float32), r.shape)
+    return np.stack([r / total, s / total, np.float32(prior_weight) / total, a], axis=-1)
+
+def fuse_evidence(r, s, axis: int = 0):
+    """Cumulative fusion in evidence space: a plain sum-reduction (accumulated in float32)."""
+    return (np.sum(np.asarray(r), axis=axis, dtype=np.float32),
+            np.sum(np.asarray(s), axis=axis, dtype=np.float32))
+
+def expected_probability(r, s, base_rate=DEFAULT_BASE_RATE,
+                         prior_weight: float = DEFAULT_PRIOR_WEIGHT) -> np.ndarray:
+    """Reputation b + a*u computed directly from evidence."""
+    r = np.asarray(r, dtype=np.float32)
+    s = np.asarray(s, dtype=np.float32)
+    return (r + np.float32(prior_weight) * np.float32(base_rate)) / (r + s + np.float32(prior_weight))
+
+# --------------------------- Trust store -------------------------------------
+
+class EvidenceTrustMatrix:
+    """
+    Dense [S, N] evidence store: a drop-in alternative to the [S, N, 4] float32
+    trust_matrix of EBSLAlgorithm. float16/uint16 use 4 bytes per edge (4x smaller),
+    uint32 uses 8 bytes (2x smaller).
+    """
+    def __init__(self, num_nodes: int, dtype=np.float16, base_rate: float = DEFAULT_BASE_RATE,
+                 prior_weight: float = DEFAULT_PRIOR_WEIGHT):
+        if np.dtype(dtype) not in [np.dtype(t) for t in SUPPORTED_DTYPES]:
+            raise ValueError(f"Unsupported evidence dtype {np.dtype(dtype)}")
+        self.num_nodes = int(num_nodes)
+        self.dtype = np.dtype(dtype)
+        self.base_rate = float(base_rate)
+        self.prior_weight = float(prior_weight)
+        # Zero evidence == full uncertainty, matching the EBSLAlgorithm default
+        self.r = np.zeros((num_nodes, num_nodes), dtype=self.dtype)
+        self.s = np.zeros((num_nodes, num_nodes), dtype=self.dtype)
+
+    @classmethod
+    def from_trust_matrix(cls, trust_matrix, dtype=np.float16,
+                          prior_weight: float = DEFAULT_PRIOR_WEIGHT) -> "EvidenceTrustMatrix":
+        """Builds a store from an [S, N, 4] opinion array (torch tensors via .numpy())."""
+        T = np.asarray(trust_matrix, dtype=np.float32)
+        base_rates = T[..., 3][T[..., 2] < 1.0]
+        base_rate = float(np.median(base_rates)) if base_rates.size else DEFAULT_BASE_RATE
+        store = cls(T.shape[0], dtype=dtype, base_rate=base_rate, prior_weight=prior_weight)
+        store.r, store.s = opinions_to_evidence(T, prior_weight, dtype)
+        return store
+
+    def set_opinion(self, source: int, target: int, opinion) -> None:
+        r, s = opinions_to_evidence(np.asarray(opinion)[None], self.prior_weight, self.dtype)
+        self.r[source, target] = r[0]
+        self.s[source, target] = s[0]
+
+    def add_evidence(self, sources, targets, r, s) -> None:
+        """Accumulates (saturating) evidence for many edges at once."""
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        new_r = self.r[sources, targets].astype(np.float64) + np.asarray(r, dtype=np.float64)
+        new_s = self.s[sources, targets].astype(np.float64) + np.asarray(s, dtype=np.float64)
+        self.r[sources, targets] = _cast_evidence(new_r, self.dtype)
+        self.s[sources, targets] = _cast_evidence(new_s, self.dtype)
+
+    def fused_evidence(self):
+        """Per-target fused (r, s): a sum over the source axis."""
+        return fuse_evidence(self.r, self.s, axis=0)
+
+    def fuse_all_nodes(self) -> np.ndarray:
+        """[N, 4] fused opinions, derived from summed evidence."""
+        r, s = self.fused_evidence()
+        return evidence_to_opinions(r, s, self.base_rate, self.prior_weight)
+
+    def compute_reputation(self) -> np.ndarray:
+        r, s = self.fused_evidence()
+        return expected_probability(r, s, self.base_rate, self.prior_weight)
+
+    def to_trust_matrix(self) -> np.ndarray:
+        return evidence_to_opinions(self.r, self.s, self.base_rate, self.prior_weight)
+
+    @property
+    def nbytes(self) -> int:
+        return self.r.nbytes + self.s.nbytes
+
+    def memory_report(self) -> dict:
+        dense = self.num_nodes * self.num_nodes * 4 * np.dtype(np.float32).itemsize
+        return {
+            "dtype": str(self.dtype),
+            "evidence_bytes": self.nbytes,
+            "float32_opinion_bytes": dense,
+            "reduction": dense / self.nbytes if self.nbytes else None,
+        }
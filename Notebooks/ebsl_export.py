@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Columnar reputation export (Arrow IPC / Parquet)
+- Writes the [N, 4] reputation tensor + node ids + derived score with no per-row Python
+- Chunked writes for huge N (ReputationWriter), memory-mapped reads for downstream jobs
+- Vectorized summary statistics computed from the same buffers
+- Schema metadata records which fusion produced the snapshot, so recomputation
+  downstream (ebsl_query) can use the same numerics
+"""
+
+import os
+
+import numpy as np
+
+OPINION_COLUMNS = ("belief", "disbelief", "uncertainty", "base_rate")
+SCORE_COLUMN = "reputation"
+FUSION_METADATA_KEY = b"ebsl_fusion"      # "product" (EBSL_EZKL) | "sums" (EBslFusionModule running sums)
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Columnar export requires pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+def _as_numpy(rep) -> np.ndarray:
+    """Torch CPU tensors share memory with .numpy(); numpy arrays pass through."""
+    if hasattr(rep, "detach"):
+        rep = rep.detach().cpu().numpy()
+    rep = np.asarray(rep, dtype=np.float32)
+    if rep.ndim != 2 or rep.shape[1] != 4:
+        raise ValueError(f"Expected reputation of shape [N, 4], got {rep.shape}")
+    return rep
+
+def _columns(rep: np.ndarray, node_ids) -> dict:
+    # One transpose makes each opinion component a contiguous buffer Arrow can wrap
+    cols_t = np.ascontiguousarray(rep.T)
+    cols = {"node_id": node_ids}
+    for k, name in enumerate(OPINION_COLUMNS):
+        cols[name] = cols_t[k]
+    cols[SCORE_COLUMN] = cols_t[0] + cols_t[3] * cols_t[2]
+    return cols
+
+# --------------------------- Writer ------------------------------------------
+
+class ReputationWriter:
+    """
+    Streams reputation chunks to `.parquet` or `.arrow` (Arrow IPC file, mmap-able).
+    Usage:
+        with ReputationWriter(path) as w:
+            for ids, rep in chunks:
+                w.write_chunk(rep, ids)
+    """
+    def __init__(self, path: str, compression: str = "zstd", fusion: str = None):
+        self.pa, self.pq = _require_pyarrow()
+        self.path = path
+        self.compression = compression
+        self.fusion = fusion
+        self.fmt = "arrow" if path.endswith((".arrow", ".feather", ".ipc")) else "parquet"
+        self._writer = None
+        self._sink = None
+        self._next_id = 0
+        self.rows_written = 0
+
+    def write_chunk(self, rep, node_ids=None):
+        rep = _as_numpy(rep)
+        n = rep.shape[0]
+        if node_ids is None:
+            node_ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        node_ids = np.asarray(node_ids)
+        if node_ids.shape[0] != n:
+            raise ValueError(f"node_ids has {node_ids.shape[0]} rows, reputation has {n}")
+        table = self.pa.table({k: self.pa.array(v) for k, v in _columns(rep, node_ids).items()})
+        if self.fusion:
+            table = table.replace_schema_metadata({FUSION_METADATA_KEY: self.fusion.encode()})
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table)
+        self._next_id += n
+        self.rows_written += n
+
+    def _open(self, schema):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self.fmt == "parquet":
+            self._writer = self.pq.ParquetWriter(self.path, schema, compression=self.compression)
+        else:
+            self._sink = self.pa.OSFile(self.path, "wb")
+            self._writer = self.pa.ipc.new_file(self._sink, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def export_reputation(rep, path: str, node_ids=None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      compression: str = "zstd", fusion: str = None) -> int:
+    """Writes an [N, 4] reputation tensor in row slices of `chunk_rows`; returns rows written."""
+    rep = _as_numpy(rep)
+    if node_ids is not None:
+        node_ids = np.asarray(node_ids)
+    with ReputationWriter(path, compression=compression, fusion=fusion) as w:
+        for start in range(0, max(rep.shape[0], 1), chunk_rows):
+            stop = start + chunk_rows
+            w.write_chunk(rep[start:stop], None if node_ids is None else node_ids[start:stop])
+        return w.rows_written
+
+# --------------------------- Reader ------------------------------------------
+
+def read_reputation(path: str, columns=None):
+    """
+    Returns a pyarrow.Table. Arrow IPC files are memory-mapped (zero-copy);
+    Parquet is decoded with memory_map=True.
+    """
+    pa, pq = _require_pyarrow()
+    if path.endswith((".arrow", ".feather", ".ipc")):
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table.select(list(columns)) if columns else table
+    return pq.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+
+def table_to_reputation(table) -> np.ndarray:
+    """[N, 4] float32 array from an exported table."""
+    return np.stack([table.column(c).to_numpy() for c in OPINION_COLUMNS], axis=1)
+
+def reputation_fusion(table, default: str = None):
+    """Fusion recorded by export_reputation(..., fusion=...), or `default` for untagged files."""
+    meta = table.schema.metadata or {}
+    value = meta.get(FUSION_METADATA_KEY)
+    return value.decode() if value else default
+
+# --------------------------- Summary -----------------------------------------
+
+def summarize_reputation(rep) -> dict:
+    """DataFrame.describe()-style stats per column, computed in one vectorized pass."""
+    rep = _as_numpy(rep)
+    data = np.concatenate([rep, (rep[:, 0] + rep[:, 3] * rep[:, 2])[:, None]], axis=1).astype(np.float64)
+    names = OPINION_COLUMNS + (SCORE_COLUMN,)
+    if data.shape[0] == 0:
+        return {name: {"count": 0} for name in names}
+    q = np.quantile(data, [0.25, 0.5, 0.75], axis=0)
+    stats = {
+        "count": np.full(len(names), data.shape[0]),
+        "mean": data.mean(axis=0),
+        "std": data.std(axis=0, ddof=1) if data.shape[0] > 1 else np.full(len(names), np.nan),
+        "min": data.min(axis=0),
+        "25%": q[0], "50%": q[1], "75%": q[2],
+        "max": data.max(axis=0),
+    }
+    return {name: {k: float(v[i]) for k, v in stats.items()} for i, name in enumerate(names)}
@@ -15,7 +15,7 @@ import time
 import argparse
 import traceback
 from dataclasses import dataclass, asdict
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from typing import Optional, Dict, Any
 
 import numpy as np
@@ -25,14 +25,23 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from hypothesis import given, strategies as st, settings as hyp_settings
 
-import asyncio
-import inspect
 import subprocess
 from pathlib import Path as _Path
 
 import ezkl
 import onnx
 
+from ebsl_numpy import BACKENDS, NumpyEBSLAlgorithm, get_ebsl_backend
+from ebsl_torch import ClassicalEBSLAlgorithm, EBSLAlgorithm, EBslFusionModule
+from ebsl_batch_verify import collect_proofs, batch_verify, run_with_loop
+from ebsl_profiling import StageProfiler, add_profile_args
+from ebsl_metrics import RunTelemetry, add_metrics_args, telemetry_from_args
+from ebsl_circuit_cost import CircuitSettings, estimate_circuit
+from ebsl_bench_matrix import expand_matrix, run_matrix, write_results, load_results, compare_to_baseline, format_table
+from ebsl_aggregate import DEFAULT_LOGROWS as DEFAULT_AGGR_LOGROWS, aggregate_proofs, format_report
+from ebsl_epoch import (EpochManifest, EpochReport, hash_inputs, circuit_fingerprint, plan_epoch, estimate_saved,
+                        user_stem)
+
 # --------------------------- Logging -----------------------------------------
 
 @dataclass
@@ -43,9 +52,12 @@ class StepResult:
     extra: dict
 
 class Logger:
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, profiler: Optional[StageProfiler] = None,
+                 telemetry: Optional[RunTelemetry] = None):
         self.verbose = verbose
         self.steps = []
+        self.profiler = profiler
+        self.telemetry = telemetry
 
     def banner(self, title: str):
         line = "=" * 78
@@ -69,8 +81,11 @@ class Logger:
         start = time.perf_counter()
         ok = True
         info = dict(extra or {})
+        if self.telemetry:
+            self.telemetry.step_started(name)
         try:
-            yield info
+            with (self.profiler.stage(name) if self.profiler else nullcontext()):
+                yield info
             ok = True
         except Exception as e:
             ok = False
@@ -81,9 +96,20 @@ class Logger:
         finally:
             dur = time.perf_counter() - start
             self.steps.append(StepResult(name, ok, dur, info))
+            if self.telemetry:
+                self.telemetry.step_finished(name, ok, dur, info)
             status = "OK" if ok else "FAIL"
             self.info(f"[{status}] {name} in {dur:.3f}s")
 
+    def record_proof(self, ok: bool, seconds: float, **fields):
+        """Per-proof event for loops that prove many users inside one step."""
+        if self.telemetry:
+            self.telemetry.proof_finished(ok, seconds, **fields)
+
+    def set_queue_depth(self, queue: str, depth: int):
+        if self.telemetry:
+            self.telemetry.set_queue_depth(queue, depth)
+
     def dump_report(self, path: str):
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, "w") as f:
@@ -92,18 +118,6 @@ class Logger:
 
 # --------------------------- Async helpers -----------------------------------
 
-def run_with_loop(func, /, *args, **kwargs):
-    """
-    Always execute in a running asyncio loop and await if needed.
-    Works whether func is sync or returns a coroutine.
-    """
-    async def _runner():
-        res = func(*args, **kwargs)
-        if inspect.isawaitable(res):
-            return await res
-        return res
-    return asyncio.run(_runner())
-
 def get_srs_with_fallback(settings_path: str, srs_path: str, logger: Logger) -> bool:
     """
     Try Python binding; if that fails, fall back to `ezkl get-srs -S settings.json`.
@@ -162,39 +176,6 @@ def safe_calibrate(logger: Logger, *, data, model, settings, **kwargs) -> bool:
 
 # --------------------------- EBSL logic --------------------------------------
 
-class ClassicalEBSLAlgorithm:
-    @staticmethod
-    def fuse(opinions_tensor: torch.Tensor) -> torch.Tensor:
-        # opinions_tensor: [N, 4] -> [b,d,u,a]
-        b, d, u, a = [o.squeeze(-1) for o in opinions_tensor.split(1, dim=-1)]
-        denominator = torch.sum(u, dim=-1) - (opinions_tensor.shape[0] - 1)
-        if torch.any(denominator == 0):
-            denominator = denominator + (denominator == 0) * 1e-9
-        b_fused = torch.sum(b * u, dim=-1) / denominator
-        d_fused = torch.sum(d * u, dim=-1) / denominator
-        u_fused = torch.prod(u, dim=-1) / denominator
-        a_fused = torch.sum((a * u), dim=-1) / denominator
-        return torch.stack([b_fused, d_fused, u_fused, a_fused], dim=-1)
-
-class EBSLAlgorithm:
-    @staticmethod
-    def fuse(opinions_tensor: torch.Tensor) -> torch.Tensor:
-        b, d, u, a = [o.squeeze(-1) for o in opinions_tensor.split(1, dim=-1)]
-        denominator = torch.sum(u, dim=-1) - (opinions_tensor.shape[0] - 1)
-        is_zero = (denominator == 0).to(torch.float32)
-        denominator = denominator + (is_zero * 1e-9)
-        inv_denominator = torch.reciprocal(denominator)
-        b_fused = torch.sum(b * u, dim=-1) * inv_denominator
-        d_fused = torch.sum(d * u, dim=-1) * inv_denominator
-        u_fused = torch.prod(u, dim=-1) * inv_denominator
-        a_fused = torch.sum((a * u), dim=-1) * inv_denominator
-        return torch.stack([b_fused, d_fused, u_fused, a_fused], dim=-1)
-
-    @staticmethod
-    def calculate_reputation(final_opinion_tensor: torch.Tensor) -> torch.Tensor:
-        b, d, u, a = [o.squeeze(-1) for o in final_opinion_tensor.split(1, dim=-1)]
-        return b + a * u
-
 # --------------------------- Property tests + perf ----------------------------
 
 @st.composite
@@ -219,14 +200,23 @@ def run_property_based_correctness_test(logger: Logger):
         classical_result = ClassicalEBSLAlgorithm.fuse(opinions_tensor)
         zk_friendly_result = EBSLAlgorithm.fuse(opinions_tensor)
         assert torch.allclose(classical_result, zk_friendly_result, atol=1e-6)
+        numpy_result = NumpyEBSLAlgorithm.fuse(opinions_tensor.numpy())
+        assert np.allclose(numpy_result, zk_friendly_result.numpy(), atol=1e-6)
+        # two segments (the whole set, then its first half) through the segmented API; it
+        # accumulates in float64, so compare with fuse in float64 (u1 + u2 ~ 1 is ill-conditioned)
+        half = opinions_tensor.shape[0] // 2
+        flat = torch.cat([opinions_tensor, opinions_tensor[:half]]).double()
+        segmented = EBSLAlgorithm.fuse_segments(flat, torch.tensor([0, opinions_tensor.shape[0], flat.shape[0]]))
+        assert torch.allclose(segmented[0], EBSLAlgorithm.fuse(flat[:opinions_tensor.shape[0]]), rtol=1e-9, atol=1e-12)
+        assert torch.allclose(segmented[1], EBSLAlgorithm.fuse(flat[opinions_tensor.shape[0]:]), rtol=1e-9, atol=1e-12)
     with logger.timed("hypothesis_equivalence_test"):
         test_fusion_equivalence()
-    logger.ok("Equivalence holds for 100 random examples")
+    logger.ok("Equivalence (classical, zk-friendly, segmented, numpy) holds for 100 random examples")
 
 def run_comparative_performance_analysis(logger: Logger, skip_plots: bool):
     logger.banner("Comparative performance analysis")
     opinion_counts = list(range(10, 201, 10))
-    results = {'classical': [], 'zk_friendly': []}
+    results = {'classical': [], 'zk_friendly': [], 'numpy': []}
     with logger.timed("perf_benchmark"):
         for count in opinion_counts:
             b = torch.rand(count)
@@ -240,12 +230,17 @@ def run_comparative_performance_analysis(logger: Logger, skip_plots: bool):
             t0 = time.perf_counter()
             EBSLAlgorithm.fuse(sample_tensor)
             results['zk_friendly'].append(time.perf_counter() - t0)
+            sample_array = sample_tensor.numpy()
+            t0 = time.perf_counter()
+            NumpyEBSLAlgorithm.fuse(sample_array)
+            results['numpy'].append(time.perf_counter() - t0)
     logger.ok("Perf benchmark complete")
     if not skip_plots:
         os.makedirs("zkml_artifacts", exist_ok=True)
         plt.figure(figsize=(10, 6))
         plt.plot(opinion_counts, results['classical'], marker='o', label='Classical')
         plt.plot(opinion_counts, results['zk_friendly'], marker='x', label='ZK-Friendly')
+        plt.plot(opinion_counts, results['numpy'], marker='s', label='NumPy')
         plt.xlabel("Number of Opinions to Fuse")
         plt.ylabel("Execution Time [s] (log)")
         plt.title("Performance Comparison: Classical vs ZK-Friendly EBSL Fusion")
@@ -254,65 +249,7 @@ def run_comparative_performance_analysis(logger: Logger, skip_plots: bool):
         plt.savefig(plot_path, dpi=160)
         logger.ok(f"Saved performance plot: {plot_path}")
 
-# --------------------------- Torch EBSL module --------------------------------
-
-class EBslFusionModule(torch.nn.Module):
-    """
-    ZK-optimized EBSL fusion module with overflow-safe ops.
-    Input: combined tensor with opinions and mask flattened and concatenated
-    Outputs:
-      fused:    (B, 4)
-      rep:      (B, 1)
-    """
-    def __init__(self, max_opinions: int = 16):
-        super().__init__()
-        self.max_opinions = max_opinions
-        self.opinions_size = max_opinions * 4  # N * 4 for [b,d,u,a]
-        self.mask_size = max_opinions         # N for mask
-        self.register_buffer('epsilon', torch.tensor(1e-6))
-        self.register_buffer('one', torch.tensor(1.0))
-
-    def forward(self, combined_input: torch.Tensor):
-        batch_size = combined_input.shape[0]
-
-        # Split & reshape back to opinions and mask
-        opinions_flat = combined_input[:, :self.opinions_size]
-        mask_flat = combined_input[:, self.opinions_size:self.opinions_size + self.mask_size]
-        opinions = opinions_flat.view(batch_size, self.max_opinions, 4)
-        mask = mask_flat.view(batch_size, self.max_opinions)
-
-        b = opinions[..., 0]
-        d = opinions[..., 1]
-        u = opinions[..., 2]
-        a = opinions[..., 3]
-
-        m = mask
-        K = torch.sum(m, dim=1)
-
-        sum_bu = torch.sum((b * u) * m, dim=1)
-        sum_du = torch.sum((d * u) * m, dim=1)
-        sum_au = torch.sum((a * u) * m, dim=1)
-        sum_u  = torch.sum(u * m, dim=1)
-
-        # Stable product via logs (avoids huge intermediates)
-        u_masked = u * m + (self.one - m)                # 1 for masked-out entries
-        u_clamped = torch.clamp(u_masked, min=self.epsilon, max=self.one)
-        sum_log = torch.sum(torch.log(u_clamped), dim=1)
-        prod_u = torch.exp(sum_log)
-
-        # Sign-preserving denom clamp
-        denom = sum_u - K + self.one
-        denom_sign = torch.where(denom >= 0, self.one, -self.one)
-        denom = denom_sign * torch.clamp(torch.abs(denom), min=self.epsilon)
-
-        b_f = sum_bu / denom
-        d_f = sum_du / denom
-        u_f = prod_u / denom
-        a_f = sum_au / denom
-
-        fused = torch.stack([b_f, d_f, u_f, a_f], dim=1)
-        rep = (b_f + a_f * u_f).unsqueeze(1)
-        return fused, rep
+# --------------------------- Synthetic inputs ---------------------------------
 
 def _gen_synthetic_opinions(N: int):
     b = torch.rand(N)
@@ -350,16 +287,20 @@ def run_zkml_pipeline_with_ebsl(logger: Logger, max_opinions: int = 16,
                                zk_strategy: str = "balanced",
                                manual_input_scale: int = None,
                                manual_param_scale: int = None,
-                               skip_calibration: bool = False):
+                               skip_calibration: bool = False,
+                               batch_size: int = 1,
+                               backend: str = "torch"):
     logger.banner("ZKML pipeline: EBSL fusion in EZKL")
     wd = os.path.abspath("zkml_artifacts")
     os.makedirs(wd, exist_ok=True)
 
     # 1) Export ONNX
-    with logger.timed("export_onnx", extra={"max_opinions": max_opinions}) as info:
+    with logger.timed("export_onnx", extra={"max_opinions": max_opinions, "batch_size": batch_size}) as info:
         model = EBslFusionModule(max_opinions=max_opinions).eval()
-        opinions, mask = _gen_synthetic_opinions(max_opinions)
-        opinions_b, mask_b = opinions.unsqueeze(0), mask.unsqueeze(0)
+        # one synthetic user per batch row; the batch dimension is fixed in the circuit
+        users = [_gen_synthetic_opinions(max_opinions) for _ in range(batch_size)]
+        opinions_b = torch.stack([o for o, _ in users])
+        mask_b = torch.stack([m for _, m in users])
 
         # Create combined input for single-input model
         opinions_flat = opinions_b.flatten(start_dim=1)
@@ -423,13 +364,25 @@ def run_zkml_pipeline_with_ebsl(logger: Logger, max_opinions: int = 16,
         info["settings_path"] = settings_path
         info["summary"] = summarize_settings(settings_path)
         logger.ok(f"Generated settings -> {settings_path}")
+        # static estimate from the same settings: cross-checks the cost model on every run,
+        # but it is advisory only and must never fail a proving run
+        try:
+            est = estimate_circuit(onnx_path, CircuitSettings.from_settings_json(settings_path))
+            with open(settings_path, "r") as f:
+                actual_rows = json.load(f).get("num_rows")
+            info["circuit_estimate"] = {"num_rows": est.num_rows, "actual_num_rows": actual_rows,
+                                        "logrows": est.logrows, "pk_bytes": est.pk_bytes,
+                                        "lookups": est.lookups, "seconds": est.seconds}
+            logger.info(f"estimated {est.num_rows:,} rows (actual {actual_rows}), pk ~{est.pk_bytes / 2**20:,.0f} MB")
+        except Exception as e:
+            info["circuit_estimate_error"] = repr(e)
+            logger.warn(f"Circuit cost estimate failed (continuing): {e!r}")
         logger.info("settings summary: " + json.dumps(info["summary"], indent=2))
 
     # 3) input.json (GraphData: single input vector)
     with logger.timed("write_input_json") as info:
-        opinions_data = opinions_b.detach().cpu().numpy().flatten().tolist()
-        mask_data = mask_b.detach().cpu().numpy().flatten().tolist()
-        combined_input_list = opinions_data + mask_data
+        # row-major (B, K*4 + K): each user's opinions followed by its mask
+        combined_input_list = combined_input.detach().cpu().numpy().flatten().tolist()
 
         graph_data = {
             "input_data": [combined_input_list],
@@ -566,17 +519,13 @@ def run_zkml_pipeline_with_ebsl(logger: Logger, max_opinions: int = 16,
         except Exception:
             pass
 
-        # Torch peek for numerical accuracy comparison
-        with torch.no_grad():
-            opinions_flat = opinions_b.flatten(start_dim=1)
-            mask_flat = mask_b.flatten(start_dim=1)
-            combined_input = torch.cat([opinions_flat, mask_flat], dim=1)
-            fused_t, rep_t = EBslFusionModule(max_opinions=max_opinions).eval()(combined_input)
-        info["torch_fused"] = fused_t[0].detach().cpu().numpy().tolist()
-        info["torch_rep"] = rep_t[0].detach().cpu().numpy().tolist()
+        # Scoring-backend peek for numerical accuracy comparison
+        fused_e, rep_e = get_ebsl_backend(backend).fuse_combined(combined_input.detach().numpy(), max_opinions)
+        info[f"{backend}_fused"] = fused_e[0].tolist()
+        info[f"{backend}_rep"] = rep_e[0].tolist()
         logger.ok(f"Witness generated -> {witness_path}")
-        logger.info("Torch fused: " + json.dumps(info["torch_fused"], indent=2))
-        logger.info("Torch rep:   " + json.dumps(info["torch_rep"], indent=2))
+        logger.info(f"{backend} fused: " + json.dumps(info[f"{backend}_fused"], indent=2))
+        logger.info(f"{backend} rep:   " + json.dumps(info[f"{backend}_rep"], indent=2))
 
     # 9) mock
     with logger.timed("mock"):
@@ -612,76 +561,266 @@ def run_zkml_pipeline_with_ebsl(logger: Logger, max_opinions: int = 16,
         else:
             logger.error("Proof verification failed ❌")
 
+# --------------------------- Incremental epoch proving -----------------------
+
+def load_epoch_inputs(path: str):
+    """.npy (users, max_opinions*5) rows, or .npz with combined_input [+ user_ids]."""
+    data = np.load(path, allow_pickle=False)
+    if isinstance(data, np.lib.npyio.NpzFile):
+        combined = data["combined_input"]
+        user_ids = data["user_ids"].tolist() if "user_ids" in data.files else None
+        return combined, user_ids
+    return data, None
+
+def run_epoch_proving(logger: Logger, combined_inputs, user_ids=None,
+                      manifest_path: str = None, checkpoint_every: int = 25,
+                      proof_type: str = "single") -> EpochReport:
+    """
+    Proves only users whose combined_input changed since the last epoch, reusing
+    compiled circuit / pk / vk / SRS already in zkml_artifacts/. proof_type
+    "for-aggr" makes proofs that ebsl_aggregate can fold together.
+    """
+    logger.banner("Incremental epoch proving")
+    wd = os.path.abspath("zkml_artifacts")
+    settings_path = os.path.join(wd, "settings.json")
+    compiled_path = os.path.join(wd, "compiled.onnx")
+    pk_path = os.path.join(wd, "model.pk")
+    vk_path = os.path.join(wd, "model.vk")
+    srs_path = os.path.join(wd, "kzg.srs")
+    proofs_dir = os.path.join(wd, "epoch_proofs")
+    inputs_dir = os.path.join(wd, "epoch_inputs")
+    os.makedirs(proofs_dir, exist_ok=True)
+    os.makedirs(inputs_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(wd, "epoch_manifest.json")
+
+    combined_inputs = np.asarray(combined_inputs, dtype=np.float32)
+    if user_ids is None:
+        user_ids = range(combined_inputs.shape[0])
+    user_ids = [str(u) for u in user_ids]
+
+    with logger.timed("epoch_plan", extra={"users": len(user_ids)}) as info:
+        manifest = EpochManifest.load(manifest_path)
+        fingerprint = circuit_fingerprint(settings_path, compiled_path, vk_path)
+        if proof_type != "single":
+            # proofs of another type are not interchangeable; keep "single" fingerprints as before
+            fingerprint = f"{fingerprint}:{proof_type}"
+        hashes = hash_inputs(combined_inputs)
+        plan = plan_epoch(manifest, user_ids, hashes, fingerprint)
+        # users gone from this epoch's inputs: drop their entries and the files this step wrote for them
+        pruned = manifest.prune(user_ids)
+        for uid, entry in pruned.items():
+            stale = [os.path.join(inputs_dir, f"{user_stem(uid)}.json"), entry.get("proof_path")]
+            for path in stale:
+                if path and os.path.dirname(os.path.abspath(path)) in (proofs_dir, inputs_dir) and os.path.exists(path):
+                    os.remove(path)
+        info.update({"to_prove": len(plan.to_prove), "reused": len(plan.reused), "reasons": plan.reasons,
+                     "pruned": len(pruned)})
+        logger.info(f"Epoch plan: prove {len(plan.to_prove)}, reuse {len(plan.reused)} ({plan.reasons}), "
+                    f"prune {len(pruned)}")
+
+    manifest.epoch += 1
+    manifest.fingerprint = fingerprint
+    measured, failed = [], 0
+    with logger.timed("epoch_prove") as info:
+        for n, i in enumerate(plan.to_prove, 1):
+            uid = user_ids[i]
+            stem = user_stem(uid)
+            input_json = os.path.join(inputs_dir, f"{stem}.json")
+            witness_path = os.path.join(inputs_dir, f"{stem}.witness.json")
+            proof_path = os.path.join(proofs_dir, f"{stem}.pf")
+            row = combined_inputs[i].tolist()
+            with open(input_json, "w") as f:
+                json.dump({"input_data": [row], "input_shapes": [[len(row)]]}, f)
+            logger.set_queue_depth("epoch_prove", len(plan.to_prove) - n + 1)
+            t0 = time.perf_counter()
+            try:
+                if not run_with_loop(ezkl.gen_witness, data=input_json, model=compiled_path, output=witness_path):
+                    raise RuntimeError("gen_witness failed")
+                if not run_with_loop(ezkl.prove, witness=witness_path, model=compiled_path, pk_path=pk_path,
+                                     proof_path=proof_path, srs_path=srs_path, proof_type=proof_type):
+                    raise RuntimeError("prove failed")
+            except Exception as e:
+                failed += 1
+                logger.warn(f"user {uid}: {e}")
+                logger.record_proof(False, time.perf_counter() - t0, user=uid, error=repr(e))
+                continue
+            finally:
+                if os.path.exists(witness_path):
+                    os.remove(witness_path)
+            dt = time.perf_counter() - t0
+            measured.append(dt)
+            logger.record_proof(True, dt, user=uid, proof=proof_path)
+            manifest.record(uid, hashes[i], proof_path, dt)
+            if n % checkpoint_every == 0:
+                manifest.save()
+        manifest.save()
+        logger.set_queue_depth("epoch_prove", 0)
+        info.update({"proved": len(measured), "failed": failed})
+
+    report = EpochReport(
+        epoch=manifest.epoch,
+        users=len(user_ids),
+        reused=len(plan.reused),
+        regenerated=len(measured),
+        failed=failed,
+        reasons=plan.reasons,
+        prove_seconds=float(sum(measured)),
+        estimated_seconds_saved=estimate_saved(manifest, len(plan.reused), measured),
+        pruned=len(pruned),
+    )
+    saved = report.estimated_seconds_saved
+    logger.ok(f"Epoch {report.epoch}: reused {report.reused}, regenerated {report.regenerated}, "
+              f"failed {report.failed}, pruned {report.pruned}; est. time saved "
+              + (f"{saved:.1f}s" if saved is not None else "n/a"))
+    with open(os.path.join(wd, "epoch_report.json"), "w") as f:
+        json.dump(report.as_dict(), f, indent=2)
+    return report
+
 # --------------------------- Calibration impact (optional) --------------------
 
-def measure_calibration_impact(logger: Logger, max_opinions: int = 4):
+def measure_calibration_impact(logger: Logger, max_opinions: int = 4, zk_strategy: str = "balanced",
+                               baseline: str = None) -> list:
+    """
+    Calibrated vs uncalibrated as one slice of the benchmark matrix: each run in
+    its own process, compared per step and per artifact instead of by step name.
+    """
     logger.banner("Calibration Impact Analysis")
-    results = {}
-    try:
-        logger.info("Testing WITH calibration...")
-        with logger.timed("with_calibration") as info:
-            run_zkml_pipeline_with_ebsl(logger, max_opinions=max_opinions,
-                                       zk_strategy="balanced", skip_calibration=False)
-        results["with_calibration"] = info
-    except Exception as e:
-        logger.warn(f"Calibration test failed: {e}")
-        results["with_calibration"] = {"error": str(e)}
-
-    try:
-        logger.info("Testing WITHOUT calibration...")
-        with logger.timed("without_calibration") as info:
-            run_zkml_pipeline_with_ebsl(logger, max_opinions=max_opinions,
-                                       zk_strategy="balanced", skip_calibration=True)
-        results["without_calibration"] = info
-    except Exception as e:
-        logger.warn(f"Non-calibration test failed: {e}")
-        results["without_calibration"] = {"error": str(e)}
-
-    logger.banner("Calibration Impact Report")
-    with_time = sum(step.seconds for step in logger.steps if "with_calibration" in step.name)
-    without_time = sum(step.seconds for step in logger.steps if "without_calibration" in step.name)
-    logger.info(f"WITH calibration total time: {with_time:.2f}s")
-    logger.info(f"WITHOUT calibration total time: {without_time:.2f}s")
-    if with_time and without_time:
-        if with_time < without_time:
-            logger.ok(f"Calibration improved performance by {((without_time - with_time) / without_time * 100):.1f}%")
+    with logger.timed("bench_matrix", extra={"max_opinions": max_opinions, "zk_strategy": zk_strategy}) as info:
+        results = run_matrix(expand_matrix([max_opinions], [zk_strategy], [1], (True, False)), log=logger.info)
+        info["results_path"] = write_results(os.path.join("zkml_artifacts", "bench_matrix.json"), results)
+        logger.info(format_table(results))
+        by_cal = {r["cell"]["calibrated"]: r for r in results}
+        if all(by_cal.get(c, {}).get("ok") for c in (True, False)):
+            cal, nocal = by_cal[True], by_cal[False]
+            for name in ("pk", "proof"):
+                if name in cal["sizes"] and name in nocal["sizes"]:
+                    info[f"{name}_size_ratio"] = cal["sizes"][name] / nocal["sizes"][name]
+            for step in ("setup", "prove", "verify"):
+                if step in cal["steps"] and step in nocal["steps"]:
+                    info[f"{step}_speedup"] = nocal["steps"][step]["seconds"] / max(cal["steps"][step]["seconds"], 1e-9)
+            logger.ok("Calibration impact: " + json.dumps({k: round(v, 3) for k, v in info.items()
+                                                           if k.endswith(("_ratio", "_speedup"))}))
         else:
-            logger.warn(f"Calibration overhead {((with_time - without_time) / without_time * 100):.1f}%")
+            logger.warn("A calibration run failed: " + "; ".join(str(r.get("error")) for r in results if not r["ok"]))
+        if baseline:
+            rows = compare_to_baseline(results, load_results(baseline))
+            info["regressions"] = [r for r in rows if r["regression"]]
+            for r in info["regressions"]:
+                logger.warn(f"{r['key']} {r['metric']}: {r['baseline']} -> {r['current']}")
     return results
 
+# --------------------------- Batch verification ------------------------------
+
+def run_batch_verification(logger: Logger, source: str, workers: int = None):
+    logger.banner("Batch proof verification")
+    wd = os.path.abspath("zkml_artifacts")
+    with logger.timed("batch_verify", extra={"source": source}) as info:
+        proofs = collect_proofs(source)
+        report = batch_verify(proofs,
+                              settings_path=os.path.join(wd, "settings.json"),
+                              vk_path=os.path.join(wd, "model.vk"),
+                              srs_path=os.path.join(wd, "kzg.srs"),
+                              workers=workers)
+        info.update(asdict(report))
+        logger.info(f"{report.verified}/{report.total} verified, {report.proofs_per_second:.1f} proofs/s, "
+                    f"latency: {json.dumps(report.latency_seconds)}")
+        if report.failed:
+            logger.warn(f"{report.failed} proofs failed verification")
+        else:
+            logger.ok("All proofs verified")
+    return report
+
+# --------------------------- Proof aggregation -------------------------------
+
+def run_proof_aggregation(logger: Logger, source: str, width: int = 4, logrows: Optional[int] = DEFAULT_AGGR_LOGROWS):
+    logger.banner("Proof aggregation")
+    wd = os.path.abspath("zkml_artifacts")
+    with logger.timed("aggregate", extra={"source": source, "width": width}) as info:
+        report = aggregate_proofs(collect_proofs(source),
+                                  settings_path=os.path.join(wd, "settings.json"),
+                                  vk_path=os.path.join(wd, "model.vk"),
+                                  srs_path=os.path.join(wd, "kzg.srs"),
+                                  width=width, logrows=logrows,
+                                  out_dir=os.path.join(wd, "aggregated"), log=logger.info)
+        info.update(asdict(report))
+        for line in format_report(report).splitlines():
+            logger.info(line)
+        if report.failures:
+            logger.warn(f"{len(report.failures)} of {report.chunks} aggregations failed")
+        else:
+            logger.ok(f"{report.proofs} proofs aggregated into {report.chunks}")
+    return report
+
 # --------------------------- Main --------------------------------------------
 
 def main():
     ap = argparse.ArgumentParser(description="EBSL + EZKL (Fixed)")
     ap.add_argument("--verbose", action="store_true", help="Enable verbose logs")
-    ap.add_argument("--max-opinions", type=int, default=16, help="Max opinion rows (fixed circuit shape)")
+    ap.add_argument("--max-opinions", type=int, default=None,
+                    help="Max opinion rows (fixed circuit shape; default 16, or 4 with --measure-calibration)")
     ap.add_argument("--skip-plots", action="store_true", help="Skip performance plot generation")
+    ap.add_argument("--backend", choices=BACKENDS, default="torch",
+                    help="EBSL engine for the scores compared against the circuit outputs")
     ap.add_argument("--zk-strategy", choices=["conservative", "balanced", "aggressive"],
                     default="balanced", help="ZK optimization strategy")
     ap.add_argument("--input-scale", type=int, help="Manual input scale override")
     ap.add_argument("--param-scale", type=int, help="Manual parameter scale override")
     ap.add_argument("--skip-calibration", action="store_true", help="Skip calibration step for production use")
     ap.add_argument("--measure-calibration", action="store_true", help="Measure calibration vs non-calibration impact")
+    ap.add_argument("--bench-baseline", metavar="PATH", help="bench_matrix.json to compare --measure-calibration against")
+    ap.add_argument("--batch-verify", metavar="SOURCE", help="Verify a directory or manifest of proofs against zkml_artifacts vk/SRS")
+    ap.add_argument("--verify-workers", type=int, default=None, help="Worker processes for --batch-verify")
+    ap.add_argument("--epoch-inputs", metavar="PATH", help="Per-user combined_input rows (.npy/.npz) to prove incrementally")
+    ap.add_argument("--epoch-manifest", metavar="PATH", help="Epoch manifest (default: zkml_artifacts/epoch_manifest.json)")
+    ap.add_argument("--proof-type", choices=["single", "for-aggr"], default="single",
+                    help="Epoch proof type; for-aggr proofs can be passed to --aggregate")
+    ap.add_argument("--aggregate", metavar="SOURCE", help="Aggregate a directory or manifest of for-aggr proofs")
+    ap.add_argument("--aggr-width", type=int, default=4, help="Proofs per aggregated proof")
+    ap.add_argument("--aggr-logrows", default=str(DEFAULT_AGGR_LOGROWS),
+                    help="Aggregation circuit logrows, or 'auto' to search with mock_aggregate "
+                         "(the aggregation SRS is fetched at this size)")
+    add_profile_args(ap)
+    add_metrics_args(ap)
     args = ap.parse_args()
 
-    logger = Logger(verbose=args.verbose)
+    profiler = StageProfiler(args.profile, args.profile_stages) if args.profile != "off" else None
+    telemetry, metrics_server = telemetry_from_args(args)
+    logger = Logger(verbose=args.verbose, profiler=profiler, telemetry=telemetry)
+    if metrics_server is not None:
+        logger.ok(f"Prometheus metrics on http://127.0.0.1:{args.metrics_port}/metrics")
 
     try:
-        if args.measure_calibration:
-            measure_calibration_impact(logger, max_opinions=4)
+        if args.batch_verify:
+            run_batch_verification(logger, args.batch_verify, workers=args.verify_workers)
+        elif args.epoch_inputs:
+            combined, user_ids = load_epoch_inputs(args.epoch_inputs)
+            run_epoch_proving(logger, combined, user_ids, manifest_path=args.epoch_manifest,
+                              proof_type=args.proof_type)
+        elif args.aggregate:
+            run_proof_aggregation(logger, args.aggregate, width=args.aggr_width,
+                                  logrows=None if args.aggr_logrows == "auto" else int(args.aggr_logrows))
+        elif args.measure_calibration:
+            measure_calibration_impact(logger, max_opinions=args.max_opinions or 4, zk_strategy=args.zk_strategy,
+                                       baseline=args.bench_baseline)
         else:
             run_property_based_correctness_test(logger)
             run_comparative_performance_analysis(logger, skip_plots=args.skip_plots)
-            run_zkml_pipeline_with_ebsl(logger, max_opinions=args.max_opinions,
+            run_zkml_pipeline_with_ebsl(logger, max_opinions=args.max_opinions or 16,
                                        zk_strategy=args.zk_strategy,
                                        manual_input_scale=args.input_scale,
                                        manual_param_scale=args.param_scale,
-                                       skip_calibration=args.skip_calibration)
+                                       skip_calibration=args.skip_calibration,
+                                       backend=args.backend)
     except Exception as e:
         logger.error(f"Fatal error: {e}")
     finally:
         report_path = os.path.join("zkml_artifacts", "run_report.json")
         logger.dump_report(report_path)
+        if profiler is not None and profiler.written:
+            logger.ok(f"Profiles written: {len(profiler.written)} files in {profiler.out_dir}")
+        telemetry.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
         print("\n--- All Functional Script Stages Finished ---")
 
 if __name__ == "__main__":
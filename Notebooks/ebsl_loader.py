@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streaming attestation loader for CSV / Parquet exports
+- Reads files in fixed-size record batches (pyarrow), never the whole file
+- Remaps external identity strings to dense int ids through a persistent,
+  append-only IdentityIndex (one JSON-encoded id per line; line number == id)
+- Emits columnar OpinionBatch chunks and folds them into O(N) per-target running
+  sums (StreamingFusion), so peak memory is bounded by chunk size + node count
+"""
+
+import os
+import json
+import time
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+from ebsl_numpy import NumpyEBSLAlgorithm
+from ebsl_evidence import evidence_to_opinions, DEFAULT_PRIOR_WEIGHT
+
+DEFAULT_CHUNK_ROWS = 1 << 18
+OPINION_COLUMNS = ("belief", "disbelief", "uncertainty", "base_rate")
+EVIDENCE_COLUMNS = ("positive", "negative")
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Streaming attestation loading requires pyarrow (pip install pyarrow)") from e
+    return pa, pc, pacsv, pq
+
+# --------------------------- Identity index ----------------------------------
+
+class IdentityIndex:
+    """Dense id assignment for external identities, persisted across runs."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.ids = {}
+        self.names = []
+        self._pending = []
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        key = json.loads(line)
+                        self.ids[key] = len(self.names)
+                        self.names.append(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, values) -> np.ndarray:
+        """Maps unique external ids to dense ids, assigning new ids as needed."""
+        out = np.empty(len(values), dtype=np.int64)
+        for i, v in enumerate(values):
+            key = str(v)
+            idx = self.ids.get(key)
+            if idx is None:
+                idx = len(self.names)
+                self.ids[key] = idx
+                self.names.append(key)
+                self._pending.append(key)
+            out[i] = idx
+        return out
+
+    def encode(self, column) -> np.ndarray:
+        """Dense ids for a pyarrow column; Python work is per unique value, not per row."""
+        _, pc, _, _ = _require_pyarrow()
+        encoded = pc.dictionary_encode(column)
+        if hasattr(encoded, "combine_chunks"):
+            encoded = encoded.combine_chunks()
+        mapping = self.lookup(encoded.dictionary.to_pylist())
+        return mapping[encoded.indices.to_numpy(zero_copy_only=False)]
+
+    def flush(self) -> None:
+        if not self.path or not self._pending:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(k) + "\n" for k in self._pending))
+        self._pending = []
+
+# --------------------------- Batches -----------------------------------------
+
+@dataclass
+class OpinionBatch:
+    src: np.ndarray          # int64 dense ids
+    dst: np.ndarray          # int64 dense ids
+    opinions: np.ndarray     # float32 [n, 4] = [b, d, u, a]
+
+    def __len__(self):
+        return self.src.shape[0]
+
+def _open_batches(path: str, chunk_rows: int, columns):
+    pa, _, pacsv, pq = _require_pyarrow()
+    if path.endswith(".parquet"):
+        yield from pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+        return
+    # CSV block size is in bytes; rebatch to chunk_rows below
+    convert = pacsv.ConvertOptions(include_columns=columns, strings_can_be_null=True)
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=16 << 20),
+                            convert_options=convert)
+    for batch in reader:
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(start, chunk_rows)
+
+def _column_names(path: str):
+    """Column names as pyarrow parses them (quoted headers, BOM)."""
+    _, _, pacsv, pq = _require_pyarrow()
+    if path.endswith(".parquet"):
+        return pq.ParquetFile(path).schema_arrow.names
+    return pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=1 << 20)).schema.names
+
+def stream_attestations(path: str, index: IdentityIndex, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                        source_col: str = "source", target_col: str = "target",
+                        base_rate: float = 0.5, prior_weight: float = DEFAULT_PRIOR_WEIGHT,
+                        counts: dict = None):
+    """
+    Yields OpinionBatch chunks. Rows carry either opinion columns
+    (belief, disbelief, uncertainty[, base_rate]) or evidence columns (positive, negative).
+    Rows with a null source or target are dropped and counted in counts["invalid"].
+    """
+    _, pc, _, _ = _require_pyarrow()
+    names = _column_names(path)
+    for col in (source_col, target_col):
+        if col not in names:
+            raise ValueError(f"{path}: no {col!r} column (columns: {names})")
+    evidence = all(c in names for c in EVIDENCE_COLUMNS) and not all(c in names for c in OPINION_COLUMNS[:3])
+    value_cols = [c for c in (EVIDENCE_COLUMNS if evidence else OPINION_COLUMNS) if c in names]
+    columns = [source_col, target_col] + value_cols
+
+    for batch in _open_batches(path, chunk_rows, columns):
+        valid = pc.and_(pc.is_valid(batch.column(source_col)), pc.is_valid(batch.column(target_col)))
+        dropped = batch.num_rows - pc.sum(valid).as_py() if batch.num_rows else 0
+        if dropped:
+            if counts is not None:
+                counts["invalid"] = counts.get("invalid", 0) + dropped
+            batch = batch.filter(valid)
+        if batch.num_rows == 0:
+            continue
+        src = index.encode(batch.column(source_col))
+        dst = index.encode(batch.column(target_col))
+        cols = {c: batch.column(c).to_numpy(zero_copy_only=False).astype(np.float32) for c in value_cols}
+        if evidence:
+            ops = evidence_to_opinions(cols["positive"], cols["negative"], base_rate, prior_weight)
+        else:
+            a = cols.get("base_rate", np.full(batch.num_rows, base_rate, dtype=np.float32))
+            ops = np.stack([cols["belief"], cols["disbelief"], cols["uncertainty"], a], axis=1)
+        index.flush()
+        yield OpinionBatch(src, dst, ops.astype(np.float32))
+
+# --------------------------- Incremental fusion ------------------------------
+
+class StreamingFusion:
+    """
+    Per-target running sums of EBslFusionModule fusion (count, Σbu, Σdu, Σau, Σu,
+    Σlog u). Any number of attestations per target, no truncation or padding.
+    """
+    SUMS = ("count", "sum_bu", "sum_du", "sum_au", "sum_u", "sum_log_u")
+
+    def __init__(self, num_nodes: int = 0, epsilon: float = 1e-6):
+        self.epsilon = float(epsilon)
+        self.num_nodes = 0
+        self.sums = {k: np.zeros(0, dtype=np.float64) for k in self.SUMS}
+        self.reserve(num_nodes)
+
+    def reserve(self, n: int) -> None:
+        if n <= self.num_nodes:
+            return
+        cap = self.sums["count"].shape[0]
+        if n > cap:
+            new_cap = max(n, 2 * cap, 1024)
+            for k, v in self.sums.items():
+                grown = np.zeros(new_cap, dtype=np.float64)
+                grown[:cap] = v
+                self.sums[k] = grown
+        self.num_nodes = n
+
+    def update(self, batch: OpinionBatch) -> None:
+        if len(batch) == 0:
+            return
+        self.reserve(int(max(batch.dst.max(), batch.src.max())) + 1)
+        m = int(batch.dst.max()) + 1
+        b, d, u, a = (batch.opinions[:, k].astype(np.float64) for k in range(4))
+        u_log = np.log(np.clip(u, self.epsilon, 1.0))
+        for key, w in (("count", None), ("sum_bu", b * u), ("sum_du", d * u), ("sum_au", a * u),
+                       ("sum_u", u), ("sum_log_u", u_log)):
+            self.sums[key][:m] += np.bincount(batch.dst, weights=w, minlength=m)
+
+    def finalize(self, ids=None):
+        """fused [N, 4] and rep [N, 1] with the circuit's numerics (only rows `ids` if given)."""
+        s = {k: (v[:self.num_nodes] if ids is None else v[ids]).astype(np.float32) for k, v in self.sums.items()}
+        return NumpyEBSLAlgorithm.fuse_from_sums(s["count"], s["sum_bu"], s["sum_du"], s["sum_au"],
+                                                 s["sum_u"], s["sum_log_u"], self.epsilon)
+
+def load_and_fuse(path: str, index: IdentityIndex, fusion: StreamingFusion = None,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS, **kwargs):
+    """Streams a file through (a new or existing) StreamingFusion; returns (fusion, stats)."""
+    fusion = fusion if fusion is not None else StreamingFusion(len(index))
+    rows = chunks = 0
+    counts = {"invalid": 0}
+    t0 = time.perf_counter()
+    for batch in stream_attestations(path, index, chunk_rows, counts=counts, **kwargs):
+        fusion.update(batch)
+        rows += len(batch)
+        chunks += 1
+    fusion.reserve(len(index))
+    dt = time.perf_counter() - t0
+    return fusion, {"rows": rows, "chunks": chunks, "invalid": counts["invalid"], "identities": len(index),
+                    "seconds": dt, "rows_per_second": rows / dt if dt > 0 else None}
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream attestation exports into EBSL reputation")
+    ap.add_argument("inputs", nargs="+", help="CSV or Parquet attestation files")
+    ap.add_argument("--index", default=os.path.join("zkml_artifacts", "identities.jsonl"),
+                    help="Persistent identity index")
+    ap.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    ap.add_argument("--source-col", default="source")
+    ap.add_argument("--target-col", default="target")
+    ap.add_argument("--out", default=os.path.join("zkml_artifacts", "reputation.parquet"),
+                    help="Columnar reputation export (see ebsl_export)")
+    args = ap.parse_args()
+
+    from ebsl_export import export_reputation
+
+    index = IdentityIndex(args.index)
+    fusion = StreamingFusion(len(index))
+    for path in args.inputs:
+        fusion, stats = load_and_fuse(path, index, fusion, args.chunk_rows,
+                                      source_col=args.source_col, target_col=args.target_col)
+        print(f"[✓] Loaded {path}: {stats['rows']:,} rows in {stats['chunks']} chunks "
+              f"({stats['rows_per_second'] or 0:,.0f} rows/s)"
+              + (f", {stats['invalid']:,} rows without source/target dropped" if stats["invalid"] else ""))
+    fused, _ = fusion.finalize()
+    export_reputation(fused, args.out, node_ids=np.asarray(index.names, dtype=object), fusion="sums")
+    print(f"[✓] {len(index):,} identities -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Merkle tree over quantized reputation scores, hashed with the circuit's Poseidon
+- Quantizes scores like EZKL does for circuit outputs: round(score * 2**scale),
+  field-encoded like ezkl (negative values as p - |x| in BN254 Fr)
+- Leaves are poseidon([index, score]) and nodes poseidon([left, right]) through
+  ezkl.poseidon_hash, the hash EZKL circuits use for hashed visibility, so the
+  root is a field element a membership circuit can take as its set-commitment
+  instance (ZKMLOnChainVerifier.verifySetMembership publicInputs[0]); the fixed
+  depth tells leaves and nodes apart, odd levels are padded with the zero element
+- Level-by-level hashing on contiguous [n, 32] byte buffers (little-endian field
+  elements, as ezkl prints them), fanned out over a process pool for large levels
+- Vectorized inclusion-path extraction into a single memmap-able .npy file
+- Incremental rebuild: only ancestors of changed leaves are rehashed
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+HASH_BYTES = 32                   # one BN254 scalar field element, little-endian
+FIELD_MODULUS = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+EMPTY_HASH = np.zeros(HASH_BYTES, dtype=np.uint8)
+DEFAULT_SCALE = 6                 # balanced zk strategy input/param scale
+PARALLEL_MIN_ROWS = 1 << 12       # below this a level is hashed in-process
+
+def _require_ezkl():
+    try:
+        import ezkl
+    except ImportError as e:
+        raise ImportError("Poseidon Merkle trees require ezkl (pip install ezkl)") from e
+    return ezkl
+
+# --------------------------- Quantization ------------------------------------
+
+def quantize_scores(scores, scale: int = DEFAULT_SCALE) -> np.ndarray:
+    """Fixed-point quantization matching EZKL: round(x * 2**scale) as int64."""
+    if hasattr(scores, "detach"):
+        scores = scores.detach().cpu().numpy()
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    return np.rint(scores * float(2 ** scale)).astype(np.int64)
+
+def load_output_scale(settings_path: str, output_index: int = -1, default: int = DEFAULT_SCALE) -> int:
+    """Reads the circuit output scale (e.g. for `rep`) from an ezkl settings.json."""
+    try:
+        with open(settings_path, "r") as f:
+            s = json.load(f)
+        scales = s.get("model_output_scales") or []
+        return int(scales[output_index]) if scales else default
+    except Exception:
+        return default
+
+# --------------------------- Hashing -----------------------------------------
+
+def to_field_bytes(values) -> np.ndarray:
+    """int64 values -> [n, 32] uint8 little-endian field elements (negatives wrap mod p)."""
+    values = np.asarray(values, dtype=np.int64).reshape(-1)
+    out = np.zeros((values.size, HASH_BYTES), dtype=np.uint8)
+    out[:, :8] = values.astype("<i8").view(np.uint8).reshape(-1, 8)
+    neg = values < 0
+    if neg.any():
+        out[neg] = np.frombuffer(b"".join((FIELD_MODULUS + int(v)).to_bytes(HASH_BYTES, "little")
+                                          for v in values[neg]), dtype=np.uint8).reshape(-1, HASH_BYTES)
+    return out
+
+def field_to_int(element) -> int:
+    """32-byte little-endian field element -> uint256 (its value as a circuit instance)."""
+    if not isinstance(element, (bytes, bytearray)):
+        element = np.asarray(element, dtype=np.uint8).tobytes()
+    return int.from_bytes(element, "little")
+
+def _hash_rows(rows: np.ndarray) -> bytes:
+    """poseidon over the field elements of each [n, k*32] row."""
+    poseidon = _require_ezkl().poseidon_hash
+    rows = np.ascontiguousarray(rows, dtype=np.uint8)
+    k = rows.shape[1] // HASH_BYTES
+    hexed = [row.tobytes().hex() for row in rows]
+    w = 2 * HASH_BYTES
+    return b"".join(bytes.fromhex(poseidon([h[j * w:(j + 1) * w] for j in range(k)])[0]) for h in hexed)
+
+def hash_rows(rows: np.ndarray, pool: ProcessPoolExecutor = None, chunk_rows: int = PARALLEL_MIN_ROWS) -> np.ndarray:
+    """Poseidon of each row of a [n, k*32] buffer of field elements -> [n, 32] uint8."""
+    n = rows.shape[0]
+    if pool is None or n < 2 * chunk_rows:
+        out = _hash_rows(rows)
+    else:
+        chunks = [rows[i:i + chunk_rows] for i in range(0, n, chunk_rows)]
+        out = b"".join(pool.map(_hash_rows, chunks))
+    return np.frombuffer(out, dtype=np.uint8).reshape(n, HASH_BYTES)
+
+def _leaf_rows(indices: np.ndarray, quantized: np.ndarray) -> np.ndarray:
+    """[n, 64] rows: index || score as field elements."""
+    return np.hstack([to_field_bytes(indices), to_field_bytes(quantized)])
+
+def _node_rows(level: np.ndarray) -> np.ndarray:
+    """Pairs children into [n/2, 64] rows: left || right (odd levels padded)."""
+    if level.shape[0] % 2:
+        level = np.vstack([level, EMPTY_HASH[None]])
+    return np.ascontiguousarray(level).reshape(level.shape[0] // 2, 2 * HASH_BYTES)
+
+def hash_leaf(index: int, quantized_score: int) -> bytes:
+    return _hash_rows(_leaf_rows(np.array([index]), np.array([quantized_score])))
+
+def verify_path(index: int, quantized_score: int, siblings, root: bytes) -> bool:
+    """Recomputes the root from a leaf and its [depth, 32] sibling path."""
+    h = hash_leaf(index, quantized_score)
+    for sib in siblings:
+        sib = bytes(np.asarray(sib, dtype=np.uint8))
+        pair = sib + h if index & 1 else h + sib
+        h = _hash_rows(np.frombuffer(pair, dtype=np.uint8)[None])
+        index >>= 1
+    return h == bytes(root)
+
+# --------------------------- Tree --------------------------------------------
+
+class ReputationMerkleTree:
+    """Levels are stored as [n_l, 32] uint8 arrays; levels[0] are the leaves."""
+
+    def __init__(self, levels, quantized: np.ndarray, scale: int):
+        self.levels = levels
+        self.quantized = quantized
+        self.scale = int(scale)
+
+    @classmethod
+    def build(cls, scores, scale: int = DEFAULT_SCALE, workers: int = None) -> "ReputationMerkleTree":
+        quantized = quantize_scores(scores, scale)
+        if quantized.size == 0:
+            raise ValueError("Cannot build a Merkle tree with no leaves")
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and quantized.size >= 2 * PARALLEL_MIN_ROWS else None
+        try:
+            indices = np.arange(quantized.size, dtype=np.int64)
+            levels = [hash_rows(_leaf_rows(indices, quantized), pool)]
+            while levels[-1].shape[0] > 1:
+                levels.append(hash_rows(_node_rows(levels[-1]), pool))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return cls(levels, quantized, scale)
+
+    @property
+    def root(self) -> bytes:
+        return bytes(self.levels[-1][0])
+
+    @property
+    def root_uint256(self) -> int:
+        """The root as the uint256 instance a membership circuit / contract sees."""
+        return field_to_int(self.levels[-1][0])
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    @property
+    def num_leaves(self) -> int:
+        return self.levels[0].shape[0]
+
+    def update(self, indices, scores) -> int:
+        """
+        Incremental rebuild after some scores change; returns the number of
+        hashes recomputed (k * depth in the worst case instead of ~2N).
+        """
+        # levels wrap hash bytes or a memmap (read-only); copy them on first update
+        self.levels = [l if l.flags.writeable else np.array(l) for l in self.levels]
+        idx = np.unique(np.asarray(indices, dtype=np.int64))
+        new_q = quantize_scores(scores, self.scale)
+        if new_q.size != np.asarray(indices).size:
+            raise ValueError("indices and scores must have the same length")
+        order = np.argsort(np.asarray(indices, dtype=np.int64), kind="stable")
+        sorted_idx = np.asarray(indices, dtype=np.int64)[order]
+        # last write wins for duplicated indices
+        last = np.r_[sorted_idx[1:] != sorted_idx[:-1], True]
+        self.quantized[idx] = new_q[order][last]
+
+        hashed = idx.size
+        self.levels[0][idx] = hash_rows(_leaf_rows(idx, self.quantized[idx]))
+        for lvl in range(1, len(self.levels)):
+            idx = np.unique(idx >> 1)
+            child = self.levels[lvl - 1]
+            left = child[2 * idx]
+            right_idx = 2 * idx + 1
+            right = np.where((right_idx < child.shape[0])[:, None],
+                             child[np.minimum(right_idx, child.shape[0] - 1)], EMPTY_HASH[None])
+            self.levels[lvl][idx] = hash_rows(np.hstack([left, right]))
+            hashed += idx.size
+        return hashed
+
+    def paths(self, indices=None) -> np.ndarray:
+        """Sibling hashes for many users at once -> [k, depth, 32] uint8 (vectorized gather)."""
+        idx = np.arange(self.num_leaves, dtype=np.int64) if indices is None else np.asarray(indices, dtype=np.int64)
+        out = np.empty((idx.size, self.depth, HASH_BYTES), dtype=np.uint8)
+        cur = idx.copy()
+        for lvl in range(self.depth):
+            level = self.levels[lvl]
+            sib = cur ^ 1
+            valid = sib < level.shape[0]
+            out[:, lvl] = np.where(valid[:, None], level[np.minimum(sib, level.shape[0] - 1)], EMPTY_HASH[None])
+            cur >>= 1
+        return out
+
+    def export_paths(self, path: str, indices=None, chunk_rows: int = 1 << 18) -> str:
+        """Writes inclusion paths as one .npy ([k, depth, 32] uint8), openable with mmap_mode='r'."""
+        idx = np.arange(self.num_leaves, dtype=np.int64) if indices is None else np.asarray(indices, dtype=np.int64)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(idx.size, self.depth, HASH_BYTES))
+        for start in range(0, idx.size, chunk_rows):
+            out[start:start + chunk_rows] = self.paths(idx[start:start + chunk_rows])
+        out.flush()
+        del out
+        return path
+
+    def save(self, directory: str) -> None:
+        """nodes.npy (all levels concatenated), scores.npy and tree.json metadata."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "nodes.npy"), np.concatenate(self.levels, axis=0))
+        np.save(os.path.join(directory, "scores.npy"), self.quantized)
+        meta = {
+            "hash": "poseidon",
+            "scale": self.scale,
+            "num_leaves": self.num_leaves,
+            "depth": self.depth,
+            "level_sizes": [int(l.shape[0]) for l in self.levels],
+            "root": self.root.hex(),                  # little-endian field element, as ezkl prints it
+            "root_uint256": str(self.root_uint256),
+        }
+        with open(os.path.join(directory, "tree.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ReputationMerkleTree":
+        with open(os.path.join(directory, "tree.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("hash") != "poseidon":
+            raise ValueError(f"{directory} holds a {meta.get('hash')} tree; rebuild it with Poseidon")
+        mode = "r" if mmap else None
+        nodes = np.load(os.path.join(directory, "nodes.npy"), mmap_mode=mode)
+        quantized = np.load(os.path.join(directory, "scores.npy"))
+        offsets = np.cumsum([0] + meta["level_sizes"])
+        levels = [nodes[offsets[i]:offsets[i + 1]] for i in range(len(meta["level_sizes"]))]
+        return cls(levels, quantized, meta["scale"])
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Reputation Merkle tree builder")
+    ap.add_argument("--reputation", help="Exported reputation (.parquet/.arrow from ebsl_export)")
+    ap.add_argument("--settings", help="ezkl settings.json to take the output scale from")
+    ap.add_argument("--scale", type=int, default=None, help="Fixed-point scale override")
+    ap.add_argument("--out", default=os.path.join("zkml_artifacts", "merkle"), help="Output directory")
+    ap.add_argument("--workers", type=int, default=None, help="Hashing processes (default: all cores)")
+    ap.add_argument("--benchmark", type=int, default=None, help="Build over N random scores instead")
+    args = ap.parse_args()
+
+    scale = args.scale if args.scale is not None else (
+        load_output_scale(args.settings) if args.settings else DEFAULT_SCALE)
+    if args.benchmark:
+        scores = np.random.default_rng(1337).random(args.benchmark, dtype=np.float32)
+    elif args.reputation:
+        from ebsl_export import read_reputation, SCORE_COLUMN
+        scores = read_reputation(args.reputation, columns=[SCORE_COLUMN]).column(SCORE_COLUMN).to_numpy()
+    else:
+        ap.error("one of --reputation or --benchmark is required")
+
+    t0 = time.perf_counter()
+    tree = ReputationMerkleTree.build(scores, scale=scale, workers=args.workers)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tree.save(args.out)
+    tree.export_paths(os.path.join(args.out, "paths.npy"))
+    t_write = time.perf_counter() - t0
+    print(f"[✓] {tree.num_leaves:,} leaves, depth {tree.depth}, root {tree.root_uint256} (poseidon)")
+    print(f"    build {t_build:.2f}s, write {t_write:.2f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streaming run telemetry for the EBSL / EZKL scripts
+- Appends one JSON line per step start / end (and per proof) while the run is
+  in progress, instead of only writing run_report.json at exit
+- Counters, gauges and histograms (proofs done, step latency, queue depth,
+  failures) rendered in the Prometheus text exposition format
+- Served on a local /metrics endpoint and / or written atomically to a
+  node_exporter textfile-collector file
+"""
+
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_EVENTS_PATH = os.path.join("zkml_artifacts", "run_events.jsonl")
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# --------------------------- Metric types ------------------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt(x: float) -> str:
+    if x == float("inf"):
+        return "+Inf"
+    return repr(float(x)) if not float(x).is_integer() else str(int(x))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+    def _render_one(self, key, value) -> list:
+        return [f"{self.name}{_labels(self.label_names, key)} {_fmt(value)}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, le in enumerate(self.buckets):
+                if value <= le:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_one(self, key, value) -> list:
+        counts, total = value
+        lines = []
+        for le, c in zip(self.buckets, counts):
+            bucket = 'le="%s"' % _fmt(le)
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, bucket)} {c}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_fmt(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {counts[-1]}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels=()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels=()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+# --------------------------- Exporters ---------------------------------------
+
+def serve_metrics(registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """GET /metrics on a daemon thread; call .shutdown() to stop."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def write_textfile(registry: MetricsRegistry, path: str) -> None:
+    """Atomic write for the node_exporter textfile collector (*.prom)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+# --------------------------- Run telemetry -----------------------------------
+
+class RunTelemetry:
+    """
+    Logger hook: step events go to a JSON-lines file as they happen and update
+    the pipeline metrics; the textfile (if any) is rewritten after every event.
+    """
+    def __init__(self, events_path: str = DEFAULT_EVENTS_PATH, registry: MetricsRegistry = None,
+                 textfile: str = None, run_id: str = None):
+        self.registry = registry or MetricsRegistry()
+        self.textfile = textfile
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._lock = threading.Lock()
+        self._events = None
+        if events_path:
+            os.makedirs(os.path.dirname(os.path.abspath(events_path)), exist_ok=True)
+            self._events = open(events_path, "a", buffering=1)
+        r = self.registry
+        self.steps = r.counter("ebsl_steps_total", "Pipeline steps finished.", ("step", "status"))
+        self.step_seconds = r.histogram("ebsl_step_seconds", "Pipeline step latency in seconds.", ("step",))
+        self.failures = r.counter("ebsl_failures_total", "Failed steps and proofs.", ("step",))
+        self.proofs = r.counter("ebsl_proofs_total", "Proofs generated.", ("status",))
+        self.proof_seconds = r.histogram("ebsl_proof_seconds", "Witness + prove latency per proof.")
+        self.queue_depth = r.gauge("ebsl_queue_depth", "Items waiting in a pipeline queue.", ("queue",))
+        self.in_progress = r.gauge("ebsl_step_in_progress", "1 while a step is running.", ("step",))
+        self.last_event = r.gauge("ebsl_last_event_timestamp_seconds", "Unix time of the last event.")
+
+    def event(self, kind: str, **fields) -> None:
+        now = time.time()
+        if self._events is not None:
+            line = json.dumps({"ts": now, "run": self.run_id, "event": kind, **fields}, default=str)
+            with self._lock:
+                self._events.write(line + "\n")
+        self.last_event.set(now)
+        if self.textfile:
+            write_textfile(self.registry, self.textfile)
+
+    def step_started(self, name: str) -> None:
+        self.in_progress.set(1, step=name)
+        self.event("step_start", step=name)
+
+    def step_finished(self, name: str, ok: bool, seconds: float, extra: dict = None) -> None:
+        status = "ok" if ok else "fail"
+        self.steps.inc(step=name, status=status)
+        self.step_seconds.observe(seconds, step=name)
+        self.in_progress.set(0, step=name)
+        if not ok:
+            self.failures.inc(step=name)
+        if name == "prove":
+            self.proofs.inc(status=status)
+            if ok:
+                self.proof_seconds.observe(seconds)
+        self.event("step_end", step=name, ok=ok, seconds=seconds, extra=extra or {})
+
+    def proof_finished(self, ok: bool, seconds: float, **fields) -> None:
+        """Proofs made inside a step (epoch / queue workers), one event each."""
+        self.proofs.inc(status="ok" if ok else "fail")
+        if ok:
+            self.proof_seconds.observe(seconds)
+        else:
+            self.failures.inc(step="proof")
+        self.event("proof", ok=ok, seconds=seconds, **fields)
+
+    def set_queue_depth(self, queue: str, depth: int) -> None:
+        self.queue_depth.set(depth, queue=queue)
+
+    def close(self) -> None:
+        if self.textfile:
+            write_textfile(self.registry, self.textfile)
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+def add_metrics_args(ap) -> None:
+    """Shared CLI flags for run telemetry."""
+    ap.add_argument("--events", default=DEFAULT_EVENTS_PATH,
+                    help="Append step events as JSON lines here ('' to disable)")
+    ap.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    ap.add_argument("--metrics-textfile", default=None, help="Write Prometheus metrics to this .prom file")
+
+def telemetry_from_args(args):
+    """(RunTelemetry, http server or None) from add_metrics_args flags."""
+    telemetry = RunTelemetry(args.events or None, textfile=args.metrics_textfile)
+    server = serve_metrics(telemetry.registry, port=args.metrics_port) if args.metrics_port else None
+    return telemetry, server
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NumPy-only EBSL engine (no torch import)
+- Same numerics as ClassicalEBSLAlgorithm / EBSLAlgorithm in ebsl_full_script.py
+- Batched masked fusion mirroring EBslFusionModule (log-domain product, sign-preserving clamp)
+- For scoring workers that never export or prove: NumpyEBSLAlgorithm.fuse_combined
+  takes the same (B, K*4 + K) layout as EBslFusionModule
+- Backend selection ("numpy" | "torch"): get_ebsl_backend returns an engine with
+  the NumpyEBSLAlgorithm ndarray API; torch is imported only for "torch"
+- Benchmark of import time, peak RSS and throughput against the torch path
+  (torch + ebsl_torch only, without the ezkl / onnx imports of ebsl_full_script)
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import numpy as np
+
+BACKENDS = ("numpy", "torch")
+
+# --------------------------- EBSL logic --------------------------------------
+
+def _split(opinions: np.ndarray):
+    return opinions[..., 0], opinions[..., 1], opinions[..., 2], opinions[..., 3]
+
+class NumpyClassicalEBSLAlgorithm:
+    @staticmethod
+    def fuse(opinions: np.ndarray) -> np.ndarray:
+        # opinions: [N, 4] -> [b,d,u,a]
+        opinions = np.asarray(opinions, dtype=np.float32)
+        b, d, u, a = _split(opinions)
+        denominator = np.sum(u, axis=-1) - np.float32(opinions.shape[-2] - 1)
+        if np.any(denominator == 0):
+            denominator = denominator + (denominator == 0) * np.float32(1e-9)
+        b_fused = np.sum(b * u, axis=-1) / denominator
+        d_fused = np.sum(d * u, axis=-1) / denominator
+        u_fused = np.prod(u, axis=-1) / denominator
+        a_fused = np.sum(a * u, axis=-1) / denominator
+        return np.stack([b_fused, d_fused, u_fused, a_fused], axis=-1).astype(np.float32)
+
+class NumpyEBSLAlgorithm:
+    @staticmethod
+    def fuse(opinions: np.ndarray) -> np.ndarray:
+        # opinions: [..., N, 4]; leading dims are fused independently
+        opinions = np.asarray(opinions, dtype=np.float32)
+        b, d, u, a = _split(opinions)
+        denominator = np.sum(u, axis=-1) - np.float32(opinions.shape[-2] - 1)
+        is_zero = (denominator == 0).astype(np.float32)
+        denominator = denominator + is_zero * np.float32(1e-9)
+        inv_denominator = np.reciprocal(denominator)
+        b_fused = np.sum(b * u, axis=-1) * inv_denominator
+        d_fused = np.sum(d * u, axis=-1) * inv_denominator
+        u_fused = np.prod(u, axis=-1) * inv_denominator
+        a_fused = np.sum(a * u, axis=-1) * inv_denominator
+        return np.stack([b_fused, d_fused, u_fused, a_fused], axis=-1).astype(np.float32)
+
+    @staticmethod
+    def fuse_batch(opinions: np.ndarray, mask: np.ndarray, epsilon: float = 1e-6):
+        """
+        Masked batched fusion, numerically identical to EBslFusionModule.forward.
+        opinions: (B, K, 4), mask: (B, K) -> fused (B, 4), rep (B, 1)
+        """
+        opinions = np.asarray(opinions, dtype=np.float32)
+        m = np.asarray(mask, dtype=np.float32)
+        eps = np.float32(epsilon)
+        one = np.float32(1.0)
+        b, d, u, a = _split(opinions)
+
+        K = np.sum(m, axis=1)
+        sum_bu = np.sum((b * u) * m, axis=1)
+        sum_du = np.sum((d * u) * m, axis=1)
+        sum_au = np.sum((a * u) * m, axis=1)
+        sum_u = np.sum(u * m, axis=1)
+
+        # Stable product via logs (avoids huge intermediates)
+        u_masked = u * m + (one - m)
+        u_clamped = np.clip(u_masked, eps, one)
+        sum_log_u = np.sum(np.log(u_clamped), axis=1)
+
+        return NumpyEBSLAlgorithm.fuse_from_sums(K, sum_bu, sum_du, sum_au, sum_u, sum_log_u, epsilon)
+
+    @staticmethod
+    def fuse_from_sums(K, sum_bu, sum_du, sum_au, sum_u, sum_log_u, epsilon: float = 1e-6):
+        """
+        Finishes EBslFusionModule fusion from per-user running sums, so callers can
+        accumulate opinions incrementally (streaming, segments) and fuse at the end.
+        """
+        eps = np.float32(epsilon)
+        one = np.float32(1.0)
+        prod_u = np.exp(np.asarray(sum_log_u, dtype=np.float32))
+
+        # Sign-preserving denom clamp
+        denom = np.asarray(sum_u, dtype=np.float32) - np.asarray(K, dtype=np.float32) + one
+        denom_sign = np.where(denom >= 0, one, -one)
+        denom = denom_sign * np.maximum(np.abs(denom), eps)
+
+        b_f = sum_bu / denom
+        d_f = sum_du / denom
+        u_f = prod_u / denom
+        a_f = sum_au / denom
+
+        fused = np.stack([b_f, d_f, u_f, a_f], axis=1).astype(np.float32)
+        rep = (b_f + a_f * u_f)[:, None].astype(np.float32)
+        return fused, rep
+
+    @staticmethod
+    def fuse_product(opinions: np.ndarray, num_sources: int = None, eps: float = 1e-6,
+                     eps_sum: float = 1e-6) -> np.ndarray:
+        """
+        One target's fusion with the product-form numerics of EBSL_EZKL.fuse_all_nodes
+        (the reputation.parquet snapshot). opinions: (k, 4) -> fused (4,). Sources
+        without an attestation hold the default (0, 0, 1, 0.5) there and contribute
+        (1 - eps) to each clamped product; pass num_sources = N to include them.
+        """
+        opinions = np.asarray(opinions, dtype=np.float32).reshape(-1, 4)
+        e, one = np.float32(eps), np.float32(1.0)
+        b, d, u, a = _split(opinions)
+        absent = max(0, (num_sources or opinions.shape[0]) - opinions.shape[0])
+        pad = (one - e) ** np.float32(absent)
+
+        def _prod(x):
+            return np.prod(np.clip(x, e, one - e), dtype=np.float32) * pad
+
+        fused_b = np.clip(one - _prod(one - b), e, one - e)
+        fused_d = np.clip(one - _prod(one - d), e, one - e)
+        fused_u = np.clip(_prod(u), e, one - e)
+        total = fused_b + fused_d + fused_u + np.float32(eps_sum)
+
+        weights = one - u
+        den = np.sum(weights, dtype=np.float32)
+        fused_a = np.sum(a * weights, dtype=np.float32) / (den + e) if den > 0 else np.float32(0.5)
+        return np.array([fused_b / total, fused_d / total, fused_u / total, fused_a], dtype=np.float32)
+
+    @staticmethod
+    def fuse_combined(combined_input: np.ndarray, max_opinions: int):
+        """Same as fuse_batch but takes the single-input ONNX layout (B, K*4 + K)."""
+        combined_input = np.asarray(combined_input, dtype=np.float32)
+        B = combined_input.shape[0]
+        opinions = combined_input[:, :max_opinions * 4].reshape(B, max_opinions, 4)
+        mask = combined_input[:, max_opinions * 4:max_opinions * 5]
+        return NumpyEBSLAlgorithm.fuse_batch(opinions, mask)
+
+    @staticmethod
+    def calculate_reputation(final_opinions: np.ndarray) -> np.ndarray:
+        b, d, u, a = _split(np.asarray(final_opinions, dtype=np.float32))
+        return b + a * u
+
+# --------------------------- Backend selection --------------------------------
+
+def get_ebsl_backend(name: str = "numpy"):
+    """
+    EBSL engine with the ndarray API of NumpyEBSLAlgorithm (fuse, fuse_batch,
+    fuse_combined, calculate_reputation). The torch backend is imported lazily
+    so numpy-only workers never load torch.
+    """
+    if name == "numpy":
+        return NumpyEBSLAlgorithm
+    if name == "torch":
+        from ebsl_torch import TorchEBSLBackend
+        return TorchEBSLBackend
+    raise ValueError(f"Unknown EBSL backend {name!r}; expected one of {BACKENDS}")
+
+# --------------------------- Synthetic inputs ---------------------------------
+
+def _gen_synthetic_batch(batch: int, max_opinions: int, seed: int = 1337):
+    rng = np.random.default_rng(seed)
+    b = rng.random((batch, max_opinions), dtype=np.float32)
+    d = rng.random((batch, max_opinions), dtype=np.float32) * (1.0 - b)
+    u = 1.0 - b - d
+    a = rng.random((batch, max_opinions), dtype=np.float32)
+    opinions = np.stack([b, d, u, a], axis=-1)
+    mask = np.ones((batch, max_opinions), dtype=np.float32)
+    return opinions, mask
+
+# --------------------------- Benchmark ----------------------------------------
+
+_BENCH_CHILD = r"""
+import json, sys, time, resource
+t0 = time.perf_counter()
+backend, batch, max_opinions, repeats = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+if backend == "torch":
+    import torch
+    from ebsl_torch import EBslFusionModule
+else:
+    import ebsl_numpy
+import_s = time.perf_counter() - t0
+import numpy as np
+from ebsl_numpy import _gen_synthetic_batch
+opinions, mask = _gen_synthetic_batch(batch, max_opinions)
+combined = np.concatenate([opinions.reshape(batch, -1), mask], axis=1)
+if backend == "torch":
+    model = EBslFusionModule(max_opinions=max_opinions).eval()
+    x = torch.from_numpy(combined)
+    def step():
+        with torch.no_grad():
+            model(x)
+else:
+    def step():
+        ebsl_numpy.NumpyEBSLAlgorithm.fuse_combined(combined, max_opinions)
+step()
+t1 = time.perf_counter()
+for _ in range(repeats):
+    step()
+run_s = time.perf_counter() - t1
+print(json.dumps({
+    "backend": backend,
+    "import_seconds": import_s,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "users_per_second": batch * repeats / run_s if run_s > 0 else None,
+}))
+"""
+
+def benchmark_backends(backends=BACKENDS, batch: int = 10000, max_opinions: int = 16, repeats: int = 20) -> list:
+    """
+    Runs each backend in a fresh interpreter so import time and RSS are not
+    polluted by modules already loaded in this process.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name in backends:
+        proc = subprocess.run(
+            [sys.executable, "-c", _BENCH_CHILD, name, str(batch), str(max_opinions), str(repeats)],
+            cwd=here, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            results.append({"backend": name, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description="NumPy EBSL engine benchmark")
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    ap.add_argument("--batch", type=int, default=10000, help="Users per fused batch")
+    ap.add_argument("--max-opinions", type=int, default=16, help="Opinions per user")
+    ap.add_argument("--repeats", type=int, default=20, help="Timed batches per backend")
+    ap.add_argument("--output", help="Optional JSON results path")
+    args = ap.parse_args()
+
+    results = benchmark_backends(args.backends, args.batch, args.max_opinions, args.repeats)
+    for r in results:
+        if "error" in r:
+            print(f"[!] {r['backend']}: {r['error']}")
+            continue
+        print(f"{r['backend']:>6}: import {r['import_seconds']:.3f}s, "
+              f"peak RSS {r['peak_rss_mb']:.1f} MB, {r['users_per_second']:,.0f} users/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
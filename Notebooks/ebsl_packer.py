@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Trust graph -> per-user EBslFusionModule inputs
+- In-neighbor (CSR-by-target) index over an edge list or an [S, N, 4] trust matrix
+- Pads/truncates each target's attestations to max_opinions and builds the mask
+- Emits one contiguous (users, max_opinions*5) float32 block per chunk of targets
+  in a single vectorized scatter: no per-user Python
+- Output layout matches combined_input: concat(flat(opinions), flat(mask))
+"""
+
+import os
+import zipfile
+import argparse
+
+import numpy as np
+
+TRUNCATE_ORDERS = ("certainty", "input")
+
+# --------------------------- Index -------------------------------------------
+
+def _as_numpy(x, dtype=None):
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().numpy()
+    return np.asarray(x, dtype=dtype)
+
+class InNeighborIndex:
+    """
+    Edges sorted by target; offsets[t]:offsets[t+1] are t's incoming attestations.
+    With order="certainty" each group is sorted by ascending uncertainty, so
+    truncation to max_opinions keeps the most evidenced opinions.
+    """
+    def __init__(self, src, dst, opinions, num_nodes: int = None, order: str = "certainty"):
+        if order not in TRUNCATE_ORDERS:
+            raise ValueError(f"order must be one of {TRUNCATE_ORDERS}")
+        src = _as_numpy(src, np.int64)
+        dst = _as_numpy(dst, np.int64)
+        opinions = _as_numpy(opinions, np.float32).reshape(-1, 4)
+        if not (src.shape[0] == dst.shape[0] == opinions.shape[0]):
+            raise ValueError("src, dst and opinions must have the same number of edges")
+        self.num_nodes = int(num_nodes if num_nodes is not None else (max(src.max(initial=-1), dst.max(initial=-1)) + 1))
+        if order == "certainty":
+            perm = np.lexsort((opinions[:, 2], dst))
+        else:
+            perm = np.argsort(dst, kind="stable")
+        self.src = src[perm]
+        self.dst = dst[perm]
+        self.opinions = opinions[perm]
+        counts = np.bincount(self.dst, minlength=self.num_nodes)
+        self.offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        # position of each edge within its target group
+        self.rank = np.arange(self.dst.shape[0], dtype=np.int64) - self.offsets[self.dst]
+
+    @classmethod
+    def from_trust_matrix(cls, trust_matrix, adjacency=None, order: str = "certainty") -> "InNeighborIndex":
+        """
+        [S, N, 4] trust matrix (EBSLAlgorithm.trust_matrix). Without an explicit
+        adjacency, entries differing from the default uncertain opinion are edges.
+        """
+        T = _as_numpy(trust_matrix, np.float32)
+        if adjacency is None:
+            adjacency = (T[..., 0] != 0) | (T[..., 1] != 0) | (T[..., 2] != 1.0)
+        src, dst = np.nonzero(_as_numpy(adjacency, bool))
+        return cls(src, dst, T[src, dst], num_nodes=T.shape[1], order=order)
+
+    @property
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+# --------------------------- Packing -----------------------------------------
+
+def pack_combined_inputs(index: InNeighborIndex, max_opinions: int, targets=None) -> np.ndarray:
+    """(len(targets), max_opinions*5) combined_input rows; targets default to all nodes."""
+    K = int(max_opinions)
+    if targets is None:
+        lo, hi = 0, index.num_nodes
+        targets = np.arange(lo, hi, dtype=np.int64)
+        e0, e1 = index.offsets[lo], index.offsets[hi]
+        row_of = index.dst[e0:e1] - lo
+        rank = index.rank[e0:e1]
+        ops = index.opinions[e0:e1]
+    else:
+        targets = _as_numpy(targets, np.int64)
+        counts = index.in_degree[targets]
+        starts = index.offsets[targets]
+        row_of = np.repeat(np.arange(targets.size, dtype=np.int64), counts)
+        # gather each target's contiguous edge range
+        edge_ids = np.repeat(starts - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())
+        rank = index.rank[edge_ids]
+        ops = index.opinions[edge_ids]
+
+    keep = rank < K
+    row_of, rank, ops = row_of[keep], rank[keep], ops[keep]
+    out = np.zeros((targets.size, K * 5), dtype=np.float32)
+    opin_view = out[:, :K * 4].reshape(targets.size, K, 4)
+    opin_view[row_of, rank] = ops
+    out[row_of, K * 4 + rank] = 1.0
+    return out
+
+def iter_packed_chunks(index: InNeighborIndex, max_opinions: int, chunk_users: int = 65536):
+    """Yields (target_ids, combined_input block) over contiguous target ranges."""
+    for lo in range(0, index.num_nodes, chunk_users):
+        hi = min(lo + chunk_users, index.num_nodes)
+        yield np.arange(lo, hi, dtype=np.int64), pack_combined_inputs(index, max_opinions, np.arange(lo, hi))
+
+def _write_npy(index: InNeighborIndex, max_opinions: int, path: str, chunk_users: int) -> None:
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+                                    shape=(index.num_nodes, int(max_opinions) * 5))
+    for ids, block in iter_packed_chunks(index, max_opinions, chunk_users):
+        out[ids[0]:ids[-1] + 1] = block
+    out.flush()
+    del out
+
+def write_packed(index: InNeighborIndex, max_opinions: int, path: str, chunk_users: int = 65536) -> str:
+    """
+    .npy: streamed chunk-by-chunk into a memmap (bounded memory, row i == node i).
+    .npz: combined_input + user_ids, loadable by ebsl_full_script.py --epoch-inputs;
+          combined_input is streamed to a temporary .npy first and then stored
+          (uncompressed, like np.savez) into the archive, so memory stays bounded too.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if not path.endswith(".npz"):
+        _write_npy(index, max_opinions, path, chunk_users)
+        return path
+    tmp = path + ".combined_input.npy"
+    try:
+        _write_npy(index, max_opinions, tmp, chunk_users)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            zf.write(tmp, "combined_input.npy")
+            with zf.open("user_ids.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.arange(index.num_nodes, dtype=np.int64))
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+def truncation_stats(index: InNeighborIndex, max_opinions: int) -> dict:
+    deg = index.in_degree
+    return {
+        "users": int(index.num_nodes),
+        "edges": int(index.dst.shape[0]),
+        "max_in_degree": int(deg.max(initial=0)),
+        "truncated_users": int(np.count_nonzero(deg > max_opinions)),
+        "dropped_opinions": int(np.maximum(deg - max_opinions, 0).sum()),
+        "empty_users": int(np.count_nonzero(deg == 0)),
+    }
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack trust graph into per-user combined_input rows")
+    ap.add_argument("edges", help=".npz with src, dst, opinions [E, 4] (or trust_matrix [S, N, 4])")
+    ap.add_argument("--max-opinions", type=int, default=16, help="Opinions per user (circuit shape)")
+    ap.add_argument("--order", choices=TRUNCATE_ORDERS, default="certainty", help="Which opinions survive truncation")
+    ap.add_argument("--chunk-users", type=int, default=65536)
+    ap.add_argument("--out", default=os.path.join("zkml_artifacts", "epoch_inputs.npz"))
+    args = ap.parse_args()
+
+    data = np.load(args.edges)
+    if "trust_matrix" in data.files:
+        index = InNeighborIndex.from_trust_matrix(data["trust_matrix"], order=args.order)
+    else:
+        num_nodes = int(data["num_nodes"]) if "num_nodes" in data.files else None
+        index = InNeighborIndex(data["src"], data["dst"], data["opinions"], num_nodes, order=args.order)
+    write_packed(index, args.max_opinions, args.out, args.chunk_users)
+    print(f"[✓] Packed {index.num_nodes:,} users -> {args.out}")
+    print(f"    {truncation_stats(index, args.max_opinions)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in stage profiling for the EBSL / EZKL scripts
+- StageProfiler.stage(name) wraps a pipeline stage in cProfile or torch.profiler
+- Disabled (the default) or unselected stages get a nullcontext: no overhead
+- Writes per-stage operator/function tables and flamegraph-compatible folded
+  stacks (flamegraph.pl / speedscope) to zkml_artifacts/profiles/
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+PROFILE_MODES = ("off", "cprofile", "torch")
+STAGE_ALIASES = {
+    "fusion": ("fusion", "perf_benchmark", "hypothesis_equivalence_test"),
+    "ezkl": ("gen_settings", "calibrate_settings", "compile_circuit", "get_srs", "setup",
+             "gen_witness", "mock", "prove", "verify"),
+}
+
+# --------------------------- Stack sampler -----------------------------------
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack into folded 'a;b;c count' lines."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+# --------------------------- Profiler ----------------------------------------
+
+class StageProfiler:
+    def __init__(self, mode: str = "off", stages=None, out_dir: str = os.path.join("zkml_artifacts", "profiles"),
+                 row_limit: int = 40):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"profile mode must be one of {PROFILE_MODES}")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.row_limit = row_limit
+        self.written = []
+        if stages is None or stages in ("all", ["all"]):
+            self.stages = None
+        else:
+            if isinstance(stages, str):
+                stages = [s.strip() for s in stages.split(",") if s.strip()]
+            self.stages = set()
+            for s in stages:
+                self.stages.update(STAGE_ALIASES.get(s, (s,)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def stage(self, name: str):
+        if not self.enabled or (self.stages is not None and name not in self.stages):
+            return nullcontext()
+        return self._profile(name)
+
+    @contextmanager
+    def _profile(self, name: str):
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{name}.{self.mode}.{time.strftime('%Y%m%d-%H%M%S')}")
+        # Python stacks are sampled in both modes so every stage gets a .folded file
+        sampler = _StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            with (self._torch_profile(base) if self.mode == "torch" else self._cprofile(base)):
+                yield
+        finally:
+            sampler.stop()
+            sampler.write(base + ".folded")
+            self.written.append(base + ".folded")
+
+    @contextmanager
+    def _cprofile(self, base: str):
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(base + ".prof")
+            with open(base + ".txt", "w") as f:
+                pstats.Stats(prof, stream=f).sort_stats("cumulative").print_stats(self.row_limit)
+            self.written.extend([base + ".prof", base + ".txt"])
+
+    @contextmanager
+    def _torch_profile(self, base: str):
+        from torch.profiler import profile, ProfilerActivity
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True, with_stack=True) as prof:
+            yield
+        with open(base + ".txt", "w") as f:
+            f.write(prof.key_averages(group_by_input_shape=True).table(
+                sort_by="self_cpu_time_total", row_limit=self.row_limit))
+        prof.export_chrome_trace(base + ".trace.json")
+        self.written.extend([base + ".txt", base + ".trace.json"])
+        # operator-level stacks; not every torch build can export them
+        try:
+            prof.export_stacks(base + ".ops.folded", "self_cpu_time_total")
+            if os.path.getsize(base + ".ops.folded"):
+                self.written.append(base + ".ops.folded")
+            else:
+                os.remove(base + ".ops.folded")
+        except Exception:
+            pass
+
+def add_profile_args(ap) -> None:
+    """Shared CLI flags for both scripts."""
+    ap.add_argument("--profile", choices=PROFILE_MODES, default="off",
+                    help="Profile selected stages with cProfile or torch.profiler")
+    ap.add_argument("--profile-stages", default="all",
+                    help="Comma-separated stage names or aliases (fusion, ezkl); default: all")
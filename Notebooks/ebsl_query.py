@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Low-latency reputation query service
+- Loads a precomputed reputation snapshot (ebsl_export Parquet/Arrow) into an id -> row index
+- Single and bulk lookups: LRU cache -> snapshot -> recompute from in-neighbors
+- Bounded LRU of recomputed fusions, invalidated when a user's attestations change
+- Recomputes with the fusion that produced the snapshot (schema metadata): the
+  product form of EBSL_EZKL.fuse_all_nodes, or EBslFusionModule sums (ebsl_loader / ebsl_stream)
+- p50/p99 latency per single lookup and per bulk call (kept apart), per-tier hit
+  rates; optional stdlib HTTP front end (percent-encoded ids in paths)
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+
+from ebsl_numpy import NumpyEBSLAlgorithm
+from ebsl_export import read_reputation, reputation_fusion, table_to_reputation
+
+DEFAULT_CACHE_SIZE = 100_000
+FUSIONS = ("product", "sums")
+DEFAULT_FUSION = "product"       # untagged snapshots come from EBSL_EZKL
+LATENCY_WINDOW = 100_000
+
+# --------------------------- Cache -------------------------------------------
+
+class LRUCache:
+    """OrderedDict LRU with explicit invalidation (functools.lru_cache cannot evict one key)."""
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        self.capacity = int(capacity)
+        self._data = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def __len__(self):
+        return len(self._data)
+
+# --------------------------- Service -----------------------------------------
+
+class ReputationQueryService:
+    """
+    Rows are dense user ids (row i == node_ids[i] of the snapshot, matching
+    ebsl_loader.IdentityIndex order). Attestations are kept per target row so a
+    single user's fusion can be recomputed without touching anyone else.
+    """
+    def __init__(self, node_ids, fused: np.ndarray, cache_size: int = DEFAULT_CACHE_SIZE,
+                 max_opinions: int = None, fusion: str = DEFAULT_FUSION):
+        if fusion not in FUSIONS:
+            raise ValueError(f"Unknown fusion {fusion!r}; expected one of {FUSIONS}")
+        self.fusion = fusion
+        self.keys = {str(k): i for i, k in enumerate(node_ids)}
+        self.fused = np.asarray(fused, dtype=np.float32)
+        self.stale = np.zeros(self.fused.shape[0], dtype=bool)
+        self.in_opinions = {}            # row -> [k, 4] float32 attestations received
+        self.max_opinions = max_opinions
+        self.cache = LRUCache(cache_size)
+        self.counts = {"cache": 0, "snapshot": 0, "computed": 0, "unknown": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.bulk_latencies = deque(maxlen=LATENCY_WINDOW)     # (seconds, users) per get_many call
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, path: str, fusion: str = None, **kwargs) -> "ReputationQueryService":
+        """`fusion` defaults to the one recorded in the snapshot."""
+        table = read_reputation(path)
+        fusion = fusion or reputation_fusion(table, DEFAULT_FUSION)
+        return cls(table.column("node_id").to_pylist(), table_to_reputation(table), fusion=fusion, **kwargs)
+
+    def load_attestations(self, src, dst, opinions) -> None:
+        """Bulk-load the in-neighbor lists used for recomputation (dense row ids)."""
+        dst = np.asarray(dst, dtype=np.int64)
+        opinions = np.asarray(opinions, dtype=np.float32).reshape(-1, 4)
+        order = np.argsort(dst, kind="stable")
+        dst, opinions = dst[order], opinions[order]
+        bounds = np.flatnonzero(np.diff(dst)) + 1
+        for rows, ops in zip(np.split(dst, bounds), np.split(opinions, bounds)):
+            if rows.size:
+                self.in_opinions[int(rows[0])] = ops
+
+    # ---- writes ----
+
+    def _row(self, user, create: bool = False):
+        key = str(user)
+        row = self.keys.get(key)
+        if row is None and create:
+            row = len(self.keys)
+            self.keys[key] = row
+            if row >= self.fused.shape[0]:
+                grow = max(row + 1, 2 * self.fused.shape[0], 16)
+                fused = np.zeros((grow, 4), dtype=np.float32)
+                fused[:self.fused.shape[0]] = self.fused
+                stale = np.ones(grow, dtype=bool)
+                stale[:self.stale.shape[0]] = self.stale
+                self.fused, self.stale = fused, stale
+        return row
+
+    def set_attestations(self, user, opinions) -> None:
+        """Replaces a user's incoming attestations and invalidates their cached result."""
+        with self.lock:
+            row = self._row(user, create=True)
+            self.in_opinions[row] = np.asarray(opinions, dtype=np.float32).reshape(-1, 4)
+            self.stale[row] = True
+            self.cache.invalidate(row)
+
+    def add_attestation(self, user, opinion) -> None:
+        with self.lock:
+            row = self._row(user, create=True)
+            prev = self.in_opinions.get(row, np.zeros((0, 4), dtype=np.float32))
+            self.in_opinions[row] = np.vstack([prev, np.asarray(opinion, dtype=np.float32).reshape(1, 4)])
+            self.stale[row] = True
+            self.cache.invalidate(row)
+
+    # ---- reads ----
+
+    def _recompute(self, row: int) -> np.ndarray:
+        ops = self.in_opinions.get(row, np.zeros((0, 4), dtype=np.float32))
+        if self.max_opinions is not None:
+            ops = ops[np.argsort(ops[:, 2], kind="stable")[:self.max_opinions]]
+        if self.fusion == "product":
+            # fuse_all_nodes runs over every source (N == number of users)
+            return NumpyEBSLAlgorithm.fuse_product(ops, num_sources=len(self.keys))
+        fused, _ = NumpyEBSLAlgorithm.fuse_batch(ops[None], np.ones((1, ops.shape[0]), dtype=np.float32))
+        return fused[0]
+
+    def _lookup(self, user):
+        row = self.keys.get(str(user))
+        if row is None:
+            self.counts["unknown"] += 1
+            return None, "unknown"
+        cached = self.cache.get(row)
+        if cached is not None:
+            self.counts["cache"] += 1
+            return cached, "cache"
+        if not self.stale[row]:
+            self.counts["snapshot"] += 1
+            return self.fused[row], "snapshot"
+        fused = self._recompute(row)
+        self.cache.put(row, fused)
+        self.counts["computed"] += 1
+        return fused, "computed"
+
+    def get(self, user) -> dict:
+        t0 = time.perf_counter()
+        with self.lock:
+            fused, tier = self._lookup(user)
+            self.latencies.append(time.perf_counter() - t0)
+        return _result(user, fused, tier)
+
+    def get_many(self, users) -> list:
+        """Bulk lookup: fresh snapshot rows are gathered in one vectorized step."""
+        t0 = time.perf_counter()
+        with self.lock:
+            rows = np.array([self.keys.get(str(u), -1) for u in users], dtype=np.int64)
+            # recomputed (cached) users are always stale, so fresh rows go straight to the snapshot
+            fast = (rows >= 0) & ~self.stale[np.maximum(rows, 0)]
+            out = [None] * len(rows)
+            gathered = self.fused[rows[fast]]
+            for j, i in enumerate(np.flatnonzero(fast)):
+                out[i] = _result(users[i], gathered[j], "snapshot")
+            self.counts["snapshot"] += int(fast.sum())
+            for i in np.flatnonzero(~fast):
+                fused, tier = self._lookup(users[i])
+                out[i] = _result(users[i], fused, tier)
+            self.bulk_latencies.append((time.perf_counter() - t0, len(rows)))
+        return out
+
+    def stats(self) -> dict:
+        with self.lock:
+            lat = np.asarray(self.latencies, dtype=np.float64)
+            bulk = np.asarray(self.bulk_latencies, dtype=np.float64).reshape(-1, 2)
+            total = sum(self.counts.values())
+            # only stale users are ever cached, so a cache lookup ends as a hit or a recompute
+            lookups = self.counts["cache"] + self.counts["computed"]
+            out = {
+                "queries": total,
+                "tiers": dict(self.counts),
+                "cache_hit_rate": self.counts["cache"] / lookups if lookups else None,
+                "cache_size": len(self.cache),
+                "stale_users": int(self.stale[:len(self.keys)].sum()),
+            }
+        if lat.size:
+            p50, p99 = np.percentile(lat, [50, 99])
+            out["latency_us"] = {"p50": float(p50 * 1e6), "p99": float(p99 * 1e6)}
+        if bulk.size:
+            p50, p99 = np.percentile(bulk[:, 0], [50, 99])
+            out["bulk_latency_us"] = {"p50": float(p50 * 1e6), "p99": float(p99 * 1e6),
+                                      "calls": int(bulk.shape[0]), "mean_users": float(bulk[:, 1].mean())}
+        return out
+
+def _result(user, fused, tier: str) -> dict:
+    if fused is None:
+        return {"user": str(user), "found": False}
+    b, d, u, a = (float(x) for x in fused)
+    return {"user": str(user), "found": True, "source": tier,
+            "fused": [b, d, u, a], "reputation": b + a * u}
+
+# --------------------------- HTTP front end ----------------------------------
+
+def make_handler(service: ReputationQueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self):
+            return urlsplit(self.path).path
+
+        def do_GET(self):
+            path = self._route()
+            if path == "/stats":
+                return self._send(200, service.stats())
+            if path.startswith("/reputation/"):
+                res = service.get(unquote(path[len("/reputation/"):]))
+                return self._send(200 if res["found"] else 404, res)
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            path = self._route()
+            if path == "/reputation/bulk":
+                return self._send(200, service.get_many(list(body.get("users", []))))
+            if path.startswith("/attestations/"):
+                service.set_attestations(unquote(path[len("/attestations/"):]), body.get("opinions", []))
+                return self._send(200, {"ok": True})
+            self._send(404, {"error": "not found"})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+def main():
+    ap = argparse.ArgumentParser(description="Reputation query service")
+    ap.add_argument("--snapshot", default=os.path.join("zkml_artifacts", "reputation.parquet"))
+    ap.add_argument("--attestations", help=".npz with src, dst, opinions for miss recomputation")
+    ap.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    ap.add_argument("--max-opinions", type=int, default=None, help="Truncate like the circuit on recompute")
+    ap.add_argument("--fusion", choices=FUSIONS, default=None,
+                    help="Recompute numerics (default: recorded in the snapshot, else product)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    args = ap.parse_args()
+
+    service = ReputationQueryService.from_snapshot(args.snapshot, cache_size=args.cache_size,
+                                                   max_opinions=args.max_opinions, fusion=args.fusion)
+    if args.attestations:
+        data = np.load(args.attestations)
+        service.load_attestations(data["src"], data["dst"], data["opinions"])
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"[✓] Serving {len(service.keys):,} users on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(service.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memory-aware job scheduler for EZKL pipeline jobs
+- Each job (a subprocess: full pipeline, setup, prove, aggregate, ...) gets a
+  peak-memory estimate: measured history for the same kind and logrows first,
+  else a model from settings.json (resolved against the job's cwd) or the job's
+  logrows (pk size from logrows / columns / lookups, times a per-kind factor,
+  plus the torch + ezkl process baseline). A job with neither, and no explicit
+  mem_mb, is rejected rather than guessed
+- Jobs are admitted only while the sum of running estimates fits the memory
+  budget; interactive claims always go before nightly batch jobs, and smaller
+  batch jobs may backfill until the blocked one has waited starvation_seconds
+- ebsl_full_script always writes ./zkml_artifacts, so pipeline jobs sharing a
+  cwd are never admitted together (the later one waits, with a warning at submit)
+- Measured peak RSS (wait4 ru_maxrss) is appended to the history file, so
+  estimates tighten as jobs run
+- Reports queue wait per priority class and budget utilization (reserved and
+  measured)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+import numpy as np
+
+from ebsl_circuit_cost import PK_BYTES_PER_ROW, _per_row
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+DEFAULT_HISTORY = os.path.join("zkml_artifacts", "job_history.jsonl")
+# Peak RSS above the process baseline, as a multiple of the pk size (measured
+# with ebsl_bench_matrix at logrows 15: setup ~1.3x, prove ~2.5x)
+PEAK_FACTORS = {"setup": 1.3, "prove": 2.5, "pipeline": 2.5, "aggregate": 2.5, "verify": 0.1}
+BASELINE_MB = 800.0             # torch + ezkl import
+HISTORY_MARGIN = 1.10           # headroom over the worst measured peak
+DEFAULT_STARVATION_SECONDS = 600.0
+
+# --------------------------- Estimation --------------------------------------
+
+def pk_bytes_from_settings(settings: dict) -> int:
+    """pk size implied by a settings.json (same per-row model as ebsl_circuit_cost)."""
+    ra = settings.get("run_args", settings)
+    base, per_lookup = _per_row(PK_BYTES_PER_ROW, int(ra.get("num_inner_cols", 2)))
+    lookups = len(settings.get("required_lookups", []))
+    return int((base + per_lookup * lookups) * (1 << int(ra["logrows"])))
+
+class MemoryHistory:
+    """Append-only JSON lines of measured peaks: {"kind", "logrows", "peak_rss_mb", "seconds", "ts"}."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY):
+        self.path = path
+        self.peaks = {}
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.peaks.setdefault((rec["kind"], rec.get("logrows")), []).append(rec["peak_rss_mb"])
+
+    def estimate(self, kind: str, logrows) -> Optional[float]:
+        peaks = self.peaks.get((kind, logrows))
+        return max(peaks) * HISTORY_MARGIN if peaks else None
+
+    def record(self, kind: str, logrows, peak_rss_mb: float, seconds: float) -> None:
+        self.peaks.setdefault((kind, logrows), []).append(peak_rss_mb)
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"kind": kind, "logrows": logrows, "peak_rss_mb": peak_rss_mb,
+                                "seconds": seconds, "ts": time.time()}) + "\n")
+
+# --------------------------- Jobs --------------------------------------------
+
+@dataclass
+class Job:
+    name: str
+    argv: List[str]
+    kind: str = "prove"                   # key into PEAK_FACTORS / history
+    priority: str = "batch"               # "interactive" | "batch"
+    settings_path: Optional[str] = None
+    mem_mb: Optional[float] = None        # explicit estimate, skips history / model
+    cwd: Optional[str] = None             # also the base for a relative settings_path
+    logrows: Optional[int] = None         # from settings_path when not given
+    exclusive_cwd: bool = False           # writes ./zkml_artifacts: one such job per cwd at a time
+    # filled in by the scheduler
+    estimate_mb: Optional[float] = None
+    estimate_source: Optional[str] = None
+    submitted: Optional[float] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    returncode: Optional[int] = None
+    oversize: bool = False
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        return self.started - self.submitted if self.started is not None else None
+
+def _logrows_from_args(args: List[str]) -> Optional[int]:
+    """
+    --aggr-logrows N (the only logrows ebsl_full_script takes on the command line),
+    and only with --aggregate: otherwise the flag sizes nothing that runs.
+    """
+    args = [str(a) for a in args]
+    if not any(a == "--aggregate" or a.startswith("--aggregate=") for a in args):
+        return None
+    for i, a in enumerate(args):
+        if a.startswith("--aggr-logrows="):
+            value = a.split("=", 1)[1]
+        elif a == "--aggr-logrows" and i + 1 < len(args):
+            value = args[i + 1]
+        else:
+            continue
+        return int(value) if value.isdigit() else None
+    return None
+
+def pipeline_job(name: str, args: List[str], priority: str = "batch", kind: str = "pipeline",
+                 settings_path: str = os.path.join("zkml_artifacts", "settings.json"), **kwargs) -> Job:
+    """
+    Job that runs ebsl_full_script.py with `args` in a fresh interpreter.
+    logrows comes from the args (--aggr-logrows with --aggregate) or the job's
+    settings.json; a fresh pipeline run has neither and needs logrows= or mem_mb=.
+    The job owns its cwd's zkml_artifacts while it runs (exclusive_cwd).
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ebsl_full_script.py")
+    if kwargs.get("logrows") is None:
+        kwargs["logrows"] = _logrows_from_args(args)
+    kwargs.setdefault("exclusive_cwd", True)
+    return Job(name, [sys.executable, script] + list(args), kind=kind, priority=priority,
+               settings_path=settings_path, **kwargs)
+
+def _workdir(job: Job) -> str:
+    return os.path.realpath(job.cwd or os.getcwd())
+
+# --------------------------- Scheduler ---------------------------------------
+
+@dataclass
+class SchedulerReport:
+    budget_mb: float
+    jobs: int
+    failed: int
+    oversize: int
+    wall_seconds: float
+    queue_wait_seconds: dict              # per priority class: p50 / p95 / max
+    reserved_utilization: float           # time-averaged sum of running estimates / budget
+    measured_utilization: float           # same with measured peaks in place of estimates
+    estimate_ratio: dict                  # measured / estimated peak: p50 / max
+    job_records: list = field(default_factory=list)
+
+def _percentiles(xs) -> dict:
+    if not xs:
+        return {}
+    p50, p95 = np.percentile(xs, [50, 95])
+    return {"p50": float(p50), "p95": float(p95), "max": float(max(xs)), "n": len(xs)}
+
+class MemoryScheduler:
+    def __init__(self, budget_mb: float, max_concurrent: int = None, history: MemoryHistory = None,
+                 starvation_seconds: float = DEFAULT_STARVATION_SECONDS, telemetry=None, log=print):
+        self.budget_mb = float(budget_mb)
+        self.max_concurrent = max_concurrent
+        self.history = history if history is not None else MemoryHistory()
+        self.starvation_seconds = starvation_seconds
+        self.telemetry = telemetry
+        self.log = log
+        self.waiting: List[Job] = []
+        self.running: List[Job] = []
+        self.done: List[Job] = []
+        self.reserved_mb = 0.0
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._t0 = time.time()
+
+    def estimate(self, job: Job):
+        """
+        (peak MB, source) from the explicit value, history, the settings model or
+        the job's logrows. Only verify jobs fall back to the process baseline.
+        """
+        settings = None
+        if job.settings_path:
+            path = os.path.join(job.cwd or "", job.settings_path)
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    settings = json.load(f)
+                if job.logrows is None:
+                    job.logrows = int(settings.get("run_args", {}).get("logrows", 0)) or None
+        if job.mem_mb is not None:
+            return float(job.mem_mb), "explicit"
+        measured = self.history.estimate(job.kind, job.logrows) if job.logrows is not None else None
+        if measured is not None:
+            return measured, "history"
+        factor = PEAK_FACTORS.get(job.kind, 2.5)
+        if settings is not None and int(settings.get("run_args", {}).get("logrows", 0)) == job.logrows:
+            return BASELINE_MB + factor * pk_bytes_from_settings(settings) / 2 ** 20, "settings"
+        if job.logrows is not None:
+            return BASELINE_MB + factor * pk_bytes_from_settings({"logrows": job.logrows}) / 2 ** 20, "logrows"
+        if job.kind == "verify":
+            return BASELINE_MB, "baseline"
+        raise ValueError(f"{job.name}: no settings.json at {job.settings_path!r} (cwd {job.cwd!r}), "
+                         "no logrows and no mem_mb; set one of them for this job")
+
+    def submit(self, job: Job) -> Job:
+        if job.priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {tuple(PRIORITIES)}")
+        job.estimate_mb, job.estimate_source = self.estimate(job)
+        with self._cond:
+            if job.exclusive_cwd:
+                same = [j.name for j in self.waiting + self.running
+                        if j.exclusive_cwd and _workdir(j) == _workdir(job)]
+                if same:
+                    self.log(f"[!] {job.name}: shares cwd {_workdir(job)} (zkml_artifacts) with "
+                             f"{', '.join(same)}; it will not run concurrently with them")
+            job.submitted = time.time()
+            job._order = (PRIORITIES[job.priority], self._seq)
+            self._seq += 1
+            self.waiting.append(job)
+            self.waiting.sort(key=lambda j: j._order)
+            self._publish_depth()
+            self._cond.notify_all()
+        return job
+
+    def _publish_depth(self) -> None:
+        if self.telemetry is None:
+            return
+        for cls in PRIORITIES:
+            self.telemetry.set_queue_depth(f"jobs_{cls}", sum(j.priority == cls for j in self.waiting))
+
+    def _admit(self) -> List[Job]:
+        """Called with the lock held: jobs to start now, in priority order."""
+        admitted, now = [], time.time()
+        busy = {_workdir(j) for j in self.running if j.exclusive_cwd}
+        for job in list(self.waiting):
+            if self.max_concurrent and len(self.running) + len(admitted) >= self.max_concurrent:
+                break
+            if job.exclusive_cwd and _workdir(job) in busy:
+                continue                     # another job is writing this cwd's zkml_artifacts
+            if self.reserved_mb + job.estimate_mb <= self.budget_mb:
+                pass
+            elif not self.running and not admitted and job.estimate_mb > self.budget_mb:
+                job.oversize = True          # can never fit: run it alone
+            else:
+                # hold memory for a blocked interactive job or a starving batch job
+                if job.priority == "interactive" or now - job.submitted > self.starvation_seconds:
+                    break
+                continue
+            self.waiting.remove(job)
+            self.reserved_mb += job.estimate_mb
+            admitted.append(job)
+            if job.exclusive_cwd:
+                busy.add(_workdir(job))
+        return admitted
+
+    def _run_job(self, job: Job) -> None:
+        t0 = time.perf_counter()
+        # stderr goes to a file, not a pipe: a child writing more than the pipe
+        # buffer would block while we sit in wait4
+        with tempfile.TemporaryFile() as err:
+            try:
+                proc = subprocess.Popen(job.argv, cwd=job.cwd, stdout=subprocess.DEVNULL, stderr=err)
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                job.returncode = proc.returncode
+                job.peak_rss_mb = usage.ru_maxrss / 1024.0            # KiB on Linux
+                stderr = ""
+                if proc.returncode:
+                    err.seek(max(0, err.seek(0, os.SEEK_END) - 2000))
+                    stderr = err.read().decode(errors="replace")
+            except OSError as e:
+                job.returncode, stderr = -1, repr(e)
+        seconds = time.perf_counter() - t0
+        if job.returncode == 0 and job.peak_rss_mb and job.logrows is not None:
+            self.history.record(job.kind, job.logrows, job.peak_rss_mb, seconds)
+        with self._cond:
+            job.finished = time.time()
+            self.running.remove(job)
+            self.done.append(job)
+            self.reserved_mb -= job.estimate_mb
+            self._cond.notify_all()
+        status_txt = "ok" if job.returncode == 0 else f"exit {job.returncode}: {stderr.strip()[-200:]}"
+        self.log(f"{job.name} [{job.priority}] {status_txt} in {seconds:.1f}s, "
+                 f"peak {job.peak_rss_mb or 0:.0f}MB (est {job.estimate_mb:.0f}MB, {job.estimate_source})")
+        if self.telemetry is not None:
+            self.telemetry.event("job", name=job.name, priority=job.priority, ok=job.returncode == 0,
+                                 seconds=seconds, queue_wait=job.queue_wait, peak_rss_mb=job.peak_rss_mb,
+                                 estimate_mb=job.estimate_mb)
+
+    def run(self) -> SchedulerReport:
+        """Runs until every submitted job (including ones submitted meanwhile) has finished."""
+        self._t0 = time.time()
+        with self._cond:
+            while self.waiting or self.running:
+                for job in self._admit():
+                    job.started = time.time()
+                    self.running.append(job)
+                    threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+                self._publish_depth()
+                self._cond.wait(timeout=1.0)
+        return self.report()
+
+    def report(self) -> SchedulerReport:
+        wall = max(time.time() - self._t0, 1e-9)
+        jobs = [j for j in self.done if j.started is not None]
+        reserved = sum(min(j.estimate_mb, self.budget_mb) * (j.finished - j.started) for j in jobs)
+        measured = sum((j.peak_rss_mb or 0.0) * (j.finished - j.started) for j in jobs)
+        ratios = [j.peak_rss_mb / j.estimate_mb for j in jobs if j.peak_rss_mb and j.estimate_mb]
+        return SchedulerReport(
+            budget_mb=self.budget_mb,
+            jobs=len(jobs),
+            failed=sum(j.returncode != 0 for j in jobs),
+            oversize=sum(j.oversize for j in jobs),
+            wall_seconds=wall,
+            queue_wait_seconds={cls: _percentiles([j.queue_wait for j in jobs if j.priority == cls])
+                                for cls in PRIORITIES},
+            reserved_utilization=reserved / (self.budget_mb * wall),
+            measured_utilization=measured / (self.budget_mb * wall),
+            estimate_ratio={k: v for k, v in _percentiles(ratios).items() if k in ("p50", "max")},
+            job_records=[{k: v for k, v in asdict(j).items() if k != "argv"} for j in jobs],
+        )
+
+# --------------------------- CLI ---------------------------------------------
+
+def load_jobs(path: str) -> List[Job]:
+    """
+    JSON list of {"name", "argv" | "pipeline_args", "kind", "priority",
+    "settings_path", "mem_mb", "logrows", "cwd", "exclusive_cwd"}; pipeline_args run
+    ebsl_full_script.py (exclusive_cwd by default).
+    """
+    with open(path, "r") as f:
+        specs = json.load(f)
+    jobs = []
+    for i, spec in enumerate(specs):
+        spec = dict(spec)
+        name = spec.pop("name", f"job-{i}")
+        if "pipeline_args" in spec:
+            jobs.append(pipeline_job(name, spec.pop("pipeline_args"), **spec))
+        else:
+            jobs.append(Job(name, spec.pop("argv"), **spec))
+    return jobs
+
+def main():
+    from ebsl_metrics import add_metrics_args, telemetry_from_args
+
+    ap = argparse.ArgumentParser(description="Memory-budgeted scheduler for EZKL pipeline jobs")
+    ap.add_argument("jobs", help="JSON list of job specs")
+    ap.add_argument("--budget-mb", type=float, required=True, help="Memory budget for concurrently running jobs")
+    ap.add_argument("--max-concurrent", type=int, default=None)
+    ap.add_argument("--history", default=DEFAULT_HISTORY, help="Measured peak-memory history (JSON lines)")
+    ap.add_argument("--starvation-seconds", type=float, default=DEFAULT_STARVATION_SECONDS)
+    ap.add_argument("--report", default=os.path.join("zkml_artifacts", "scheduler_report.json"))
+    add_metrics_args(ap)
+    args = ap.parse_args()
+
+    telemetry, server = telemetry_from_args(args)
+    sched = MemoryScheduler(args.budget_mb, args.max_concurrent, MemoryHistory(args.history),
+                            args.starvation_seconds, telemetry)
+    try:
+        for job in load_jobs(args.jobs):
+            sched.submit(job)
+            print(f"[✓] queued {job.name} [{job.priority}] est {job.estimate_mb:.0f}MB ({job.estimate_source})")
+        report = sched.run()
+    finally:
+        telemetry.close()
+        if server is not None:
+            server.shutdown()
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(asdict(report), f, indent=2)
+    for cls, w in report.queue_wait_seconds.items():
+        if w:
+            print(f"    {cls:<11} wait p50 {w['p50']:.1f}s p95 {w['p95']:.1f}s max {w['max']:.1f}s ({w['n']} jobs)")
+    print(f"{'[✓]' if not report.failed else '[✗]'} {report.jobs} jobs, {report.failed} failed, "
+          f"utilization {report.reserved_utilization:.0%} reserved / {report.measured_utilization:.0%} measured "
+          f"of {report.budget_mb:.0f}MB; measured/estimated peak p50 {report.estimate_ratio.get('p50', float('nan')):.2f}")
+    print(f"[✓] Report written: {args.report}")
+    sys.exit(1 if report.failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streaming attestation ingestion in bounded micro-batches
+- Events are JSON lines from a followed file (waits for appends, reopens on
+  rotation or truncation) or objects put on an in-process queue
+- A bounded buffer sits between reader and applier; when the applier falls
+  behind the reader blocks (backpressure) instead of growing memory
+- A micro-batch closes at batch_size events or `window` seconds after its first
+  event, folds into StreamingFusion, and re-fuses only the targets it touched
+- Freshness lag (event time -> score updated) is tracked per event and reported
+  as p50 / p99 / max, optionally through RunTelemetry
+"""
+
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from ebsl_loader import IdentityIndex, OpinionBatch, StreamingFusion
+from ebsl_evidence import evidence_to_opinions, DEFAULT_PRIOR_WEIGHT
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_WINDOW = 0.25
+DEFAULT_BUFFER_EVENTS = 65536
+LAG_WINDOW = 100_000
+_STOP = object()
+
+# --------------------------- Sources -----------------------------------------
+
+def follow_file(path: str, stop: threading.Event, poll: float = 0.05, from_start: bool = True):
+    """
+    Yields complete lines appended to `path` until `stop` is set; a partial last
+    line is held back until its newline arrives. Reopens the file when it is
+    replaced (new inode) or truncated.
+    """
+    f, inode, pending = None, None, ""
+    while not stop.is_set():
+        if f is None:
+            try:
+                f = open(path, "r")
+                inode = os.fstat(f.fileno()).st_ino
+                if not from_start:
+                    f.seek(0, os.SEEK_END)
+            except FileNotFoundError:
+                stop.wait(poll)
+                continue
+        chunk = f.read(1 << 20)
+        if chunk:
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            yield from (line for line in lines if line.strip())
+            continue
+        try:
+            st = os.stat(path)
+            rotated = st.st_ino != inode or st.st_size < f.tell()
+        except FileNotFoundError:
+            rotated = False
+        if rotated:
+            f.close()
+            f, pending, from_start = None, "", True
+            continue
+        stop.wait(poll)
+    if f is not None:
+        f.close()
+
+# --------------------------- Ingestor ----------------------------------------
+
+@dataclass
+class StreamStats:
+    events: int
+    batches: int
+    invalid: int
+    mean_batch_size: float
+    events_per_second: float
+    lag_seconds: dict                 # p50 / p99 / max over the last LAG_WINDOW events
+    backpressure_seconds: float       # time producers spent blocked on a full buffer
+    buffer_high_watermark: int
+    buffer_capacity: int
+
+class StreamIngestor:
+    """
+    Event: {"source", "target", "belief", "disbelief", "uncertainty"[, "base_rate"]}
+    or {"source", "target", "positive", "negative"}, plus an optional "ts" (unix
+    seconds, used for lag; the arrival time otherwise).
+    """
+    def __init__(self, index: IdentityIndex = None, fusion: StreamingFusion = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, window: float = DEFAULT_WINDOW,
+                 buffer_events: int = DEFAULT_BUFFER_EVENTS, base_rate: float = 0.5,
+                 prior_weight: float = DEFAULT_PRIOR_WEIGHT, telemetry=None, on_batch=None):
+        self.index = index if index is not None else IdentityIndex()
+        self.fusion = fusion if fusion is not None else StreamingFusion(len(self.index))
+        self.batch_size = batch_size
+        self.window = window
+        self.base_rate = base_rate
+        self.prior_weight = prior_weight
+        self.telemetry = telemetry
+        self.on_batch = on_batch          # callback(target ids, fused rows) after each batch
+        self.buffer = queue.Queue(maxsize=buffer_events)
+        self.rep = np.zeros(0, dtype=np.float32)
+        self.lock = threading.Lock()            # rep, counts and backpressure stats (reader + applier threads)
+        self.lags = deque(maxlen=LAG_WINDOW)
+        self.counts = {"events": 0, "batches": 0, "invalid": 0}
+        self.blocked_seconds = 0.0
+        self.high_watermark = 0
+        self.stop_event = threading.Event()     # readers stop taking new events
+        self._halt = threading.Event()          # applier exits without draining
+        self._applier = None
+        self._readers = []
+        self._t0 = None
+
+    # ---- producer side ----
+
+    def offer(self, event) -> None:
+        """
+        Blocks while the buffer is full: this is the backpressure point. Only an
+        applier halted without draining makes it give up on the item.
+        """
+        item = (time.time(), event)
+        try:
+            self.buffer.put_nowait(item)
+        except queue.Full:
+            t0 = time.perf_counter()
+            while not self._halt.is_set():
+                try:
+                    self.buffer.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            with self.lock:
+                self.blocked_seconds += time.perf_counter() - t0
+        depth = self.buffer.qsize()
+        with self.lock:
+            self.high_watermark = max(self.high_watermark, depth)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self.lock:
+            self.counts[key] += n
+
+    def _read_lines(self, lines) -> None:
+        for line in lines:
+            if self.stop_event.is_set():
+                break
+            try:
+                self.offer(json.loads(line))
+            except json.JSONDecodeError:
+                self._count("invalid")
+
+    def _drain_queue(self, source: queue.Queue) -> None:
+        while not self.stop_event.is_set():
+            try:
+                event = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if event is None:
+                break
+            self.offer(event)
+
+    # ---- consumer side ----
+
+    def _next_batch(self) -> list:
+        """Up to batch_size items; returns early once `window` has passed since the first."""
+        try:
+            first = self.buffer.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        if first is _STOP:
+            return [first]
+        items, deadline = [first], time.monotonic() + self.window
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.buffer.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            if item is _STOP:
+                break
+        return items
+
+    def _to_batch(self, items):
+        """(OpinionBatch, event timestamps) for the valid events in `items`."""
+        src, dst, ops, ts, evidence = [], [], [], [], []
+        for recv, ev in items:
+            try:
+                a = float(ev.get("base_rate", self.base_rate))
+                if "belief" in ev:
+                    op = [float(ev["belief"]), float(ev["disbelief"]), float(ev["uncertainty"]), a]
+                else:
+                    op = [float(ev["positive"]), float(ev["negative"]), 0.0, a]
+                row = (ev["source"], ev["target"], float(ev.get("ts", recv)))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                self._count("invalid")
+                continue
+            if "belief" not in ev:
+                evidence.append(len(ops))
+            src.append(row[0])
+            dst.append(row[1])
+            ts.append(row[2])
+            ops.append(op)
+        if not ops:
+            return None, None
+        ops = np.asarray(ops, dtype=np.float32)
+        if evidence:
+            e = ops[evidence]
+            ops[evidence] = evidence_to_opinions(e[:, 0], e[:, 1], e[:, 3], self.prior_weight)
+        batch = OpinionBatch(self.index.lookup(src), self.index.lookup(dst), ops)
+        self.index.flush()
+        return batch, np.asarray(ts, dtype=np.float64)
+
+    def apply(self, items) -> int:
+        """Folds one micro-batch into the running sums and re-fuses the targets it touched."""
+        batch, ts = self._to_batch(items)
+        if batch is None:
+            return 0
+        self.fusion.update(batch)
+        self.fusion.reserve(len(self.index))
+        touched = np.unique(batch.dst)
+        fused, rep = self.fusion.finalize(touched)
+        with self.lock:
+            if self.rep.shape[0] < self.fusion.num_nodes:
+                grown = np.zeros(max(self.fusion.num_nodes, 2 * self.rep.shape[0]), dtype=np.float32)
+                grown[:self.rep.shape[0]] = self.rep
+                self.rep = grown
+            self.rep[touched] = rep[:, 0]
+            self.counts["events"] += len(batch)
+            self.counts["batches"] += 1
+        now = time.time()
+        self.lags.extend((now - ts).tolist())
+        if self.on_batch is not None:
+            self.on_batch(touched, fused)
+        if self.telemetry is not None:
+            self.telemetry.set_queue_depth("stream_buffer", self.buffer.qsize())
+            self.telemetry.event("stream_batch", events=len(batch), targets=int(touched.shape[0]),
+                                 lag_max=float(now - ts.min()))
+        return len(batch)
+
+    def _apply_loop(self) -> None:
+        while True:
+            items = self._next_batch()
+            stop = bool(items) and items[-1] is _STOP
+            if stop:
+                items = items[:-1]
+            if items:
+                self.apply(items)
+            if stop or self._halt.is_set():
+                break
+
+    # ---- lifecycle ----
+
+    def start(self, follow: str = None, source: queue.Queue = None, from_start: bool = True) -> "StreamIngestor":
+        """Starts the applier and, if given, a reader for a followed file or a queue."""
+        self._t0 = time.perf_counter()
+        self._applier = threading.Thread(target=self._apply_loop, daemon=True)
+        self._applier.start()
+        readers = []
+        if follow:
+            readers.append(lambda: self._read_lines(follow_file(follow, self.stop_event, from_start=from_start)))
+        if source is not None:
+            readers.append(lambda: self._drain_queue(source))
+        for target in readers:
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._readers.append(t)
+        return self
+
+    def stop(self, drain: bool = True, timeout: float = None) -> None:
+        """
+        Stops and joins the readers first, so every event they took reaches the
+        buffer; drain=True then applies everything buffered before the applier exits.
+        """
+        self.stop_event.set()
+        if not drain:
+            self._halt.set()
+        for t in self._readers:
+            t.join(timeout)
+        if drain:
+            self.buffer.put(_STOP)
+        if self._applier is not None:
+            self._applier.join(timeout)
+
+    def scores(self) -> np.ndarray:
+        """Current reputation per dense id (row i == index.names[i])."""
+        with self.lock:
+            return self.rep[:self.fusion.num_nodes].copy()
+
+    def stats(self) -> StreamStats:
+        with self.lock:
+            counts = dict(self.counts)
+            blocked, high_watermark = self.blocked_seconds, self.high_watermark
+        lag = np.asarray(self.lags, dtype=np.float64)
+        elapsed = time.perf_counter() - self._t0 if self._t0 else 0.0
+        lag_stats = {}
+        if lag.size:
+            p50, p99 = np.percentile(lag, [50, 99])
+            lag_stats = {"p50": float(p50), "p99": float(p99), "max": float(lag.max())}
+        return StreamStats(
+            events=counts["events"],
+            batches=counts["batches"],
+            invalid=counts["invalid"],
+            mean_batch_size=counts["events"] / counts["batches"] if counts["batches"] else 0.0,
+            events_per_second=counts["events"] / elapsed if elapsed > 0 else 0.0,
+            lag_seconds=lag_stats,
+            backpressure_seconds=blocked,
+            buffer_high_watermark=high_watermark,
+            buffer_capacity=self.buffer.maxsize,
+        )
+
+# --------------------------- CLI ---------------------------------------------
+
+def _synthetic_producer(q: queue.Queue, rate: float, duration: float, num_nodes: int, seed: int) -> None:
+    """Puts `rate` events/s on q for `duration` seconds, then None."""
+    rng = np.random.default_rng(seed)
+    t_end = time.time() + duration
+    tick = 0.01
+    while time.time() < t_end:
+        t_next = time.time() + tick
+        n = max(1, int(rng.poisson(rate * tick)))
+        src, dst = rng.integers(0, num_nodes, n), rng.integers(0, num_nodes, n)
+        pos, neg = rng.integers(0, 20, n), rng.integers(0, 5, n)
+        now = time.time()
+        for i in range(n):
+            q.put({"source": f"u{src[i]}", "target": f"u{dst[i]}", "positive": int(pos[i]),
+                   "negative": int(neg[i]), "ts": now})
+        time.sleep(max(0.0, t_next - time.time()))
+    q.put(None)
+
+def _print_stats(stats: StreamStats, prefix: str = "[✓]") -> None:
+    lag = stats.lag_seconds
+    lag_txt = f"lag p50 {lag['p50'] * 1e3:.0f}ms p99 {lag['p99'] * 1e3:.0f}ms max {lag['max'] * 1e3:.0f}ms" if lag else "lag n/a"
+    print(f"{prefix} {stats.events:,} events in {stats.batches:,} batches ({stats.events_per_second:,.0f}/s), {lag_txt}, "
+          f"buffer peak {stats.buffer_high_watermark:,}/{stats.buffer_capacity:,}, "
+          f"backpressure {stats.backpressure_seconds:.2f}s")
+
+def main():
+    from ebsl_metrics import add_metrics_args, telemetry_from_args
+
+    ap = argparse.ArgumentParser(description="Stream attestation events into EBSL reputation")
+    ap.add_argument("--follow", metavar="PATH", help="JSON-lines event file to follow")
+    ap.add_argument("--from-end", action="store_true", help="Skip events already in the file")
+    ap.add_argument("--synthetic-rate", type=float, default=None, help="Generate this many events/s instead")
+    ap.add_argument("--synthetic-nodes", type=int, default=100_000)
+    ap.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    ap.add_argument("--index", default=os.path.join("zkml_artifacts", "identities.jsonl"))
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    ap.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="Max seconds a micro-batch stays open")
+    ap.add_argument("--buffer", type=int, default=DEFAULT_BUFFER_EVENTS, help="Bounded buffer size (events)")
+    ap.add_argument("--report-every", type=float, default=5.0)
+    ap.add_argument("--snapshot", metavar="PATH", help="Export reputation (ebsl_export) here on exit")
+    ap.add_argument("--seed", type=int, default=1337)
+    add_metrics_args(ap)
+    args = ap.parse_args()
+    if not args.follow and args.synthetic_rate is None:
+        ap.error("one of --follow or --synthetic-rate is required")
+
+    telemetry, server = telemetry_from_args(args)
+    ingestor = StreamIngestor(IdentityIndex(args.index), batch_size=args.batch_size, window=args.window,
+                              buffer_events=args.buffer, telemetry=telemetry)
+    source, producer = None, None
+    if args.synthetic_rate is not None:
+        source = queue.Queue(maxsize=args.buffer)
+        duration = args.duration or 10.0
+        producer = threading.Thread(target=_synthetic_producer, daemon=True,
+                                    args=(source, args.synthetic_rate, duration, args.synthetic_nodes, args.seed))
+    ingestor.start(follow=args.follow, source=source, from_start=not args.from_end)
+    if producer is not None:
+        producer.start()
+
+    t_end = time.time() + args.duration if args.duration else None
+    try:
+        while t_end is None or time.time() < t_end:
+            time.sleep(min(args.report_every, max(0.0, t_end - time.time())) if t_end else args.report_every)
+            _print_stats(ingestor.stats(), "[…]")
+            if producer is not None and not producer.is_alive() and source.empty():
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if producer is not None:
+            producer.join()
+        ingestor.stop(drain=True)
+        stats = ingestor.stats()
+        _print_stats(stats)
+        os.makedirs("zkml_artifacts", exist_ok=True)
+        with open(os.path.join("zkml_artifacts", "stream_report.json"), "w") as f:
+            json.dump(asdict(stats), f, indent=2)
+        if args.snapshot:
+            from ebsl_export import export_reputation
+            fused, _ = ingestor.fusion.finalize()
+            export_reputation(fused, args.snapshot, node_ids=np.asarray(ingestor.index.names, dtype=object),
+                              fusion="sums")
+            print(f"[✓] Snapshot: {args.snapshot}")
+        telemetry.close()
+        if server is not None:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Threshold-only EBSL circuit and comparison against the current circuit
+- EBslThresholdModule bakes the threshold into the circuit (one vk per threshold)
+  and outputs only [threshold, rep >= threshold]; fused opinion and rep stay private.
+  The threshold instance is round(threshold * 1e6) at scale 0, the uint256
+  ZKMLOnChainVerifier checks against MAX_REPUTATION_SCORE
+- With hashed inputs the public instances are [Poseidon(opinions), threshold, above];
+  verifyReputationThreshold reads the last two, and the commitment covers the
+  opinions only
+- Inputs default to "hashed": the opinions are bound to a public Poseidon
+  commitment the verifier can match against the published attestations.
+  "private" leaves them unconstrained witnesses (any opinions that clear the
+  threshold would prove), so it is only useful for size comparisons
+- Both circuits are built with the same input visibility, run args and
+  calibration, so the comparison isolates the output change: rows,
+  assignments, logrows, pk / vk / proof bytes, instances, prove and verify time
+"""
+
+import os
+import json
+import time
+import argparse
+import statistics
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+import torch
+
+from ebsl_torch import THRESHOLD_SCALE, EBslFusionModule, EBslThresholdModule
+from ebsl_full_script import Logger, get_srs_with_fallback, run_with_loop, safe_calibrate, safe_setattr
+
+DEFAULT_OUT_DIR = os.path.join("zkml_artifacts", "threshold_compare")
+VERIFY_REPEATS = 5
+
+def _require_ezkl():
+    try:
+        import ezkl
+    except ImportError as e:
+        raise ImportError("Circuit comparison requires ezkl (pip install ezkl)") from e
+    return ezkl
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def synthetic_claimant(max_opinions: int, min_rep: float = 0.05, attempts: int = 100):
+    """
+    (combined input [1, K*5], torch rep) of a synthetic user with rep in [min_rep, 1].
+    Low-evidence attestations (u close to 1) keep the fusion denominator
+    sum(u) - K + 1 positive and base rates of at most 1/K keep a_f = sum(a*u)/denom
+    from pushing rep past 1; _gen_synthetic_opinions users mostly fuse below 0.
+    """
+    model = EBslFusionModule(max_opinions).eval()
+    for _ in range(attempts):
+        u = 1.0 - torch.rand(max_opinions) * (0.5 / max_opinions)
+        b = (1.0 - u) * torch.rand(max_opinions)
+        opinions = torch.stack([b, 1.0 - u - b, u, torch.rand(max_opinions) / max_opinions], dim=1)
+        combined = torch.cat([opinions.flatten(), torch.ones(max_opinions)])[None]
+        with torch.no_grad():
+            rep = float(model(combined)[1][0, 0])
+        if min_rep <= rep <= 1.0:
+            return combined, rep
+    raise RuntimeError(f"no synthetic user with rep in [{min_rep}, 1] after {attempts} draws")
+
+# --------------------------- Build / prove -----------------------------------
+
+@dataclass
+class CircuitReport:
+    name: str
+    input_visibility: str
+    output_visibility: str
+    public_instances: int
+    num_rows: int
+    total_assignments: Optional[int]
+    logrows: int
+    required_lookups: list
+    compiled_bytes: int
+    pk_bytes: int
+    vk_bytes: int
+    proof_bytes: int                  # raw proof, without the JSON wrapper
+    calldata_bytes: int               # proof + 32 bytes per public instance
+    setup_seconds: float
+    prove_seconds: float
+    verify_seconds: float             # median over verify_repeats
+    verified: bool
+    outputs: list = field(default_factory=list)
+
+def build_and_prove(logger: Logger, name: str, model: torch.nn.Module, combined_input: torch.Tensor,
+                    output_names, out_dir: str, input_visibility: str = "public",
+                    output_visibility: str = "public", verify_repeats: int = VERIFY_REPEATS) -> CircuitReport:
+    """Export -> settings -> calibrate -> compile -> setup -> prove -> verify in out_dir."""
+    ezkl = _require_ezkl()
+    os.makedirs(out_dir, exist_ok=True)
+    onnx_path = os.path.join(out_dir, "model.onnx")
+    settings_path = os.path.join(out_dir, "settings.json")
+    input_json = os.path.join(out_dir, "input.json")
+    compiled_path = os.path.join(out_dir, "compiled.onnx")
+    srs_path = os.path.join(out_dir, "kzg.srs")
+    pk_path, vk_path = os.path.join(out_dir, "model.pk"), os.path.join(out_dir, "model.vk")
+    witness_path, proof_path = os.path.join(out_dir, "witness.json"), os.path.join(out_dir, "proof.pf")
+
+    with logger.timed(f"{name}_build", extra={"input_visibility": input_visibility}) as info:
+        torch.onnx.export(model.eval(), combined_input, onnx_path, input_names=["combined_input"],
+                          output_names=list(output_names), opset_version=13, dynamic_axes=None)
+        run_args = ezkl.PyRunArgs()
+        safe_setattr(run_args, "input_visibility", input_visibility, logger)
+        safe_setattr(run_args, "param_visibility", "fixed", logger)
+        safe_setattr(run_args, "output_visibility", output_visibility, logger)
+        safe_setattr(run_args, "decomp_base", 16384, logger)
+        safe_setattr(run_args, "decomp_legs", 4, logger)
+        safe_setattr(run_args, "check_mode", "safe", logger)
+        safe_setattr(run_args, "input_scale", 6, logger)
+        safe_setattr(run_args, "param_scale", 6, logger)
+        if not run_with_loop(ezkl.gen_settings, model=onnx_path, output=settings_path, py_run_args=run_args):
+            raise RuntimeError(f"{name}: gen_settings failed")
+        with open(input_json, "w") as f:
+            json.dump({"input_data": [combined_input.detach().numpy().flatten().tolist()],
+                       "input_shapes": [[combined_input.numel()]]}, f)
+        safe_calibrate(logger, data=input_json, model=onnx_path, settings=settings_path, target="resources",
+                       lookup_safety_margin=2, scales=[6, 8, 10, 12], scale_rebase_multiplier=[1, 2, 4],
+                       max_logrows=16)
+        if not run_with_loop(ezkl.compile_circuit, model=onnx_path, compiled_circuit=compiled_path,
+                             settings_path=settings_path):
+            raise RuntimeError(f"{name}: compile_circuit failed")
+        if not get_srs_with_fallback(settings_path=settings_path, srs_path=srs_path, logger=logger):
+            raise RuntimeError(f"{name}: get_srs failed")
+        t0 = time.perf_counter()
+        if not run_with_loop(ezkl.setup, model=compiled_path, vk_path=vk_path, pk_path=pk_path, srs_path=srs_path):
+            raise RuntimeError(f"{name}: setup failed")
+        setup_seconds = time.perf_counter() - t0
+        info["setup_seconds"] = setup_seconds
+
+    with logger.timed(f"{name}_prove") as info:
+        if not run_with_loop(ezkl.gen_witness, data=input_json, model=compiled_path, output=witness_path):
+            raise RuntimeError(f"{name}: gen_witness failed")
+        t0 = time.perf_counter()
+        if not run_with_loop(ezkl.prove, witness=witness_path, model=compiled_path, pk_path=pk_path,
+                             proof_path=proof_path, srs_path=srs_path, proof_type="single"):
+            raise RuntimeError(f"{name}: prove failed")
+        prove_seconds = time.perf_counter() - t0
+        info["prove_seconds"] = prove_seconds
+
+    secs, verified = [], True
+    for _ in range(max(verify_repeats, 1)):
+        t0 = time.perf_counter()
+        verified &= bool(run_with_loop(ezkl.verify, proof_path=proof_path, settings_path=settings_path,
+                                       vk_path=vk_path, srs_path=srs_path))
+        secs.append(time.perf_counter() - t0)
+
+    with open(settings_path, "r") as f:
+        settings = json.load(f)
+    with open(proof_path, "r") as f:
+        proof = json.load(f)
+    instances = sum(len(i) for i in proof.get("instances", []))
+    proof_bytes = len(proof.get("proof", []))
+    return CircuitReport(
+        name=name,
+        input_visibility=input_visibility,
+        output_visibility=output_visibility,
+        public_instances=instances,
+        num_rows=int(settings.get("num_rows", 0)),
+        total_assignments=settings.get("total_assignments"),
+        logrows=int(settings["run_args"]["logrows"]),
+        required_lookups=settings.get("required_lookups", []),
+        compiled_bytes=_size(compiled_path),
+        pk_bytes=_size(pk_path),
+        vk_bytes=_size(vk_path),
+        proof_bytes=proof_bytes,
+        calldata_bytes=proof_bytes + 32 * instances,
+        setup_seconds=setup_seconds,
+        prove_seconds=prove_seconds,
+        verify_seconds=statistics.median(secs),
+        verified=verified,
+        outputs=proof.get("pretty_public_inputs", {}).get("rescaled_outputs", []),
+    )
+
+# --------------------------- Comparison --------------------------------------
+
+def compare_threshold_circuit(logger: Logger, max_opinions: int = 16, threshold: Optional[float] = None,
+                              input_visibility: str = "hashed", out_dir: str = DEFAULT_OUT_DIR,
+                              verify_repeats: int = VERIFY_REPEATS) -> dict:
+    """
+    Builds the current circuit (fused + rep outputs) and the threshold circuit
+    for one synthetic user, both with `input_visibility`. threshold=None uses
+    the user's torch rep minus 0.05 (clamped to [0, 1]), so the proof attests
+    "above" like a real claim.
+    """
+    logger.banner("Threshold-only circuit vs current circuit")
+    combined, rep = synthetic_claimant(max_opinions)
+    if threshold is None:
+        threshold = min(max(rep - 0.05, 0.0), 1.0)
+    model = EBslThresholdModule(max_opinions, threshold)
+    with torch.no_grad():
+        threshold_1e6, above = (int(x[0, 0]) for x in model.eval()(combined))
+    logger.info(f"torch rep {rep:.4f}, threshold {threshold_1e6} / {THRESHOLD_SCALE}")
+
+    current = build_and_prove(logger, "current", EBslFusionModule(max_opinions), combined, ["fused", "rep"],
+                              os.path.join(out_dir, "current"), input_visibility, "public", verify_repeats)
+    thresh = build_and_prove(logger, "threshold", model, combined, ["threshold", "above"],
+                             os.path.join(out_dir, "threshold"), input_visibility, "public", verify_repeats)
+    ratio = lambda a, b: a / b if b else None
+    return {
+        "max_opinions": max_opinions,
+        "threshold": threshold,
+        "threshold_1e6": threshold_1e6,
+        "input_visibility": input_visibility,
+        "torch_rep": rep,
+        "torch_above": bool(above),
+        "current": asdict(current),
+        "threshold_circuit": asdict(thresh),
+        "ratios": {k: ratio(getattr(thresh, k), getattr(current, k))
+                   for k in ("public_instances", "num_rows", "pk_bytes", "vk_bytes", "proof_bytes",
+                             "calldata_bytes", "prove_seconds", "verify_seconds")},
+    }
+
+def format_comparison(result: dict) -> str:
+    cur, thr = result["current"], result["threshold_circuit"]
+    rows = [("public instances", "public_instances", "{:,}"), ("rows", "num_rows", "{:,}"),
+            ("logrows", "logrows", "{}"), ("pk bytes", "pk_bytes", "{:,}"), ("vk bytes", "vk_bytes", "{:,}"),
+            ("proof bytes", "proof_bytes", "{:,}"), ("calldata bytes", "calldata_bytes", "{:,}"),
+            ("prove s", "prove_seconds", "{:.2f}"), ("verify s", "verify_seconds", "{:.4f}")]
+    lines = [f"{result['input_visibility'] + ' inputs':<18}{'current':>14}{'threshold':>14}{'ratio':>8}"]
+    for label, key, fmt in rows:
+        r = result["ratios"].get(key)
+        lines.append(f"{label:<18}{fmt.format(cur[key]):>14}{fmt.format(thr[key]):>14}"
+                     + (f"{r:>8.2f}" if r is not None else f"{'':>8}"))
+    lines.append(f"threshold outputs {thr['outputs']} (torch above: {result['torch_above']}), "
+                 f"verified {cur['verified']} / {thr['verified']}")
+    return "\n".join(lines)
+
+# --------------------------- CLI ---------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare the threshold-only EBSL circuit against the current circuit")
+    ap.add_argument("--max-opinions", type=int, default=16)
+    ap.add_argument("--threshold", type=float, default=None,
+                    help="In [0, 1]; published as round(threshold * 1e6). Default: synthetic user's rep minus 0.05")
+    ap.add_argument("--input-visibility", choices=["hashed", "public", "private"], default="hashed",
+                    help="Input visibility of both circuits; private inputs are unconstrained (size comparison only)")
+    ap.add_argument("--verify-repeats", type=int, default=VERIFY_REPEATS)
+    ap.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    logger = Logger(verbose=args.verbose)
+    result = compare_threshold_circuit(logger, args.max_opinions, args.threshold, args.input_visibility,
+                                       args.out_dir, args.verify_repeats)
+    report_path = os.path.join(args.out_dir, "threshold_comparison.json")
+    with open(report_path, "w") as f:
+        json.dump(result, f, indent=2)
+    ok = result["current"]["verified"] and result["threshold_circuit"]["verified"]
+    print(f"{'[✓]' if ok else '[✗]'} " + format_comparison(result))
+    print(f"[✓] Report written: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Torch EBSL fusion (imports torch and numpy only)
+- ClassicalEBSLAlgorithm / EBSLAlgorithm: per-user and segmented fusion
+- EBslFusionModule: the circuit exported by ebsl_full_script (fused + rep outputs)
+- EBslThresholdModule: same fusion, discloses only rep >= threshold (a circuit
+  constant, published in ZKMLOnChainVerifier's 1e6 scale)
+- TorchEBSLBackend: ndarray in / out with the NumpyEBSLAlgorithm API, returned by
+  ebsl_numpy.get_ebsl_backend("torch")
+- Kept apart from ebsl_full_script so scoring workers and benchmarks do not pull
+  in ezkl / onnx / matplotlib / hypothesis
+"""
+
+import numpy as np
+import torch
+
+THRESHOLD_SCALE = 1_000_000     # ZKMLOnChainVerifier.MAX_REPUTATION_SCORE == 1.0
+
+# --------------------------- EBSL logic --------------------------------------
+
+def _fuse_segments(opinions_flat: torch.Tensor, offsets: torch.Tensor) -> torch.Tensor:
+    """
+    All users in one pass: opinions_flat [E, 4] holds every user's opinions back to
+    back, offsets [U+1] marks user i as rows offsets[i]:offsets[i+1]. Sums are
+    accumulated in float64 by one index_add_ and prod(u) is kept as sum(log u) until
+    the final divide, so fan-in in the thousands neither underflows nor loses the
+    small terms. A zero denominator gets fuse's + 1e-9. Returns [U, 4] in the dtype
+    of opinions_flat; an empty segment fuses to [0, 0, 1, 0].
+    """
+    offsets = torch.as_tensor(offsets, dtype=torch.long, device=opinions_flat.device)
+    counts = offsets[1:] - offsets[:-1]
+    seg = torch.repeat_interleave(torch.arange(counts.numel(), device=offsets.device), counts)
+    b, d, u, a = opinions_flat.to(torch.float64).unbind(-1)
+    sums = torch.zeros(counts.numel(), 5, dtype=torch.float64, device=opinions_flat.device)
+    sums.index_add_(0, seg, torch.stack([b * u, d * u, a * u, u, torch.log(u)], dim=-1))
+    sum_bu, sum_du, sum_au, sum_u, sum_log_u = sums.unbind(-1)
+    denominator = sum_u - (counts.to(torch.float64) - 1)
+    denominator = denominator + (denominator == 0) * 1e-9
+    # prod(u) / den = sign(den) * exp(sum(log u) - log|den|); log(0) = -inf gives 0
+    u_fused = torch.sign(denominator) * torch.exp(sum_log_u - torch.log(denominator.abs()))
+    fused = torch.stack([sum_bu / denominator, sum_du / denominator, u_fused, sum_au / denominator], dim=-1)
+    return fused.to(opinions_flat.dtype)
+
+class ClassicalEBSLAlgorithm:
+    @staticmethod
+    def fuse(opinions_tensor: torch.Tensor) -> torch.Tensor:
+        # opinions_tensor: [..., N, 4] -> [b,d,u,a]; leading dims are fused independently
+        b, d, u, a = [o.squeeze(-1) for o in opinions_tensor.split(1, dim=-1)]
+        denominator = torch.sum(u, dim=-1) - (opinions_tensor.shape[-2] - 1)
+        if torch.any(denominator == 0):
+            denominator = denominator + (denominator == 0) * 1e-9
+        b_fused = torch.sum(b * u, dim=-1) / denominator
+        d_fused = torch.sum(d * u, dim=-1) / denominator
+        u_fused = torch.prod(u, dim=-1) / denominator
+        a_fused = torch.sum((a * u), dim=-1) / denominator
+        return torch.stack([b_fused, d_fused, u_fused, a_fused], dim=-1)
+
+    @staticmethod
+    def fuse_segments(opinions_flat: torch.Tensor, offsets: torch.Tensor) -> torch.Tensor:
+        # opinions_flat: [E, 4], offsets: [U+1] -> [U, 4]
+        return _fuse_segments(opinions_flat, offsets)
+
+class EBSLAlgorithm:
+    @staticmethod
+    def fuse(opinions_tensor: torch.Tensor) -> torch.Tensor:
+        b, d, u, a = [o.squeeze(-1) for o in opinions_tensor.split(1, dim=-1)]
+        denominator = torch.sum(u, dim=-1) - (opinions_tensor.shape[-2] - 1)
+        is_zero = (denominator == 0).to(torch.float32)
+        denominator = denominator + (is_zero * 1e-9)
+        inv_denominator = torch.reciprocal(denominator)
+        b_fused = torch.sum(b * u, dim=-1) * inv_denominator
+        d_fused = torch.sum(d * u, dim=-1) * inv_denominator
+        u_fused = torch.prod(u, dim=-1) * inv_denominator
+        a_fused = torch.sum((a * u), dim=-1) * inv_denominator
+        return torch.stack([b_fused, d_fused, u_fused, a_fused], dim=-1)
+
+    @staticmethod
+    def fuse_segments(opinions_flat: torch.Tensor, offsets: torch.Tensor) -> torch.Tensor:
+        return _fuse_segments(opinions_flat, offsets)
+
+    @staticmethod
+    def calculate_reputation(final_opinion_tensor: torch.Tensor) -> torch.Tensor:
+        b, d, u, a = [o.squeeze(-1) for o in final_opinion_tensor.split(1, dim=-1)]
+        return b + a * u
+
+
+# --------------------------- Torch EBSL module --------------------------------
+
+class EBslFusionModule(torch.nn.Module):
+    """
+    ZK-optimized EBSL fusion module with overflow-safe ops.
+    Input: combined tensor with opinions and mask flattened and concatenated
+    Outputs:
+      fused:    (B, 4)
+      rep:      (B, 1)
+    """
+    def __init__(self, max_opinions: int = 16):
+        super().__init__()
+        self.max_opinions = max_opinions
+        self.opinions_size = max_opinions * 4  # N * 4 for [b,d,u,a]
+        self.mask_size = max_opinions         # N for mask
+        self.register_buffer('epsilon', torch.tensor(1e-6))
+        self.register_buffer('one', torch.tensor(1.0))
+
+    def forward(self, combined_input: torch.Tensor):
+        batch_size = combined_input.shape[0]
+
+        # Split & reshape back to opinions and mask
+        opinions_flat = combined_input[:, :self.opinions_size]
+        mask_flat = combined_input[:, self.opinions_size:self.opinions_size + self.mask_size]
+        opinions = opinions_flat.view(batch_size, self.max_opinions, 4)
+        mask = mask_flat.view(batch_size, self.max_opinions)
+
+        b = opinions[..., 0]
+        d = opinions[..., 1]
+        u = opinions[..., 2]
+        a = opinions[..., 3]
+
+        m = mask
+        K = torch.sum(m, dim=1)
+
+        sum_bu = torch.sum((b * u) * m, dim=1)
+        sum_du = torch.sum((d * u) * m, dim=1)
+        sum_au = torch.sum((a * u) * m, dim=1)
+        sum_u  = torch.sum(u * m, dim=1)
+
+        # Stable product via logs (avoids huge intermediates)
+        u_masked = u * m + (self.one - m)                # 1 for masked-out entries
+        u_clamped = torch.clamp(u_masked, min=self.epsilon, max=self.one)
+        sum_log = torch.sum(torch.log(u_clamped), dim=1)
+        prod_u = torch.exp(sum_log)
+
+        # Sign-preserving denom clamp
+        denom = sum_u - K + self.one
+        denom_sign = torch.where(denom >= 0, self.one, -self.one)
+        denom = denom_sign * torch.clamp(torch.abs(denom), min=self.epsilon)
+
+        b_f = sum_bu / denom
+        d_f = sum_du / denom
+        u_f = prod_u / denom
+        a_f = sum_au / denom
+
+        fused = torch.stack([b_f, d_f, u_f, a_f], dim=1)
+        rep = (b_f + a_f * u_f).unsqueeze(1)
+        return fused, rep
+
+class EBslThresholdModule(EBslFusionModule):
+    """
+    Same fusion, but only discloses whether rep >= threshold. The threshold is a
+    constant of the circuit (a fixed param), not an input, so hashed inputs commit
+    to the opinions alone.
+    Input: combined tensor as above
+    Outputs (public; with hashed inputs they follow the input commitment):
+      threshold: (B, 1)  int64 round(threshold * 1e6), a scale-0 instance equal to
+                         the uint256 verifyReputationThreshold checks
+      above:     (B, 1)  1.0 if rep * 1e6 >= that value else 0.0
+    """
+    def __init__(self, max_opinions: int = 16, threshold: float = 0.5):
+        super().__init__(max_opinions)
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be in [0, 1], got {threshold}")
+        self.register_buffer("threshold", torch.tensor([[float(round(threshold * THRESHOLD_SCALE))]]))
+
+    def forward(self, combined_input: torch.Tensor):
+        _, rep = super().forward(combined_input)
+        threshold = self.threshold.expand_as(rep)
+        # compare in the 1e6 domain, so the published integer is exactly the proved bound
+        above = (rep * THRESHOLD_SCALE >= threshold).float()
+        return threshold.to(torch.int64), above
+
+# --------------------------- ndarray backend ---------------------------------
+
+def _tensor(x) -> torch.Tensor:
+    return torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32))
+
+class TorchEBSLBackend:
+    """
+    The torch engine behind the NumpyEBSLAlgorithm API (ndarray in, ndarray out),
+    so callers can switch backends without touching tensors.
+    """
+    @staticmethod
+    def fuse(opinions: np.ndarray) -> np.ndarray:
+        return EBSLAlgorithm.fuse(_tensor(opinions)).numpy()
+
+    @staticmethod
+    def fuse_batch(opinions: np.ndarray, mask: np.ndarray, epsilon: float = 1e-6):
+        opinions, mask = _tensor(opinions), _tensor(mask)
+        combined = torch.cat([opinions.flatten(start_dim=1), mask], dim=1)
+        model = EBslFusionModule(max_opinions=opinions.shape[1]).eval()
+        model.epsilon.fill_(epsilon)
+        with torch.no_grad():
+            fused, rep = model(combined)
+        return fused.numpy(), rep.numpy()
+
+    @staticmethod
+    def fuse_combined(combined_input: np.ndarray, max_opinions: int):
+        with torch.no_grad():
+            fused, rep = EBslFusionModule(max_opinions=max_opinions).eval()(_tensor(combined_input))
+        return fused.numpy(), rep.numpy()
+
+    @staticmethod
+    def calculate_reputation(final_opinions: np.ndarray) -> np.ndarray:
+        return EBSLAlgorithm.calculate_reputation(_tensor(final_opinions)).numpy()
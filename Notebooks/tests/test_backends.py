@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from ebsl_numpy import _gen_synthetic_batch, get_ebsl_backend
+
+def test_backends_share_the_ndarray_api():
+    opinions, mask = _gen_synthetic_batch(64, 8, seed=3)
+    mask[:, 6:] = 0.0
+    combined = np.concatenate([opinions.reshape(64, -1), mask], axis=1)
+    numpy_be, torch_be = get_ebsl_backend("numpy"), get_ebsl_backend("torch")
+    for a, b in zip(numpy_be.fuse_combined(combined, 8), torch_be.fuse_combined(combined, 8)):
+        assert isinstance(b, np.ndarray)
+        np.testing.assert_allclose(a, b, rtol=1e-5, atol=1e-6)
+    for a, b in zip(numpy_be.fuse_batch(opinions, mask), torch_be.fuse_batch(opinions, mask)):
+        np.testing.assert_allclose(a, b, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(numpy_be.fuse(opinions[0]), torch_be.fuse(opinions[0]), rtol=1e-5, atol=1e-6)
+    fused = numpy_be.fuse_combined(combined, 8)[0]
+    np.testing.assert_allclose(numpy_be.calculate_reputation(fused), torch_be.calculate_reputation(fused))
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_ebsl_backend("jax")
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from ebsl_batch_verify import batch_verify, collect_proofs
+
+def test_collect_from_epoch_manifest(tmp_path):
+    manifest = {"version": 1, "epoch": 2, "users": {
+        "a": {"input_hash": "x", "proof_path": "proofs/a.pf"},
+        "b": {"input_hash": "y", "proof_path": str(tmp_path / "b.pf")},
+        "c": {"input_hash": "z", "proof_path": None}}}
+    path = tmp_path / "epoch_manifest.json"
+    path.write_text(json.dumps(manifest))
+    assert collect_proofs(str(path)) == [str(tmp_path / "proofs" / "a.pf"), str(tmp_path / "b.pf")]
+
+def test_unrecognized_manifest_is_an_error(tmp_path):
+    path = tmp_path / "m.json"
+    path.write_text(json.dumps({"paths": ["a.pf"]}))
+    with pytest.raises(ValueError):
+        collect_proofs(str(path))
+
+def test_empty_proof_set_is_an_error(tmp_path):
+    assert collect_proofs(str(tmp_path)) == []
+    with pytest.raises(ValueError):
+        batch_verify([], "settings.json", "model.vk", "kzg.srs")
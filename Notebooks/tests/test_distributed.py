@@ -0,0 +1,28 @@
+import numpy as np
+import torch
+
+from ebsl_distributed import (graph_offsets, load_shard, partition_targets, run_local, save_graph,
+                              synthetic_graph)
+from ebsl_torch import EBSLAlgorithm
+
+def test_shards_cover_the_graph(tmp_path):
+    graph = synthetic_graph(500, 6000, seed=7)
+    save_graph(graph, str(tmp_path))
+    offsets = graph_offsets(str(tmp_path))
+    bounds = partition_targets(offsets, 3)
+    assert bounds[0] == 0 and bounds[-1] == 500 and np.all(np.diff(bounds) >= 0)
+    shards = [load_shard(str(tmp_path), lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    assert sum(ops.shape[0] for _, ops in shards) == len(graph)
+    order = np.argsort(graph.dst, kind="stable")
+    np.testing.assert_array_equal(np.concatenate([ops for _, ops in shards]), graph.opinions[order])
+
+def test_distributed_matches_single_process(tmp_path):
+    graph = synthetic_graph(300, 4000, seed=3)
+    save_graph(graph, str(tmp_path))
+    offsets = np.array(graph_offsets(str(tmp_path)))
+    _, ops = load_shard(str(tmp_path), 0, graph.num_nodes)
+    expected = EBSLAlgorithm.calculate_reputation(
+        EBSLAlgorithm.fuse_segments(torch.from_numpy(ops), torch.from_numpy(offsets))).numpy()
+    result, rep = run_local(str(tmp_path), 2, repeats=1)
+    assert result["world_size"] == 2 and set(result["phases"]) == {"partition", "load", "fuse", "gather"}
+    np.testing.assert_array_equal(rep, expected)
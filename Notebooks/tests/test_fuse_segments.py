@@ -0,0 +1,69 @@
+import pytest
+import torch
+
+from ebsl_full_script import ClassicalEBSLAlgorithm, EBSLAlgorithm, _gen_synthetic_opinions
+
+def _padded_batch(seed: int, users: int = 64, max_count: int = 12, near_zero: bool = True):
+    """Per-user opinion blocks of varying length; with near_zero a quarter are K=2 with u1 + u2 ~ 1."""
+    g = torch.Generator().manual_seed(seed)
+    counts = torch.randint(0, max_count + 1, (users,), generator=g)
+    if near_zero:
+        counts[: users // 4] = 2
+    segments = []
+    for i, c in enumerate(counts.tolist()):
+        ops = _gen_synthetic_opinions(c)[0] if c else torch.zeros(0, 4)
+        if near_zero and i < users // 4:
+            u1 = torch.rand((), generator=g)
+            u2 = 1.0 - u1 + torch.randn((), generator=g) * 1e-7
+            ops[:, 2] = torch.stack([u1, u2]).clamp(0.0, 1.0)
+        segments.append(ops)
+    offsets = torch.cat([torch.zeros(1, dtype=torch.long), counts.cumsum(0)])
+    return segments, torch.cat(segments), offsets
+
+def _fuse_each(algorithm, segments, dtype):
+    return torch.stack([algorithm.fuse(s.to(dtype)) for s in segments])
+
+@pytest.mark.parametrize("algorithm", [EBSLAlgorithm, ClassicalEBSLAlgorithm])
+@pytest.mark.parametrize("seed", range(20))
+def test_fuse_segments_matches_per_user_fuse(algorithm, seed):
+    torch.manual_seed(seed)
+    # float32 sums differ from float64 ones by rounding only where the denominator is well away from 0
+    segments, flat, offsets = _padded_batch(seed, near_zero=False)
+    fused = algorithm.fuse_segments(flat, offsets)
+    assert fused.dtype == torch.float32
+    torch.testing.assert_close(fused, _fuse_each(algorithm, segments, torch.float32), rtol=1e-5, atol=1e-6)
+    # u1 + u2 ~ 1 is ill-conditioned in float32, so compare with fuse at the same (float64) precision
+    segments, flat, offsets = _padded_batch(seed)
+    fused = algorithm.fuse_segments(flat.double(), offsets)
+    torch.testing.assert_close(fused, _fuse_each(algorithm, segments, torch.float64), rtol=1e-9, atol=1e-12)
+
+@pytest.mark.parametrize("algorithm", [EBSLAlgorithm, ClassicalEBSLAlgorithm])
+def test_fuse_segments_near_zero_denominator(algorithm):
+    # K=2 with u1 + u2 == 1 exactly: the denominator is 0 and fuse adds 1e-9
+    ops = torch.tensor([[0.2, 0.1, 0.75, 0.5], [0.5, 0.25, 0.25, 0.5]])
+    fused = algorithm.fuse_segments(ops, torch.tensor([0, 2]))
+    torch.testing.assert_close(fused[0], algorithm.fuse(ops), rtol=1e-6, atol=0.0)
+
+def test_fuse_segments_fan_in_thousands():
+    # 3000 opinions with u ~ 0.97: prod(u) ~ 1e-40 is subnormal in float32 and fuse loses it
+    counts = torch.tensor([3000, 1500, 5000])
+    g = torch.Generator().manual_seed(0)
+    u = 0.97 + 0.01 * torch.rand(int(counts.sum()), generator=g, dtype=torch.float64)
+    b = (1.0 - u) * torch.rand(u.shape, generator=g, dtype=torch.float64)
+    flat = torch.stack([b, 1.0 - u - b, u, torch.rand(u.shape, generator=g, dtype=torch.float64)], dim=-1)
+    offsets = torch.cat([torch.zeros(1, dtype=torch.long), counts.cumsum(0)])
+    fused = EBSLAlgorithm.fuse_segments(flat, offsets)
+    for i, c in enumerate(counts.tolist()):
+        seg = flat[offsets[i]:offsets[i + 1]]
+        den = seg[:, 2].sum() - (c - 1)
+        expected_u = -torch.exp(torch.log(seg[:, 2]).sum() - torch.log(den.abs()))
+        torch.testing.assert_close(fused[i, 2], expected_u, rtol=1e-9, atol=0.0)
+        torch.testing.assert_close(fused[i, [0, 1, 3]], EBSLAlgorithm.fuse(seg)[[0, 1, 3]], rtol=1e-9, atol=1e-12)
+    assert (fused[:, 2] < 0).all() and (fused[:, 2].abs() > 1e-300).all()
+    # float32 input keeps the float64 accumulation; only the final cast rounds
+    fused32 = EBSLAlgorithm.fuse_segments(flat.float(), offsets)
+    torch.testing.assert_close(fused32[:, [0, 1, 3]], fused[:, [0, 1, 3]].float(), rtol=1e-5, atol=1e-7)
+
+def test_fuse_segments_empty_segment():
+    fused = EBSLAlgorithm.fuse_segments(torch.zeros(0, 4), torch.tensor([0, 0]))
+    assert fused.tolist() == [[0.0, 0.0, 1.0, 0.0]]
@@ -0,0 +1,17 @@
+import numpy as np
+
+from ebsl_loader import IdentityIndex, load_and_fuse
+
+def test_csv_with_bom_quoted_header_and_null_ids(tmp_path):
+    path = tmp_path / "att.csv"
+    path.write_bytes("﻿\"source\",\"target\",belief,disbelief,uncertainty\n"
+                     "\"alice, inc\",bob,0.6,0.1,0.3\n"
+                     ",bob,0.5,0.2,0.3\n"
+                     "carol,,0.5,0.2,0.3\n"
+                     "carol,bob,0.2,0.2,0.6\n".encode("utf-8"))
+    index = IdentityIndex()
+    fusion, stats = load_and_fuse(str(path), index)
+    assert (stats["rows"], stats["invalid"]) == (2, 2)
+    assert sorted(index.names) == ["alice, inc", "bob", "carol"]
+    fused, rep = fusion.finalize()
+    assert np.isfinite(rep).all()
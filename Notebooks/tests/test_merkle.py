@@ -0,0 +1,36 @@
+import ezkl
+import numpy as np
+
+from ebsl_merkle import ReputationMerkleTree, field_to_int, to_field_bytes, verify_path
+
+def _felt(x: int) -> str:
+    return to_field_bytes([x])[0].tobytes().hex()
+
+def test_field_encoding_matches_ezkl():
+    for score in (0.5, -0.5, 0.984375, -1.0):
+        assert _felt(int(round(score * 64))) == ezkl.float_to_felt(score, 6, ezkl.PyInputType.F32)
+
+def test_root_is_the_poseidon_chain():
+    scores = np.array([0.25, -0.5, 0.75])
+    tree = ReputationMerkleTree.build(scores, scale=6, workers=1)
+    q = tree.quantized
+    h = lambda *xs: ezkl.poseidon_hash(list(xs))[0]
+    leaves = [h(_felt(i), _felt(int(q[i]))) for i in range(3)]
+    root = h(h(leaves[0], leaves[1]), h(leaves[2], "00" * 32))
+    assert tree.root.hex() == root
+    assert tree.root_uint256 == field_to_int(bytes.fromhex(root))
+
+def test_paths_and_incremental_update(tmp_path):
+    rng = np.random.default_rng(0)
+    scores = rng.random(37)
+    tree = ReputationMerkleTree.build(scores, workers=1)
+    paths = tree.paths()
+    for i in (0, 17, 36):
+        assert verify_path(i, int(tree.quantized[i]), paths[i], tree.root)
+    assert not verify_path(5, int(tree.quantized[5]) + 1, paths[5], tree.root)
+
+    scores[[3, 36]] = [0.1, 0.9]
+    tree.update([3, 36], [0.1, 0.9])
+    assert tree.root == ReputationMerkleTree.build(scores, workers=1).root
+    tree.save(str(tmp_path))
+    assert ReputationMerkleTree.load(str(tmp_path)).root == tree.root
@@ -0,0 +1,34 @@
+from ebsl_deferred import PRIORITY_CLAIM, PRIORITY_IDLE, ProofQueue
+
+def _states(q: ProofQueue, user: str) -> dict:
+    return {r["input_hash"]: (r["state"], r["priority"])
+            for r in q.db.execute("SELECT * FROM jobs WHERE user_id=?", (user,))}
+
+def test_rescoring_same_input_dedupes(tmp_path):
+    q = ProofQueue(str(tmp_path / "q.sqlite"))
+    first = q.enqueue("u", "A", "fp", "a.json")
+    again = q.enqueue("u", "A", "fp", "a.json", priority=PRIORITY_CLAIM)
+    assert first["id"] == again["id"] and again["priority"] == PRIORITY_CLAIM
+    assert q.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1
+
+def test_a_b_a_leaves_only_a_queued(tmp_path):
+    q = ProofQueue(str(tmp_path / "q.sqlite"))
+    q.enqueue("u", "A", "fp", "a.json")
+    q.enqueue("u", "B", "fp", "b.json")
+    assert _states(q, "u") == {"A": ("superseded", PRIORITY_IDLE), "B": ("queued", PRIORITY_IDLE)}
+    q.enqueue("u", "A", "fp", "a.json")
+    assert _states(q, "u") == {"A": ("queued", PRIORITY_IDLE), "B": ("superseded", PRIORITY_IDLE)}
+
+    assert q.promote("u")["input_hash"] == "A"
+    job = q.take()
+    assert (job["input_hash"], job["priority"]) == ("A", PRIORITY_CLAIM)
+    assert q.take() is None
+
+def test_promote_moves_only_the_latest_job(tmp_path):
+    q = ProofQueue(str(tmp_path / "q.sqlite"))
+    q.enqueue("u", "A", "fp", "a.json")
+    # a second queued row can still exist from before superseding was enforced
+    q.db.execute("INSERT INTO jobs (user_id, input_hash, fingerprint, input_path, priority, state, enqueued_at) "
+                 "VALUES ('u', 'B', 'fp', 'b.json', ?, 'queued', 0)", (PRIORITY_IDLE,))
+    q.promote("u")
+    assert _states(q, "u") == {"A": ("queued", PRIORITY_CLAIM), "B": ("queued", PRIORITY_IDLE)}
@@ -0,0 +1,74 @@
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+import torch
+
+from ebsl_export import export_reputation
+from ebsl_numpy import NumpyEBSLAlgorithm
+from ebsl_query import ReputationQueryService, make_handler
+
+def _trust_graph(n=10, seed=5):
+    rng = np.random.default_rng(seed)
+    T = np.zeros((n, n, 4), dtype=np.float32)
+    T[..., 2], T[..., 3] = 1.0, 0.5
+    src, dst = np.nonzero((rng.random((n, n)) < 0.5) & ~np.eye(n, dtype=bool))
+    bdu = rng.dirichlet([2, 1, 2], size=src.size).astype(np.float32)
+    T[src, dst, :3], T[src, dst, 3] = bdu, rng.random(src.size).astype(np.float32)
+    return T, src, dst
+
+def test_recompute_matches_product_snapshot(tmp_path):
+    EBSL_EZKL = pytest.importorskip("EBSL_EZKL")
+    T, src, dst = _trust_graph()
+    algo = EBSL_EZKL.EBSLAlgorithm(T.shape[0])
+    algo.trust_matrix = torch.from_numpy(T)
+    rep = algo.fuse_all_nodes().numpy()
+    path = str(tmp_path / "reputation.parquet")
+    export_reputation(rep, path, fusion="product")
+
+    service = ReputationQueryService.from_snapshot(path)
+    assert service.fusion == "product"
+    service.load_attestations(src, dst, T[src, dst])
+    service.stale[:] = True
+    for row in range(T.shape[0]):
+        res = service.get(row)
+        assert res["source"] == "computed"
+        np.testing.assert_allclose(res["fused"], rep[row], rtol=1e-5, atol=1e-6)
+
+def test_sums_snapshot_and_cache_hit_rate(tmp_path):
+    path = str(tmp_path / "reputation.parquet")
+    export_reputation(np.tile([0.2, 0.1, 0.7, 0.5], (4, 1)), path, fusion="sums")
+    service = ReputationQueryService.from_snapshot(path)
+    assert service.fusion == "sums"
+    service.set_attestations(1, [[0.5, 0.2, 0.3, 0.5]])
+    service.get(0)
+    service.get(1)                               # recompute (cache miss)
+    service.get(1)                               # cache hit
+    service.get_many([0, 2, 3])
+    stats = service.stats()
+    assert stats["tiers"]["snapshot"] == 4
+    assert stats["cache_hit_rate"] == 0.5        # 1 hit over 2 cache lookups, snapshot hits excluded
+    expected, _ = NumpyEBSLAlgorithm.fuse_batch(np.array([[[0.5, 0.2, 0.3, 0.5]]]), np.ones((1, 1)))
+    np.testing.assert_allclose(service.get(1)["fused"], expected[0], rtol=1e-6)
+
+def test_http_paths_are_url_decoded():
+    service = ReputationQueryService(["alice@example.com", "a b"], np.tile([0.2, 0.1, 0.7, 0.5], (2, 1)))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/reputation/alice%40example.com") as r:
+            assert json.loads(r.read())["user"] == "alice@example.com"
+        with urllib.request.urlopen(f"{base}/reputation/a%20b?fields=all") as r:
+            assert json.loads(r.read())["found"]
+        req = urllib.request.Request(f"{base}/attestations/a%20b", method="POST",
+                                     data=json.dumps({"opinions": [[0.6, 0.1, 0.3, 0.5]]}).encode())
+        urllib.request.urlopen(req).close()
+        assert service.get("a b")["source"] == "computed"
+        assert len(service.keys) == 2
+    finally:
+        server.shutdown()
+        server.server_close()
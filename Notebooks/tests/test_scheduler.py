@@ -0,0 +1,62 @@
+import json
+import sys
+import threading
+
+import pytest
+
+from ebsl_scheduler import Job, MemoryHistory, MemoryScheduler, pipeline_job
+
+def _run(sched: MemoryScheduler, timeout: float = 60.0):
+    result = {}
+    t = threading.Thread(target=lambda: result.update(report=sched.run()), daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "scheduler hung"
+    return result["report"]
+
+def test_job_writing_more_than_a_pipe_buffer_to_stderr(tmp_path):
+    sched = MemoryScheduler(4096, history=MemoryHistory(str(tmp_path / "history.jsonl")), log=lambda *_: None)
+    for code in (0, 3):
+        src = f"import sys; sys.stderr.write('x' * 200000); sys.exit({code})"
+        sched.submit(Job(f"exit{code}", [sys.executable, "-c", src], kind="verify"))
+    report = _run(sched)
+    assert sorted(r["returncode"] for r in report.job_records) == [0, 3]
+    assert all(r["peak_rss_mb"] for r in report.job_records)
+
+def test_settings_resolved_against_job_cwd(tmp_path):
+    (tmp_path / "zkml_artifacts").mkdir()
+    with open(tmp_path / "zkml_artifacts" / "settings.json", "w") as f:
+        json.dump({"run_args": {"logrows": 17, "num_inner_cols": 2}, "required_lookups": []}, f)
+    sched = MemoryScheduler(4096, history=MemoryHistory(None), log=lambda *_: None)
+    job = sched.submit(pipeline_job("p", ["--skip-plots"], cwd=str(tmp_path)))
+    assert (job.logrows, job.estimate_source) == (17, "settings")
+
+def test_pipeline_job_needs_logrows_or_mem_mb(tmp_path):
+    sched = MemoryScheduler(4096, history=MemoryHistory(None), log=lambda *_: None)
+    with pytest.raises(ValueError):
+        sched.submit(pipeline_job("fresh", ["--skip-plots"], cwd=str(tmp_path)))
+    with pytest.raises(ValueError):
+        # --aggr-logrows sizes nothing without --aggregate
+        sched.submit(pipeline_job("prove", ["--aggr-logrows", "21"], cwd=str(tmp_path)))
+    job = sched.submit(pipeline_job("aggr", ["--aggregate", "proofs", "--aggr-logrows", "21"],
+                                    kind="aggregate", cwd=str(tmp_path)))
+    assert (job.logrows, job.estimate_source) == (21, "logrows")
+    assert sched.submit(pipeline_job("sized", [], cwd=str(tmp_path), mem_mb=1200)).estimate_source == "explicit"
+
+def test_jobs_sharing_a_cwd_do_not_overlap(tmp_path):
+    logs = []
+    sched = MemoryScheduler(4096, history=MemoryHistory(None), log=logs.append)
+    src = "import sys, time; open(sys.argv[1], 'w').write(f'{time.time()} '); time.sleep(0.5); open(sys.argv[1], 'a').write(f'{time.time()}')"
+    for i in range(2):
+        sched.submit(Job(f"p{i}", [sys.executable, "-c", src, str(tmp_path / f"p{i}.txt")], mem_mb=100,
+                         cwd=str(tmp_path), exclusive_cwd=True))
+    other = tmp_path / "other"
+    other.mkdir()
+    sched.submit(Job("q", [sys.executable, "-c", src, str(tmp_path / "q.txt")], mem_mb=100,
+                     cwd=str(other), exclusive_cwd=True))
+    assert any("shares cwd" in m and "p0" in m for m in logs)
+    _run(sched)
+    (s0, e0), (s1, e1), (sq, eq) = (map(float, (tmp_path / f"{n}.txt").read_text().split())
+                                    for n in ("p0", "p1", "q"))
+    assert s1 >= e0 or s0 >= e1
+    assert sq < e0 and s0 < eq                    # a different cwd still runs alongside
@@ -0,0 +1,61 @@
+import queue
+import time
+
+import numpy as np
+
+from ebsl_loader import IdentityIndex, OpinionBatch, StreamingFusion
+from ebsl_stream import StreamIngestor
+
+def _events(n: int, nodes: int = 40, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    ops = rng.dirichlet([1.0, 1.0, 1.0], n)
+    src, dst = rng.integers(0, nodes, n), rng.integers(0, nodes, n)
+    return [{"source": f"u{s}", "target": f"u{t}", "belief": float(o[0]), "disbelief": float(o[1]),
+             "uncertainty": float(o[2])} for s, t, o in zip(src, dst, ops)]
+
+def _batch_scores(events, index: IdentityIndex) -> np.ndarray:
+    ops = np.asarray([[e["belief"], e["disbelief"], e["uncertainty"], 0.5] for e in events], dtype=np.float32)
+    fusion = StreamingFusion(len(index))
+    fusion.update(OpinionBatch(index.lookup([e["source"] for e in events]),
+                               index.lookup([e["target"] for e in events]), ops))
+    return fusion.finalize()[1][:, 0]
+
+def test_stream_matches_batch_fusion_and_drains_on_stop():
+    events = _events(2000)
+    source = queue.Queue()
+    for e in events:
+        source.put(e)
+    # a slow applier and a tiny buffer keep the reader blocked in offer() while stop() is called
+    ingestor = StreamIngestor(batch_size=16, window=5.0, buffer_events=4,
+                              on_batch=lambda ids, fused: time.sleep(0.002)).start(source=source)
+    while not source.empty():
+        time.sleep(0.001)
+    ingestor.stop(drain=True, timeout=30)
+
+    assert ingestor.counts["events"] == len(events)
+    index = IdentityIndex()
+    index.lookup(ingestor.index.names)
+    np.testing.assert_allclose(ingestor.scores(), _batch_scores(events, index), rtol=1e-6, atol=1e-7)
+
+def test_empty_persistent_index_is_kept(tmp_path):
+    index = IdentityIndex(str(tmp_path / "identities.jsonl"))
+    assert len(index) == 0
+    ingestor = StreamIngestor(index)
+    assert ingestor.index is index
+    ingestor.apply([(time.time(), _events(1)[0])])
+    assert (tmp_path / "identities.jsonl").exists()
+
+def test_invalid_events_counted_from_reader_and_applier(tmp_path):
+    # bad JSON lines are counted by the file reader, malformed events by the applier, concurrently
+    path = tmp_path / "events.jsonl"
+    path.write_text("not json\n" * 3000)
+    source = queue.Queue()
+    for i in range(3000):
+        source.put({"source": f"u{i}"})
+    source.put(None)
+    ingestor = StreamIngestor(batch_size=8, window=0.01).start(follow=str(path), source=source)
+    deadline = time.time() + 30
+    while ingestor.stats().invalid < 6000 and time.time() < deadline:
+        time.sleep(0.01)
+    ingestor.stop(drain=True, timeout=30)
+    assert ingestor.stats().invalid == 6000
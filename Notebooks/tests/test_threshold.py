@@ -0,0 +1,21 @@
+import pytest
+import torch
+
+from ebsl_threshold import synthetic_claimant
+from ebsl_torch import EBslThresholdModule
+
+def test_threshold_is_published_in_1e6_scale():
+    combined, rep = synthetic_claimant(4)
+    assert 0.05 <= rep <= 1.0
+    below = EBslThresholdModule(4, rep - 0.05).eval()
+    threshold, above = below(combined)
+    assert threshold.dtype == torch.int64
+    assert int(threshold) == round((rep - 0.05) * 1_000_000) and float(above) == 1.0
+    threshold, above = EBslThresholdModule(4, min(rep + 0.05, 1.0)).eval()(combined)
+    assert float(above) == 0.0
+    assert combined.shape[1] == 4 * 5          # opinions + mask only: the threshold is a circuit constant
+
+@pytest.mark.parametrize("threshold", [-0.13, 1.5])
+def test_threshold_outside_contract_range(threshold):
+    with pytest.raises(ValueError):
+        EBslThresholdModule(4, threshold)
@@ -254,7 +254,10 @@ contract ZKMLOnChainVerifier {
     /**
      * @dev Verify a ZKML proof of reputation above threshold (selective disclosure)
      * @param proof ZK proof generated by EZKL
-     * @param publicInputs Public inputs: [threshold, isAboveThreshold boolean as uint256 (1=true, 0=false)]
+     * @param publicInputs Public inputs ending in [threshold, isAboveThreshold]: threshold in 1e6 scale,
+     *        isAboveThreshold as uint256 (1=true, 0=false). The EZKL threshold circuit with hashed inputs
+     *        emits [inputCommitment, threshold, isAboveThreshold], inputCommitment being the Poseidon
+     *        commitment of the fused opinions, so the last two instances are read
      * @return success True if proof is valid and threshold condition is met
      */
     function verifyReputationThreshold(
@@ -264,9 +267,9 @@ contract ZKMLOnChainVerifier {
         require(proof.length > 0, "Empty proof");
         require(publicInputs.length >= 2, "Insufficient public inputs for threshold proof");
 
-        // Extract threshold and boolean from public inputs
-        uint256 threshold = publicInputs[0];
-        uint256 isAboveThreshold = publicInputs[1]; // 1 if above, 0 if below
+        // Extract threshold and boolean from the last two public inputs (after any input commitment)
+        uint256 threshold = publicInputs[publicInputs.length - 2];
+        uint256 isAboveThreshold = publicInputs[publicInputs.length - 1]; // 1 if above, 0 if below
 
         // Validate threshold is reasonable
         require(threshold <= MAX_REPUTATION_SCORE, "Invalid threshold");
@@ -158,6 +158,20 @@ describe("ZKMLOnChainVerifier", function () {
       expect(timestamp).to.be.gt(0);
     });
 
+    it("Should read threshold and isAbove after the input commitment", async function () {
+      const proof = [1, 2, 3, 4, 5, 6];
+      const publicInputs = [123456789, 600000, 1]; // [inputCommitment, threshold=600K, isAbove=true]
+
+      await mockVerifier.connect(owner).setVerificationResult(true);
+
+      await expect(
+        zkmlVerifier.connect(user1).verifyReputationThreshold(proof, publicInputs)
+      ).to.emit(zkmlVerifier, "ThresholdVerified");
+
+      const [reputation] = await zkmlVerifier.getVerifiedReputation(user1.address);
+      expect(reputation).to.equal(600000);
+    });
+
     it("Should reject threshold proof where isAbove is false", async function () {
       const proof = [1, 2, 3, 4, 5, 6];
       const publicInputs = [600000, 0]; // threshold=600K, isAbove=false